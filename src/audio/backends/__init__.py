@@ -0,0 +1,61 @@
+import os
+
+from .base import (
+    ABORT,
+    COMPLETE,
+    CONTINUE,
+    INPUT_OVERFLOW,
+    INPUT_UNDERFLOW,
+    OUTPUT_OVERFLOW,
+    OUTPUT_UNDERFLOW,
+    AudioInputBackend,
+    AudioOutputBackend,
+)
+
+BACKENDS = ('portaudio', 'virtual')
+
+
+def default_backend_name():
+    """AUDIO_BACKEND selects the backend; real devices otherwise"""
+    return os.getenv('AUDIO_BACKEND', 'portaudio')
+
+
+def get_input_backend(name=None):
+    """Create an input backend by name. Device libraries are imported on demand."""
+    name = name or default_backend_name()
+    if name == 'portaudio':
+        from .portaudio import PyAudioInput
+        return PyAudioInput()
+    if name == 'virtual':
+        from .virtual import VirtualInputDevice
+        return VirtualInputDevice(os.getenv('AUDIO_VIRTUAL_INPUT', 'output.wav'))
+    raise ValueError(f"Unknown audio backend {name!r}, expected one of {BACKENDS}")
+
+
+def get_output_backend(name=None):
+    """Create an output backend by name. Device libraries are imported on demand."""
+    name = name or default_backend_name()
+    if name == 'portaudio':
+        from .portaudio import SoundDeviceOutput
+        return SoundDeviceOutput()
+    if name == 'virtual':
+        from .virtual import VirtualOutputDevice
+        return VirtualOutputDevice()
+    raise ValueError(f"Unknown audio backend {name!r}, expected one of {BACKENDS}")
+
+
+__all__ = [
+    'ABORT',
+    'BACKENDS',
+    'COMPLETE',
+    'CONTINUE',
+    'INPUT_OVERFLOW',
+    'INPUT_UNDERFLOW',
+    'OUTPUT_OVERFLOW',
+    'OUTPUT_UNDERFLOW',
+    'AudioInputBackend',
+    'AudioOutputBackend',
+    'default_backend_name',
+    'get_input_backend',
+    'get_output_backend',
+]
@@ -0,0 +1,48 @@
+# Callback return codes for input streams (same values as PyAudio's
+# paContinue/paComplete/paAbort so recorder callbacks work with any backend)
+CONTINUE = 0
+COMPLETE = 1
+ABORT = 2
+
+# Status flags passed to callbacks (PortAudio's paInputUnderflow, etc.)
+INPUT_UNDERFLOW = 0x1
+INPUT_OVERFLOW = 0x2
+OUTPUT_UNDERFLOW = 0x4
+OUTPUT_OVERFLOW = 0x8
+
+
+class AudioInputBackend:
+    """Opens capture streams for AudioRecorder.
+
+    `open()` returns a stream with start_stream(), stop_stream(), close() and
+    is_active(). The callback has PyAudio's signature,
+    callback(in_data, frame_count, time_info, status) -> (None, code), where
+    in_data is float32 bytes.
+    """
+
+    name = None
+
+    def open(self, rate, channels, frames_per_buffer, callback):
+        raise NotImplementedError
+
+    def terminate(self):
+        """Release backend-wide resources"""
+
+
+class AudioOutputBackend:
+    """Opens playback streams for AudioPlayer.
+
+    `open()` returns a stream with start(), stop(), abort() and close(). The
+    callback has sounddevice's signature, callback(outdata, frames, time,
+    status), fills the float32 `outdata` array in place and raises
+    `self.CallbackStop` after the last block.
+    """
+
+    name = None
+    CallbackStop = None
+
+    def open(self, samplerate, channels, dtype, callback):
+        raise NotImplementedError
+
+    def terminate(self):
+        """Release backend-wide resources"""
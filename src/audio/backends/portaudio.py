@@ -0,0 +1,43 @@
+import sounddevice as sd
+
+from .base import AudioInputBackend, AudioOutputBackend
+
+
+class PyAudioInput(AudioInputBackend):
+    """Microphone capture through the shared PyAudio instance"""
+
+    name = 'portaudio'
+
+    def open(self, rate, channels, frames_per_buffer, callback):
+        import pyaudio
+        from ..recorder import get_pa_instance
+        return get_pa_instance().open(
+            format=pyaudio.paFloat32,
+            channels=channels,
+            rate=rate,
+            input=True,
+            frames_per_buffer=frames_per_buffer,
+            stream_callback=callback
+        )
+
+    def terminate(self):
+        from ..recorder import cleanup_pa
+        cleanup_pa()
+
+
+class SoundDeviceOutput(AudioOutputBackend):
+    """Speaker playback through sounddevice"""
+
+    name = 'portaudio'
+    CallbackStop = sd.CallbackStop
+
+    def open(self, samplerate, channels, dtype, callback):
+        return sd.OutputStream(
+            samplerate=samplerate,
+            channels=channels,
+            dtype=dtype,
+            callback=callback
+        )
+
+    def terminate(self):
+        sd._terminate()
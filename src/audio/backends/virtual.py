@@ -0,0 +1,301 @@
+import threading
+import time
+import numpy as np
+import soundfile as sf
+
+from .base import (
+    ABORT,
+    COMPLETE,
+    INPUT_OVERFLOW,
+    OUTPUT_UNDERFLOW,
+    AudioInputBackend,
+    AudioOutputBackend,
+)
+
+
+class CallbackStats:
+    """Timing of the callbacks a virtual device made.
+
+    Each callback is compared against its slot on the ideal schedule
+    (start + n * period). Jitter is how late a callback started relative
+    to its slot; an overrun is a callback that took longer than its
+    period; a drop is a slot that passed entirely while an earlier
+    callback was still running.
+    """
+
+    def __init__(self, period):
+        self.period = period
+        self.lateness = []
+        self.durations = []
+        self.overruns = 0
+        self.drops = 0
+
+    def record(self, lateness, duration):
+        self.lateness.append(lateness)
+        self.durations.append(duration)
+        if duration > self.period:
+            self.overruns += 1
+
+    def summary(self):
+        """Counts plus jitter and duration percentiles, in milliseconds"""
+        def pct(values, q):
+            if not values:
+                return 0.0
+            return float(np.percentile(values, q)) * 1000
+
+        return {
+            "callbacks": len(self.durations),
+            "period_ms": self.period * 1000,
+            "jitter_p50_ms": pct(self.lateness, 50),
+            "jitter_p99_ms": pct(self.lateness, 99),
+            "jitter_max_ms": pct(self.lateness, 100),
+            "duration_p50_ms": pct(self.durations, 50),
+            "duration_max_ms": pct(self.durations, 100),
+            "overruns": self.overruns,
+            "drops": self.drops,
+        }
+
+
+class _PacedThread:
+    """Calls `tick(status)` once per period, or back to back when speed is 0"""
+
+    def __init__(self, period, speed, tick, overflow_flag):
+        self.period = period
+        self.interval = period / speed if speed else 0.0
+        self.tick = tick
+        self.overflow_flag = overflow_flag
+        self.stats = CallbackStats(self.interval or period)
+        self._stop = threading.Event()
+        self._thread = None
+        self.started_at = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="virtual-audio", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        self.started_at = time.perf_counter()
+        slot = 0
+        status = 0
+        while not self._stop.is_set():
+            scheduled = self.started_at + slot * self.interval
+            now = time.perf_counter()
+            if scheduled > now:
+                if self._stop.wait(scheduled - now):
+                    break
+                now = time.perf_counter()
+            lateness = now - scheduled if self.interval else 0.0
+            # Slots that passed completely while we were busy are lost,
+            # as a hardware buffer would overflow or run dry
+            missed = int(lateness // self.interval) if self.interval else 0
+            if missed:
+                self.stats.drops += missed
+                slot += missed
+                status |= self.overflow_flag
+                lateness -= missed * self.interval
+            started = time.perf_counter()
+            keep_going = self.tick(status)
+            self.stats.record(lateness, time.perf_counter() - started)
+            status = 0
+            slot += 1
+            if not keep_going:
+                break
+
+    def stop(self, wait=True):
+        self._stop.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    @property
+    def active(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+def _load_source(path, rate, channels):
+    """Read a WAV as float32 at the requested rate and channel count"""
+    data, source_rate = sf.read(path, dtype='float32', always_2d=True)
+    if source_rate != rate and len(data):
+        # Linear resampling is plenty for driving benchmarks
+        duration = len(data) / source_rate
+        positions = np.arange(int(round(duration * rate))) * (source_rate / rate)
+        data = np.stack([
+            np.interp(positions, np.arange(len(data)), data[:, c])
+            for c in range(data.shape[1])
+        ], axis=1).astype(np.float32)
+    if data.shape[1] != channels:
+        mono = data.mean(axis=1, keepdims=True)
+        data = np.repeat(mono, channels, axis=1)
+    return np.ascontiguousarray(data)
+
+
+class VirtualInputStream:
+    """Plays a WAV file into a recorder callback as if it were a microphone"""
+
+    def __init__(self, source, rate, frames_per_buffer, callback, speed, loop):
+        self.source = source
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.callback = callback
+        self.loop = loop
+        self.position = 0
+        self.finished = threading.Event()
+        self._pacer = _PacedThread(frames_per_buffer / rate, speed, self._tick, INPUT_OVERFLOW)
+
+    @property
+    def stats(self):
+        return self._pacer.stats
+
+    def _next_block(self):
+        frames = self.frames_per_buffer
+        block = self.source[self.position:self.position + frames]
+        self.position += len(block)
+        if len(block) < frames:
+            if self.loop and len(self.source):
+                self.position = 0
+                return np.concatenate([block, self._next_block()])[:frames]
+            # Past the end of the file the "microphone" hears silence
+            pad = np.zeros((frames - len(block), self.source.shape[1]), dtype=np.float32)
+            block = np.concatenate([block, pad])
+        return block
+
+    def _tick(self, status):
+        block = self._next_block()
+        now = time.perf_counter()
+        time_info = {
+            'input_buffer_adc_time': now,
+            'current_time': now,
+            'output_buffer_dac_time': 0.0,
+        }
+        _, code = self.callback(block.tobytes(), self.frames_per_buffer, time_info, status)
+        if self.position >= len(self.source) and not self.loop:
+            self.finished.set()
+        return code not in (COMPLETE, ABORT)
+
+    def start_stream(self):
+        self._pacer.start()
+
+    def stop_stream(self):
+        self._pacer.stop()
+
+    def close(self):
+        self._pacer.stop()
+
+    def is_active(self):
+        return self._pacer.active
+
+
+class VirtualInputDevice(AudioInputBackend):
+    """Input backend that replays a WAV (e.g. output.wav) in place of a microphone.
+
+    With speed=1.0 blocks arrive in real time; larger values accelerate the
+    pace and speed=0 delivers blocks back to back. The most recently opened
+    stream is kept in `stream` so its timing stats can be inspected.
+    """
+
+    name = 'virtual'
+
+    def __init__(self, path='output.wav', speed=1.0, loop=False):
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.stream = None
+
+    def open(self, rate, channels, frames_per_buffer, callback):
+        source = _load_source(self.path, rate, channels)
+        self.stream = VirtualInputStream(
+            source, rate, frames_per_buffer, callback, self.speed, self.loop)
+        return self.stream
+
+
+class VirtualCallbackStop(Exception):
+    """Raised by a player callback to end a virtual output stream"""
+
+
+class VirtualOutputStream:
+    """Pulls blocks from a player callback and hands them to a sink"""
+
+    def __init__(self, sink, samplerate, channels, dtype, callback):
+        self.sink = sink
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = sink.blocksize
+        self._buffer = np.zeros((self.blocksize, channels), dtype=dtype)
+        self._pacer = _PacedThread(self.blocksize / samplerate, sink.speed, self._tick,
+                                   OUTPUT_UNDERFLOW)
+
+    @property
+    def stats(self):
+        return self._pacer.stats
+
+    def _tick(self, status):
+        self._buffer.fill(0)
+        try:
+            self.callback(self._buffer, self.blocksize, None, status)
+            stop = False
+        except VirtualCallbackStop:
+            stop = True
+        self.sink.receive(self._buffer, self.samplerate)
+        return not stop
+
+    def start(self):
+        self.sink.stream = self
+        self._pacer.start()
+
+    def stop(self):
+        self._pacer.stop()
+
+    def abort(self):
+        self._pacer.stop(wait=False)
+
+    def close(self):
+        self._pacer.stop()
+
+    @property
+    def active(self):
+        return self._pacer.active
+
+
+class VirtualOutputDevice(AudioOutputBackend):
+    """Output backend that timestamps every block it would have played.
+
+    `blocks` holds (perf_counter timestamp, first frame index, frame count,
+    peak level) per block. `first_sound_at` is the timestamp of the first
+    block whose peak exceeds `threshold`, for end-to-end latency. With
+    capture=True the samples themselves are kept in `captured`.
+    """
+
+    name = 'virtual'
+    CallbackStop = VirtualCallbackStop
+
+    def __init__(self, speed=1.0, blocksize=1024, threshold=1e-4, capture=False):
+        self.speed = speed
+        self.blocksize = blocksize
+        self.threshold = threshold
+        self.capture = capture
+        self.stream = None
+        self.reset()
+
+    def reset(self):
+        """Forget everything received so far"""
+        self.blocks = []
+        self.captured = []
+        self.frames_received = 0
+        self.first_sound_at = None
+        self.sound_arrived = threading.Event()
+
+    def open(self, samplerate, channels, dtype, callback):
+        return VirtualOutputStream(self, samplerate, channels, dtype, callback)
+
+    def receive(self, block, samplerate):
+        now = time.perf_counter()
+        peak = float(np.abs(block).max()) if len(block) else 0.0
+        self.blocks.append((now, self.frames_received, len(block), peak))
+        self.frames_received += len(block)
+        if self.capture:
+            self.captured.append(block.copy())
+        if self.first_sound_at is None and peak > self.threshold:
+            self.first_sound_at = now
+            self.sound_arrived.set()
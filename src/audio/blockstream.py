@@ -0,0 +1,131 @@
+import queue
+import threading
+import numpy as np
+import soundfile as sf
+
+from .waveform import WaveformMeter
+
+
+class BlockStream:
+    """Decode an audio file into a small bounded queue of blocks.
+
+    A background thread reads the file with `sf.blocks` and blocks once
+    `max_blocks` decoded blocks are waiting, so memory stays flat no matter
+    how long the file is. `read_into()` never blocks and is safe to call
+    from a PortAudio callback.
+    """
+
+    def __init__(self, file_path, blocksize=8192, max_blocks=4):
+        self.file_path = file_path
+        self.blocksize = blocksize
+        self.max_blocks = max_blocks
+
+        info = sf.info(file_path)
+        self.samplerate = info.samplerate
+        self.channels = info.channels
+        self.frames = info.frames
+
+        self.underruns = 0
+        self._queue = queue.Queue(maxsize=max_blocks)
+        self._current = None
+        self._offset = 0
+        self._eof = False
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        """Start decoding in the background"""
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+        self._thread.start()
+        return self
+
+    def wait_ready(self, timeout=None):
+        """Wait until the first block is decoded (or the file turned out empty)"""
+        return self._ready.wait(timeout)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.05)
+                self._ready.set()
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self):
+        try:
+            for block in sf.blocks(self.file_path, blocksize=self.blocksize,
+                                   dtype='float32', always_2d=True):
+                if not self._put(block):
+                    return
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(None)
+            self._ready.set()
+
+    @property
+    def finished(self):
+        """True once every decoded frame has been handed out"""
+        return self._eof
+
+    def read_into(self, out):
+        """Copy up to len(out) frames into `out` without blocking.
+
+        Any part of `out` that can't be filled is zeroed. Returns the
+        number of frames written.
+        """
+        frames = len(out)
+        written = 0
+        while written < frames and not self._eof:
+            if self._current is None:
+                try:
+                    self._current = self._queue.get_nowait()
+                except queue.Empty:
+                    self.underruns += 1
+                    break
+                self._offset = 0
+                if self._current is None:
+                    self._eof = True
+                    break
+            take = min(frames - written, len(self._current) - self._offset)
+            out[written:written + take] = self._current[self._offset:self._offset + take]
+            written += take
+            self._offset += take
+            if self._offset >= len(self._current):
+                self._current = None
+        if written < frames:
+            out[written:] = 0
+        return written
+
+    def close(self):
+        """Stop decoding and drop any blocks still queued"""
+        self._stop.set()
+        self._current = None
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def blocks_rms_levels(file_path, num_bars=50, blocksize=65536):
+    """Per-bar RMS levels for a file, computed block by block in flat memory"""
+    frames = sf.info(file_path).frames
+    meter = WaveformMeter(num_bars=num_bars, samples_per_bar=max(1, frames // num_bars))
+    for block in sf.blocks(file_path, blocksize=blocksize, dtype='float32', always_2d=True):
+        meter.update(block)
+    return meter.levels if frames >= num_bars else np.zeros(0, dtype=np.float32)
@@ -0,0 +1,205 @@
+import os
+import threading
+
+from .backends import get_output_backend
+
+# Cue stream format; 24 kHz matches the TTS audio so the device rarely resamples
+SAMPLE_RATE = 24000
+
+# Fade applied when a cue is cut off, so stopping it doesn't click
+FADE_SECONDS = 0.01
+
+
+def _tone(np, rate, notes, amplitude):
+    """Sine notes [(frequency or None for a rest, seconds)] with short ramps"""
+    parts = []
+    for frequency, seconds in notes:
+        count = int(rate * seconds)
+        if frequency is None:
+            parts.append(np.zeros(count, dtype=np.float32))
+            continue
+        t = np.arange(count, dtype=np.float32) / rate
+        note = np.sin(2 * np.pi * frequency * t).astype(np.float32)
+        ramp = min(count // 2, int(rate * 0.008))
+        if ramp:
+            envelope = np.ones(count, dtype=np.float32)
+            envelope[:ramp] = np.linspace(0, 1, ramp, dtype=np.float32)
+            envelope[-ramp:] = np.linspace(1, 0, ramp, dtype=np.float32)
+            note *= envelope
+        parts.append(note * amplitude)
+    return np.concatenate(parts)
+
+
+def synthesize(rate=SAMPLE_RATE):
+    """The built-in cues as float32 mono arrays at `rate`
+
+    'ack' confirms the key-up, 'thinking' is a quiet pulse that loops while
+    the response is prepared, 'busy' means the request was turned away.
+    """
+    import numpy as np
+
+    return {
+        'ack': _tone(np, rate, [(660, 0.06), (None, 0.02), (880, 0.08)], 0.2),
+        # Starts with a rest so a fast response never hears it
+        'thinking': _tone(np, rate, [(None, 0.6), (520, 0.12), (None, 0.08), (520, 0.12),
+                                     (None, 0.5)], 0.06),
+        'busy': _tone(np, rate, [(440, 0.1), (None, 0.03), (330, 0.16)], 0.2),
+    }
+
+
+def decode(path, rate=SAMPLE_RATE):
+    """A sound file as float32 mono at `rate`"""
+    import numpy as np
+    import soundfile as sf
+
+    data, source_rate = sf.read(path, dtype='float32', always_2d=True)
+    samples = data.mean(axis=1)
+    if source_rate != rate and len(samples):
+        positions = np.arange(int(round(len(samples) * rate / source_rate))) * (source_rate / rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+class _Cue:
+    """Playback position in one sound; swapped in whole by Earcons.play()"""
+
+    __slots__ = ('samples', 'position', 'loop', 'then', 'fading')
+
+    def __init__(self, samples, loop=False, then=None):
+        self.samples = samples
+        self.position = 0
+        self.loop = loop
+        self.then = then
+        self.fading = False
+
+
+class Earcons:
+    """Short feedback sounds held in memory and played on a stream kept open
+
+    `open()` decodes every cue once, into float32 arrays (from
+    `directory`/<name>.wav when that file exists, synthesized otherwise),
+    and starts an output stream that plays silence while idle. `play()` then
+    just swaps the cue the stream callback reads from: no file I/O, no
+    decoding and no device open between the key-up and the sound. `stop()`
+    fades the cue out within one block; the player calls it as soon as the
+    first block of the real response is written.
+    """
+
+    def __init__(self, backend=None, directory=None, rate=SAMPLE_RATE):
+        self.backend = backend
+        self.directory = directory if directory is not None else os.getenv('EARCON_DIR')
+        self.rate = rate
+        self.sounds = {}
+        self.stream = None
+        self.played = 0
+        self._cue = None
+        self._fade_out = None
+
+    @property
+    def ready(self):
+        return self.stream is not None
+
+    def load(self):
+        import numpy as np
+
+        fade = max(1, int(self.rate * FADE_SECONDS))
+        self._fade_out = 1 - np.arange(fade, dtype=np.float32) / fade
+        sounds = synthesize(self.rate)
+        if self.directory:
+            for name in sounds:
+                path = os.path.join(self.directory, name + '.wav')
+                if os.path.exists(path):
+                    sounds[name] = decode(path, self.rate)
+        self.sounds = sounds
+        return sounds
+
+    def open(self):
+        """Decode the cues and start the output stream; returns self"""
+        if self.stream is not None:
+            return self
+        if not self.sounds:
+            self.load()
+        if self.backend is None:
+            self.backend = get_output_backend()
+        stream = self.backend.open(samplerate=self.rate, channels=1, dtype='float32',
+                                   callback=self._callback)
+        stream.start()
+        self.stream = stream
+        return self
+
+    def open_in_background(self):
+        """open() on a daemon thread, keeping numpy and the device off startup"""
+        def run():
+            try:
+                self.open()
+            except Exception as e:
+                print(f"⚠️  Earcons unavailable: {e}")
+
+        thread = threading.Thread(target=run, name="earcons", daemon=True)
+        thread.start()
+        return thread
+
+    def play(self, name, then=None):
+        """Start cue `name` now, then loop cue `then` until stop()
+
+        A no-op until the stream is open, or for an unknown name.
+        """
+        samples = self.sounds.get(name)
+        if self.stream is None or samples is None:
+            return False
+        follow = self.sounds.get(then) if then else None
+        self._cue = _Cue(samples, then=_Cue(follow, loop=True) if follow is not None else None)
+        self.played += 1
+        return True
+
+    def stop(self):
+        cue = self._cue
+        if cue is not None:
+            cue.fading = True
+
+    @property
+    def playing(self):
+        return self._cue is not None
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        current = cue = self._cue
+        if cue is None:
+            out.fill(0)
+            return
+        if cue.fading:
+            # One short ramp down from wherever the cue is, then silence
+            length = min(frames, len(self._fade_out), len(cue.samples) - cue.position)
+            out.fill(0)
+            if length > 0:
+                out[:length] = cue.samples[cue.position:cue.position + length]
+                out[:length] *= self._fade_out[:length]
+            if self._cue is current:
+                self._cue = None
+            return
+
+        written = 0
+        while written < frames and cue is not None:
+            chunk = cue.samples[cue.position:cue.position + frames - written]
+            out[written:written + len(chunk)] = chunk
+            written += len(chunk)
+            cue.position += len(chunk)
+            if cue.position >= len(cue.samples):
+                if cue.loop and len(cue.samples):
+                    cue.position = 0
+                else:
+                    cue = cue.then
+        out[written:] = 0
+        # Move on to the follow-up cue unless play() or stop() got here first
+        if cue is not current and self._cue is current and not current.fading:
+            self._cue = cue
+
+    def close(self):
+        self._cue = None
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            try:
+                stream.stop()
+                stream.close()
+            except Exception:
+                pass
@@ -0,0 +1,125 @@
+import time
+from collections import deque
+
+from .. import gc_control, metrics
+from .backends.base import INPUT_OVERFLOW, INPUT_UNDERFLOW, OUTPUT_OVERFLOW, OUTPUT_UNDERFLOW
+
+# PortAudio status bits and the sounddevice CallbackFlags attribute for each
+STATUS_FLAGS = (
+    (INPUT_UNDERFLOW, 'input_underflow'),
+    (INPUT_OVERFLOW, 'input_overflow'),
+    (OUTPUT_UNDERFLOW, 'output_underflow'),
+    (OUTPUT_OVERFLOW, 'output_overflow'),
+)
+
+# Glitch timestamps kept per session; counters keep counting past this
+MAX_EVENTS = 64
+
+
+def status_names(status):
+    """Names of the flags set in a callback status (int or CallbackFlags)"""
+    if isinstance(status, int):
+        return [name for flag, name in STATUS_FLAGS if status & flag]
+    return [name for _, name in STATUS_FLAGS if getattr(status, name, False)]
+
+
+class GlitchMonitor:
+    """Status flags and callback timing for one recording or playback session.
+
+    Call `callback(started, status, frames)` at the end of every audio
+    callback, with `started` the perf_counter() read on entry. It counts
+    each status flag, times the callback against its buffer deadline
+    (frames / rate) and tracks the longest gap between callbacks. The work
+    is a clock read, a few adds and, only when something went wrong, a dict
+    update, so it is cheap enough for the callback itself. `report()`
+    summarizes the session for traces and logs.
+    """
+
+    def __init__(self, stream, rate, frames_per_buffer=None):
+        self.stream = stream
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.started_at = time.perf_counter()
+        self.callbacks = 0
+        self.flags = {}
+        self.overruns = 0
+        self.events = deque(maxlen=MAX_EVENTS)
+        self.durations = deque(maxlen=4096)
+        self.max_duration = 0.0
+        self.max_gap = 0.0
+        self.max_budget = 0.0
+        self._last_started = None
+
+    def callback(self, started, status=None, frames=None):
+        now = time.perf_counter()
+        duration = now - started
+        self.callbacks += 1
+        self.durations.append(duration)
+        if duration > self.max_duration:
+            self.max_duration = duration
+        if self._last_started is not None and started - self._last_started > self.max_gap:
+            self.max_gap = started - self._last_started
+        self._last_started = started
+
+        frames = frames or self.frames_per_buffer
+        if self.frames_per_buffer is None:
+            self.frames_per_buffer = frames
+        if frames:
+            budget = duration * self.rate / frames
+            if budget > self.max_budget:
+                self.max_budget = budget
+            if budget > 1.0:
+                self.overruns += 1
+                self._event(now, 'callback_overrun')
+                metrics.AUDIO_XRUNS.inc(self.stream, 'callback_overrun')
+        if status:
+            metrics.record_audio_status(status)
+            for name in status_names(status):
+                self.flags[name] = self.flags.get(name, 0) + 1
+                self._event(now, name)
+
+    def _event(self, at, name):
+        self.events.append((at - self.started_at, name))
+        # Lets GC_MODE=measure tell collector pauses apart from other causes
+        gc_control.glitch(at)
+
+    @property
+    def glitches(self):
+        return sum(self.flags.values()) + self.overruns
+
+    def report(self):
+        """Counts, first glitch timestamps and callback timing, in milliseconds"""
+        durations = sorted(self.durations)
+
+        def pct(q):
+            if not durations:
+                return 0.0
+            return durations[min(len(durations) - 1, int(q * len(durations)))] * 1000
+
+        deadline = self.frames_per_buffer / self.rate if self.frames_per_buffer else None
+        return {
+            "stream": self.stream,
+            "session_s": round(time.perf_counter() - self.started_at, 3),
+            "callbacks": self.callbacks,
+            "glitches": self.glitches,
+            "flags": dict(self.flags),
+            "overruns": self.overruns,
+            "deadline_ms": round(deadline * 1000, 3) if deadline else None,
+            "callback_p50_ms": round(pct(0.50), 3),
+            "callback_p99_ms": round(pct(0.99), 3),
+            "callback_max_ms": round(self.max_duration * 1000, 3),
+            # Share of the buffer period the slowest callback used
+            "max_budget": round(self.max_budget, 3),
+            "max_gap_ms": round(self.max_gap * 1000, 3),
+            "events": [(round(at * 1000, 1), name) for at, name in self.events],
+        }
+
+    def summary(self):
+        """One line for the console, or None if the session was clean"""
+        if not self.glitches:
+            return None
+        parts = [f"{count} {name.replace('_', ' ')}" for name, count in self.flags.items()]
+        if self.overruns:
+            parts.append(f"{self.overruns} callback overruns "
+                         f"(max {self.max_duration * 1000:.1f} ms)")
+        return f"⚠️  Audio {self.stream} glitches: " + ", ".join(parts)
@@ -1,17 +1,29 @@
-import sounddevice as sd
-import soundfile as sf
 import time
-import numpy as np
 from pathlib import Path
 import sys
 import threading
 
+from .. import tracing
+from .backends import get_output_backend
+from .glitches import GlitchMonitor
+
 class AudioPlayer:
-    def __init__(self):
-        """Initialize the audio player"""
+    def __init__(self, backend=None, earcons=None):
+        """Initialize the audio player
+
+        Args:
+            backend: AudioOutputBackend to play through; defaults to the one
+                named by AUDIO_BACKEND (real PortAudio devices)
+            earcons: Optional Earcons whose cue is stopped as soon as a
+                response starts playing
+        """
+        self.backend = backend
+        self.earcons = earcons
         self.current_stream = None
         self.terminal_width = self._get_terminal_width()
         self._portaudio_initialized = False
+        # Glitch report of the last playback
+        self.last_glitch_report = None
         
     def _get_terminal_width(self):
         """Get terminal width for visualization"""
@@ -21,76 +33,145 @@ class AudioPlayer:
         except:
             return 80  # fallback width
             
-    def _draw_waveform(self, data, num_bars=50):
-        """Draw a simple waveform visualization"""
-        # Calculate RMS values for chunks of audio
-        chunk_size = len(data) // num_bars
-        chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
-        rms_values = [np.sqrt(np.mean(chunk**2)) for chunk in chunks if len(chunk) > 0]
-        
-        # Normalize RMS values to terminal height
-        max_height = 8  # Maximum height in terminal lines
-        if max(rms_values) > 0:  # Avoid division by zero
-            normalized = [int((v / max(rms_values)) * max_height) for v in rms_values]
+    def _draw_waveform(self, source, num_bars=50):
+        """Draw a simple waveform visualization of a buffer or audio file"""
+        from .blockstream import blocks_rms_levels
+        from .waveform import render_levels, rms_levels
+        if isinstance(source, (str, Path)):
+            levels = blocks_rms_levels(source, num_bars)
         else:
-            normalized = [0] * len(rms_values)
-        
-        # Draw waveform
-        waveform = ''
-        blocks = '▁▂▃▄▅▆▇█'  # Unicode blocks for visualization
-        for height in normalized:
-            if height >= len(blocks):
-                height = len(blocks) - 1
-            waveform += blocks[height]
-            
+            levels = rms_levels(source, num_bars)
         print(f"\n📊 Waveform preview:")
-        print(waveform)
+        print(render_levels(levels))
+        
+    def play_file(self, file_path, waveform="preview", blocksize=8192, max_blocks=4,
+                  cancel_token=None, volume=1.0):
+        """Play an audio file and wait for it to complete
+
+        The file is decoded block by block on a background thread and only
+        `max_blocks` blocks are held in memory, so playback starts after the
+        first block and memory use doesn't grow with the file's duration.
+
+        Args:
+            file_path: Path of the audio file to play
+            waveform: "preview" draws the whole-file waveform in the
+                background once playback has started, "live" updates the
+                bars from the chunks as they are played, None disables it
+            blocksize: Frames decoded per block
+            max_blocks: Decoded blocks allowed to wait ahead of playback
+            cancel_token: Optional CancelToken; cancelling it aborts playback
+                and drops any queued blocks
+            volume: Gain applied to every sample, clipped to [-1, 1]
+
+        Returns True if the file played to the end.
+        """
+        # numpy/soundfile load on first playback rather than at startup
+        from .blockstream import BlockStream
+        from .waveform import WaveformMeter
         
-    def play_file(self, file_path):
-        """Play an audio file and wait for it to complete"""
+        source = None
         try:
             print(f"\n🔊 Playing response...")
             
-            # Load the audio file
-            data, samplerate = sf.read(file_path)
+            # Start decoding and wait only for the first block
+            source = BlockStream(file_path, blocksize=blocksize, max_blocks=max_blocks)
+            source.start()
+            source.wait_ready()
             
-            # Show waveform preview
-            self._draw_waveform(data)
+            if self.backend is None:
+                self.backend = get_output_backend()
+            output = self.backend
+            
+            meter = None
+            if waveform == "live":
+                meter = WaveformMeter(samples_per_bar=max(1, source.frames // 50))
             
             # Create an event to track when playback is finished
             finished = threading.Event()
+            remove_cancel = None
+            if cancel_token is not None:
+                remove_cancel = cancel_token.on_cancel(finished.set)
             
-            def callback(outdata, frames, time, status):
-                if status:
-                    print(f'\nStatus: {status}')
-                    
-                # Get the next chunk of data
-                if len(data) > 0:
-                    chunk = data[:frames]
-                    outdata[:len(chunk)] = chunk
-                    data = data[frames:]
-                else:
-                    print()  # New line after playback
-                    finished.set()
-                    raise sd.CallbackStop()
+            trace = tracing.current()
+            glitches = GlitchMonitor('output', source.samplerate)
+            earcons = self.earcons
+            first_block = [True]
+            
+            def callback(outdata, frames, time_info, status):
+                started = time.perf_counter()
+                try:
+                    # Get the next chunk of data
+                    written = source.read_into(outdata)
+                    if volume != 1.0 and written:
+                        block = outdata[:written]
+                        block *= volume
+                        block.clip(-1.0, 1.0, out=block)
+                    if written and first_block[0]:
+                        first_block[0] = False
+                        # The real response takes over from the "thinking" cue
+                        if earcons is not None:
+                            earcons.stop()
+                        if trace is not None and 'first_audio_out' not in trace.marks:
+                            trace.mark('first_audio_out')
+                    if meter is not None and written:
+                        meter.update(outdata[:written])
+                    if source.finished:
+                        finished.set()
+                        raise output.CallbackStop()
+                finally:
+                    glitches.callback(started, status, frames)
             
             # Start playback
-            self.current_stream = sd.OutputStream(
-                samplerate=samplerate,
-                channels=len(data.shape) if len(data.shape) > 1 else 1,
+            self.current_stream = output.open(
+                samplerate=source.samplerate,
+                channels=source.channels,
+                dtype='float32',
                 callback=callback
             )
             self._portaudio_initialized = True
             
-            with self.current_stream:
-                finished.wait()  # Wait for playback to finish
+            playback_started = time.perf_counter()
+            self.current_stream.start()
+            # Waveform work stays off the critical path to the first sample
+            if meter is not None:
+                meter.start()
+            elif waveform:
+                threading.Thread(
+                    target=self._draw_waveform, args=(file_path,), daemon=True
+                ).start()
+            finished.wait()  # Wait for playback to finish or a cancel
+            if remove_cancel:
+                remove_cancel()
+            self.last_glitch_report = glitches.report()
+            if trace is not None:
+                trace.add_span('playback', playback_started)
+                trace.set(playback_glitches=self.last_glitch_report)
+            summary = glitches.summary()
+            if summary:
+                print(f"\n{summary}")
+            
+            if cancel_token is not None and cancel_token.cancelled:
+                # Barge-in: drop buffered output instead of draining it
+                self.stop(abort=True)
+                if meter is not None:
+                    meter.stop()
+                print("⏹️  Playback cancelled")
+                return False
+            self.stop()
                 
+            if meter is not None:
+                meter.stop()
+            if source.error:
+                raise source.error
             print("✅ Playback complete")
             return True
             
         except Exception as e:
             print(f"❌ Error during playback: {e}")
             return False
+        finally:
+            if source is not None:
+                source.close()
             
     def cleanup(self):
         """Clean up all audio resources"""
@@ -99,18 +180,24 @@ class AudioPlayer:
             # Only terminate if we actually had a stream
             if self.current_stream is not None and self._portaudio_initialized:
                 try:
-                    sd._terminate()
+                    self.backend.terminate()
                 except Exception as e:
                     print(f"Error terminating PortAudio: {e}")
                 self._portaudio_initialized = False
         except Exception as e:
             print(f"Error during audio player cleanup: {e}")
             
-    def stop(self):
-        """Stop any current playback"""
+    def stop(self, abort=False):
+        """Stop any current playback
+
+        With abort=True buffered output is discarded instead of played out.
+        """
         if self.current_stream:
             try:
-                self.current_stream.stop()
+                if abort:
+                    self.current_stream.abort()
+                else:
+                    self.current_stream.stop()
                 self.current_stream.close()
             except:
                 pass
@@ -1,6 +1,9 @@
-import pyaudio
 import logging
 import atexit
+import time
+
+from .backends import ABORT, CONTINUE, get_input_backend
+from .glitches import GlitchMonitor
 
 logger = logging.getLogger(__name__)
 
@@ -35,14 +38,29 @@ atexit.register(_cleanup_at_exit)
 def get_pa_instance():
     global _pa_instance
     if _pa_instance is None:
+        import pyaudio
         _pa_instance = pyaudio.PyAudio()
     return _pa_instance
 
 class AudioRecorder:
-    def __init__(self):
+    RATE = 44100
+    CHANNELS = 1
+    FRAMES_PER_BUFFER = 1024
+    
+    def __init__(self, backend=None):
+        """Create a recorder
+
+        Args:
+            backend: AudioInputBackend to capture from; defaults to the one
+                named by AUDIO_BACKEND (real PortAudio devices)
+        """
+        self.backend = backend
         self.stream = None
         self.frames = []
         self.has_data = False
+        self.glitches = None
+        # Glitch report of the last finished recording
+        self.last_glitch_report = None
         
     def cleanup(self):
         """Clean up all resources"""
@@ -61,19 +79,19 @@ class AudioRecorder:
 
     def start(self):
         try:
-            pa = get_pa_instance()
-            self.stream = pa.open(
-                format=pyaudio.paFloat32,
-                channels=1,
-                rate=44100,
-                input=True,
-                frames_per_buffer=1024,
-                stream_callback=self._audio_callback
+            if self.backend is None:
+                self.backend = get_input_backend()
+            self.has_data = False
+            self.frames = []
+            self.glitches = GlitchMonitor('input', self.RATE, self.FRAMES_PER_BUFFER)
+            self.stream = self.backend.open(
+                rate=self.RATE,
+                channels=self.CHANNELS,
+                frames_per_buffer=self.FRAMES_PER_BUFFER,
+                callback=self._audio_callback
             )
             self.stream.start_stream()
             logger.debug("Audio recording started successfully")
-            self.has_data = False
-            self.frames = []
         except Exception as e:
             logger.error(f"Failed to start audio recording: {e}")
             self.cleanup()
@@ -88,6 +106,7 @@ class AudioRecorder:
             # Get audio data before closing anything
             audio_data = b''.join(self.frames) if self.frames else None
             self.has_data = bool(audio_data)
+            self._finish_glitches()
             
             # Clean up resources
             self.cleanup()
@@ -99,15 +118,33 @@ class AudioRecorder:
             self.cleanup()
             return None
 
+    def snapshot(self):
+        """The audio recorded so far, without stopping"""
+        return b''.join(list(self.frames))
+
+    def _finish_glitches(self):
+        if self.glitches is None:
+            return
+        self.last_glitch_report = self.glitches.report()
+        summary = self.glitches.summary()
+        if summary:
+            logger.warning(summary)
+        self.glitches = None
+
     def _audio_callback(self, in_data, frame_count, time_info, status):
-        if status:
-            logger.warning(f"Audio callback status: {status}")
+        started = time.perf_counter()
         try:
             self.frames.append(in_data)
-            return (None, pyaudio.paContinue)
+            return (None, CONTINUE)
         except Exception as e:
             logger.error(f"Audio callback error: {e}")
-            return (None, pyaudio.paAbort)
+            return (None, ABORT)
+        finally:
+            # Counted here and reported when recording stops; no logging
+            # inside the callback
+            glitches = self.glitches
+            if glitches is not None:
+                glitches.callback(started, status, frame_count)
 
 # Test the recorder
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+import sys
+import threading
+import numpy as np
+
+BLOCKS = '▁▂▃▄▅▆▇█'  # Unicode blocks for visualization
+_BLOCK_ARRAY = np.array(list(BLOCKS))
+
+
+def _to_mono(data):
+    """Return float32 mono samples, averaging channels if needed"""
+    samples = np.asarray(data, dtype=np.float32)
+    if samples.ndim > 1:
+        samples = samples.mean(axis=1)
+    return samples
+
+
+def rms_levels(data, num_bars=50):
+    """Compute one RMS value per bar with a single reshape over the buffer.
+
+    Trailing samples that don't fill a whole bar are ignored.
+    """
+    samples = _to_mono(data)
+    chunk_size = len(samples) // num_bars
+    if chunk_size == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:chunk_size * num_bars].reshape(num_bars, chunk_size)
+    return np.sqrt(np.einsum('ij,ij->i', frames, frames) / chunk_size)
+
+
+def render_levels(levels, max_height=8):
+    """Map RMS levels to a string of block characters"""
+    levels = np.asarray(levels, dtype=np.float32)
+    if len(levels) == 0:
+        return ''
+    peak = levels.max()
+    if peak <= 0:  # Avoid division by zero
+        return BLOCKS[0] * len(levels)
+    heights = (levels * (max_height / peak)).astype(np.intp)
+    np.clip(heights, 0, len(BLOCKS) - 1, out=heights)
+    return ''.join(_BLOCK_ARRAY[heights])
+
+
+class WaveformMeter:
+    """Incremental waveform display fed from streaming audio chunks.
+
+    `update()` is cheap enough to call from the audio callback: it only
+    accumulates a sum of squares. Drawing happens on a separate thread
+    started with `start()`, so the callback never touches the terminal.
+    """
+
+    def __init__(self, num_bars=50, samples_per_bar=2048, refresh_interval=0.1,
+                 stream=None):
+        self.num_bars = num_bars
+        self.samples_per_bar = max(1, int(samples_per_bar))
+        self.refresh_interval = refresh_interval
+        self.stream = stream or sys.stdout
+        self._levels = np.zeros(num_bars, dtype=np.float32)
+        self._bar_count = 0
+        self._sum_squares = 0.0
+        self._pending = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def levels(self):
+        """Completed bar levels, oldest first (at most `num_bars`)"""
+        count = min(self._bar_count, self.num_bars)
+        if self._bar_count <= self.num_bars:
+            return self._levels[:count].copy()
+        start = self._bar_count % self.num_bars
+        return np.roll(self._levels, -start)
+
+    def update(self, chunk):
+        """Accumulate a chunk of played samples into the current bar"""
+        samples = _to_mono(chunk)
+        offset = 0
+        while offset < len(samples):
+            take = min(self.samples_per_bar - self._pending, len(samples) - offset)
+            part = samples[offset:offset + take]
+            self._sum_squares += float(np.dot(part, part))
+            self._pending += take
+            offset += take
+            if self._pending == self.samples_per_bar:
+                level = np.sqrt(self._sum_squares / self.samples_per_bar)
+                self._levels[self._bar_count % self.num_bars] = level
+                self._bar_count += 1
+                self._sum_squares = 0.0
+                self._pending = 0
+
+    def render(self):
+        """Return the current bar display"""
+        return render_levels(self.levels)
+
+    def _draw_loop(self):
+        drawn = -1
+        while not self._stop.wait(self.refresh_interval):
+            if self._bar_count != drawn:
+                drawn = self._bar_count
+                self.stream.write(f"\r📊 {self.render()}")
+                self.stream.flush()
+
+    def start(self):
+        """Start redrawing the display in the background"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._draw_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop redrawing and finish the display line"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+            self.stream.write(f"\r📊 {self.render()}\n")
+            self.stream.flush()
@@ -0,0 +1,3 @@
+from .services import Latency, MockAnthropic, MockTTS, SimulatedWhisper
+
+__all__ = ['Latency', 'MockAnthropic', 'MockTTS', 'SimulatedWhisper']
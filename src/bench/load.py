@@ -0,0 +1,355 @@
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+
+from .replay import build_pipeline, load_corpus, simulated_whisper, synthetic_corpus
+from .services import MockAnthropic, MockTTS
+
+# Utterance-length classes for --mix, in seconds: [low, high)
+LENGTH_CLASSES = {
+    'short': (0.0, 2.0),
+    'medium': (2.0, 6.0),
+    'long': (6.0, float('inf')),
+}
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted values (0 for none)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+class UtteranceMix:
+    """Picks utterances from a corpus by length class
+
+    `weights` maps a LENGTH_CLASSES name to its share of requests, e.g.
+    {'short': 0.6, 'medium': 0.3, 'long': 0.1}; classes with no clips in
+    the corpus are dropped. Without weights every clip is equally likely.
+    """
+
+    def __init__(self, corpus, weights=None, rng=None):
+        self.rng = rng or random.Random(0)
+        self._lock = threading.Lock()
+        if not weights:
+            self.classes = [('all', 1.0, list(corpus))]
+            return
+        self.classes = []
+        for name, weight in weights.items():
+            if name not in LENGTH_CLASSES:
+                raise ValueError(f"unknown length class {name!r}; expected one of "
+                                 f"{tuple(LENGTH_CLASSES)}")
+            low, high = LENGTH_CLASSES[name]
+            items = [item for item in corpus if low <= item.duration < high]
+            if items and weight > 0:
+                self.classes.append((name, weight, items))
+        if not self.classes:
+            raise ValueError("no corpus clips match the requested mix")
+
+    @classmethod
+    def parse(cls, corpus, spec, rng=None):
+        """From "short=0.6,medium=0.3,long=0.1" (empty means uniform)"""
+        weights = {}
+        for part in filter(None, (spec or '').split(',')):
+            name, _, weight = part.partition('=')
+            weights[name.strip()] = float(weight or 1)
+        return cls(corpus, weights, rng)
+
+    def pick(self):
+        with self._lock:
+            _, _, items = self.rng.choices(self.classes, [w for _, w, _ in self.classes])[0]
+            return self.rng.choice(items)
+
+
+def outcome_for(path):
+    """Classify a pipeline result path"""
+    if not path:
+        return 'error'
+    if os.path.basename(path) == 'busy.mp3':
+        return 'shed'
+    return 'ok'
+
+
+class PipelineTarget:
+    """An in-process pipeline behind a JobExecutor, as the daemon runs it"""
+
+    def __init__(self, pipeline, workers=None, max_pending=64):
+        from ..processing import JobExecutor
+        from ..processing.admission import job_workers
+
+        self.pipeline = pipeline
+        # By default as many as the daemon would run for this pipeline
+        self.executor = JobExecutor(max_pending=max_pending, name="load-worker",
+                                    workers=workers or job_workers(pipeline))
+
+    def call(self, item):
+        """Process one utterance; returns (seconds queued, outcome)"""
+        arrived = time.perf_counter()
+        done = threading.Event()
+        result = {"queued": 0.0, "outcome": 'error'}
+
+        def job():
+            result["queued"] = time.perf_counter() - arrived
+            try:
+                result["outcome"] = outcome_for(self.pipeline.process(item.audio, item.screenshot))
+            finally:
+                done.set()
+
+        if not self.executor.submit(job):
+            return 0.0, 'rejected'
+        done.wait()
+        return result["queued"], result["outcome"]
+
+    def close(self):
+        self.executor.shutdown()
+
+
+class DaemonTarget:
+    """A running AssistantDaemon, reached through DaemonClient"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def call(self, item):
+        from ..daemon import DaemonError
+
+        try:
+            reply = self.client.request('process', item.audio, screenshot_path=item.screenshot)
+        except DaemonError as e:
+            return 0.0, 'rejected' if str(e) == 'busy' else 'error'
+        return reply.get("queued", 0.0), outcome_for(reply.get("response_path"))
+
+    def close(self):
+        self.client.close()
+
+
+class _Request:
+    __slots__ = ('item', 'arrived', 'queued', 'finished', 'outcome')
+
+    def __init__(self, item):
+        self.item = item
+        self.arrived = time.perf_counter()
+        self.queued = 0.0
+        self.finished = None
+        self.outcome = None
+
+    @property
+    def latency(self):
+        return self.finished - self.arrived
+
+
+def _send(target, request):
+    try:
+        request.queued, request.outcome = target.call(request.item)
+    except Exception as e:
+        print(f"Load request failed: {e}")
+        request.outcome = 'error'
+    request.finished = time.perf_counter()
+
+
+def run_closed(target, mix, users, duration, think=None, rng=None):
+    """`users` clients each send, wait for the answer, think, and repeat
+
+    `think` is the mean think time in seconds (exponentially distributed);
+    None sends back to back. Returns the requests and the elapsed time.
+    """
+    rng = rng or random.Random(0)
+    requests = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def user(user_rng):
+        while time.perf_counter() < stop_at:
+            request = _Request(mix.pick())
+            with lock:
+                requests.append(request)
+            _send(target, request)
+            if think:
+                pause = user_rng.expovariate(1 / think)
+                time.sleep(min(pause, max(0.0, stop_at - time.perf_counter())))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(random.Random(rng.random()),),
+                                name=f"load-user-{i}", daemon=True)
+               for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return requests, time.perf_counter() - started
+
+
+def run_open(target, mix, rate, duration, arrival='poisson', rng=None):
+    """Requests arrive at `rate` per second regardless of how fast they finish
+
+    `arrival` is "poisson" (exponential gaps) or "uniform" (evenly spaced).
+    Waits for every request to finish; returns the requests and the
+    elapsed time.
+    """
+    if arrival not in ('poisson', 'uniform'):
+        raise ValueError(f"unknown arrival process {arrival!r}")
+    rng = rng or random.Random(0)
+    requests, threads = [], []
+    started = time.perf_counter()
+    next_at = started
+    while True:
+        next_at += rng.expovariate(rate) if arrival == 'poisson' else 1 / rate
+        if next_at - started >= duration:
+            break
+        time.sleep(max(0.0, next_at - time.perf_counter()))
+        request = _Request(mix.pick())
+        requests.append(request)
+        thread = threading.Thread(target=_send, args=(target, request), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return requests, time.perf_counter() - started
+
+
+def summarize_level(level, requests, elapsed):
+    """Throughput, queueing delay and end-to-end latency for one load level"""
+    finished = [r for r in requests if r.finished is not None]
+    ok = [r for r in finished if r.outcome == 'ok']
+    latencies = sorted(r.latency * 1000 for r in ok)
+    queued = sorted(r.queued * 1000 for r in ok)
+    outcomes = {}
+    for request in finished:
+        outcomes[request.outcome] = outcomes.get(request.outcome, 0) + 1
+    return {
+        "level": level,
+        "requests": len(requests),
+        "outcomes": outcomes,
+        "throughput": len(ok) / elapsed if elapsed else 0.0,
+        "audio_seconds_per_s": sum(r.item.duration for r in ok) / elapsed if elapsed else 0.0,
+        "queue_p50": percentile(queued, 50),
+        "queue_p99": percentile(queued, 99),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+    }
+
+
+def sweep(target, mix, levels, duration, mode='closed', think=None, arrival='poisson', seed=0):
+    """Run each load level in turn; returns one summarize_level() dict per level
+
+    In closed mode a level is a number of concurrent users; in open mode it
+    is an arrival rate in requests per second.
+    """
+    results = []
+    for index, level in enumerate(levels):
+        rng = random.Random(seed + index)
+        if mode == 'closed':
+            requests, elapsed = run_closed(target, mix, int(level), duration, think, rng)
+        else:
+            requests, elapsed = run_open(target, mix, level, duration, arrival, rng)
+        results.append(summarize_level(level, requests, elapsed))
+    return results
+
+
+def format_table(results, mode='closed'):
+    unit = 'users' if mode == 'closed' else 'req/s'
+    lines = [f"{unit:>7} {'sent':>6} {'ok':>5} {'shed':>5} {'err':>5} {'tput/s':>7} "
+             f"{'queue p50':>10} {'queue p99':>10} {'e2e p50':>9} {'e2e p95':>9} {'e2e p99':>9}"]
+    for r in results:
+        outcomes = r["outcomes"]
+        lines.append(
+            f"{r['level']:>7g} {r['requests']:>6} {outcomes.get('ok', 0):>5} "
+            f"{outcomes.get('shed', 0) + outcomes.get('rejected', 0):>5} "
+            f"{outcomes.get('error', 0):>5} {r['throughput']:>7.2f} "
+            f"{r['queue_p50']:>8.0f}ms {r['queue_p99']:>8.0f}ms {r['latency_p50']:>7.0f}ms "
+            f"{r['latency_p95']:>7.0f}ms {r['latency_p99']:>7.0f}ms")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Simulate concurrent assistant users against offline API stand-ins")
+    parser.add_argument('corpus', nargs='?', default=os.path.join('benchmarks', 'corpus'),
+                        help="Directory of .wav utterances (default: synthetic clips)")
+    parser.add_argument('--target', choices=('pipeline', 'daemon'), default='pipeline',
+                        help="In-process pipeline, or a daemon serving it over its socket")
+    parser.add_argument('--socket', help="Drive an already running daemon at this socket")
+    parser.add_argument('--mode', choices=('closed', 'open'), default='closed',
+                        help="closed: N users wait for each answer; open: fixed arrival rate")
+    parser.add_argument('--levels', default='1,2,4,8',
+                        help="Users (closed) or requests/s (open) per step")
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds per level")
+    parser.add_argument('--think', type=float, default=1.0,
+                        help="Closed mode: mean think time between a user's requests")
+    parser.add_argument('--arrival', choices=('poisson', 'uniform'), default='poisson')
+    parser.add_argument('--mix', default='',
+                        help="Length mix, e.g. short=0.6,medium=0.3,long=0.1 (default: uniform)")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="ASR workers (server mode above 1); the job executor is sized "
+                             "to the pipeline's stage limits")
+    parser.add_argument('--max-pending', type=int, default=16)
+    parser.add_argument('--asr', choices=('simulated', 'whisper'), default='simulated')
+    parser.add_argument('--rtf', type=float, default=0.15)
+    parser.add_argument('--llm-ttft', default='lognormal:0.4,0.3')
+    parser.add_argument('--llm-token-interval', default='fixed:0.015')
+    parser.add_argument('--tts-ttfb', default='lognormal:0.25,0.3')
+    parser.add_argument('--tts-chunk-interval', default='fixed:0.005')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the per-level results as JSON here")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.corpus):
+        corpus = load_corpus(args.corpus)
+    else:
+        print(f"No corpus at {args.corpus}; using synthetic utterances")
+        corpus = synthetic_corpus(count=12, max_seconds=10.0)
+    mix = UtteranceMix.parse(corpus, args.mix, random.Random(args.seed))
+    levels = [float(level) for level in args.levels.split(',')]
+
+    services, daemon, pipeline = [], None, None
+    try:
+        if args.socket:
+            from ..daemon import DaemonClient
+            target = DaemonTarget(DaemonClient(args.socket).connect())
+        else:
+            services = [MockAnthropic(args.llm_ttft, args.llm_token_interval, seed=args.seed),
+                        MockTTS(args.tts_ttfb, args.tts_chunk_interval, seed=args.seed + 1)]
+            for service in services:
+                service.start()
+            whisper = simulated_whisper(corpus, args.rtf) if args.asr == 'simulated' else None
+            pipeline = build_pipeline(services[0].url, services[1].url, whisper,
+                                      asr_workers=args.workers)
+            pipeline.busy_response()
+            if args.target == 'daemon':
+                from ..daemon import AssistantDaemon, DaemonClient
+                path = os.path.join(tempfile.mkdtemp(), 'load.sock')
+                daemon = AssistantDaemon(path, pipeline=pipeline, max_pending=args.max_pending,
+                                         asr_workers=args.workers)
+                daemon.start()
+                target = DaemonTarget(DaemonClient(path).connect())
+            else:
+                target = PipelineTarget(pipeline, max_pending=args.max_pending)
+
+        results = sweep(target, mix, levels, args.duration, args.mode, args.think,
+                        args.arrival, args.seed)
+        target.close()
+    finally:
+        if daemon is not None:
+            daemon.shutdown()
+        if pipeline is not None:
+            pipeline.cleanup()
+        for service in services:
+            service.stop()
+
+    print()
+    print(format_table(results, args.mode))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"config": vars(args), "levels": results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
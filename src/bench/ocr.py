@@ -0,0 +1,166 @@
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from ..processing.ocr import ScreenOcr, text_tokens
+from ..processing.screen_gate import image_tokens
+
+DEFAULT_SCREENS = os.path.join('benchmarks', 'screens')
+
+# Text for the synthetic screens: a terminal and an editor full of code
+SAMPLE_LINES = (
+    "$ python -m pytest -q tests/unit/test_processing",
+    "FAILED tests/unit/test_processing/test_slo.py::test_recovers - AssertionError",
+    "E       AssertionError: 2 != 1",
+    "def settings_for(level):",
+    "    settings = dict(DEFAULT_SETTINGS)",
+    "    for _, overrides in LADDER[1:level + 1]:",
+    "        settings.update(overrides)",
+    "    return settings",
+    "Traceback (most recent call last):",
+    "  File \"src/processing/pipeline.py\", line 342, in get_ai_response",
+    "ValueError: unknown SCREENSHOT_GATE 'sometimes'",
+)
+
+
+def synthetic_screens(directory, count=3, size=(1440, 900)):
+    """Render `count` text-heavy screenshots into `directory`; returns their paths"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.load_default(size=20)
+    paths = []
+    for index in range(count):
+        image = Image.new('RGB', size, (30, 30, 30))
+        draw = ImageDraw.Draw(image)
+        for row in range(size[1] // 28 - 1):
+            line = SAMPLE_LINES[(row + index) % len(SAMPLE_LINES)]
+            draw.text((20, 14 + row * 28), line, fill=(220, 220, 220), font=font)
+        path = os.path.join(directory, f"screen_{index}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def find_screens(paths):
+    """The .png files among `paths`, looking inside directories"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith('.png'))
+        elif os.path.exists(path):
+            found.append(path)
+    return found
+
+
+def measure(path, ocr, repeat=3, uplink_mbps=10.0):
+    """Tokens, bytes and time of one screenshot sent as an image and as text"""
+    import base64
+
+    encode = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with open(path, 'rb') as f:
+            image = base64.b64encode(f.read())
+        encode.append(time.perf_counter() - started)
+    reads = [ocr.extract(path) for _ in range(repeat)]
+    if any(result is None for result in reads):
+        return None
+    result = reads[-1]
+    text = f"Text on my screen near the cursor (OCR):\n```\n{result.text}\n```"
+    thumbnail = ocr._thumbnail(path)
+
+    def upload_ms(size):
+        return size * 8 / (uplink_mbps * 1e6) * 1000
+
+    text_bytes = len(text.encode())
+    thumbnail_bytes = len(base64.b64encode(thumbnail[0])) if thumbnail else 0
+    return {
+        "screen": os.path.basename(path),
+        "confidence": round(result.confidence, 1),
+        "words": result.words,
+        "used": result.words >= ocr.min_words and result.confidence >= ocr.min_confidence,
+        "image": {
+            "tokens": image_tokens(path),
+            "bytes": len(image),
+            "prepare_ms": round(statistics.median(encode) * 1000, 1),
+            "upload_ms": round(upload_ms(len(image)), 1),
+        },
+        "text": {
+            "tokens": text_tokens(text),
+            "bytes": text_bytes,
+            "prepare_ms": round(statistics.median(r.seconds for r in reads) * 1000, 1),
+            "upload_ms": round(upload_ms(text_bytes), 1),
+        },
+        "thumbnail": {
+            "tokens": text_tokens(text) + (thumbnail[1] if thumbnail else 0),
+            "bytes": text_bytes + thumbnail_bytes,
+            "upload_ms": round(upload_ms(text_bytes + thumbnail_bytes), 1),
+        },
+    }
+
+
+def format_table(results):
+    lines = [f"{'screen':<20} {'conf':>5} {'used':>5} {'mode':>10} {'tokens':>7} "
+             f"{'bytes':>9} {'prep':>8} {'upload':>8}"]
+    for r in results:
+        for mode in ('image', 'text', 'thumbnail'):
+            row = r[mode]
+            prepare = row.get('prepare_ms', r['text']['prepare_ms'])
+            lines.append(
+                f"{r['screen'] if mode == 'image' else '':<20} "
+                f"{r['confidence'] if mode == 'image' else '':>5} "
+                f"{('yes' if r['used'] else 'no') if mode == 'image' else '':>5} "
+                f"{mode:>10} {row['tokens']:>7} {row['bytes']:>9} "
+                f"{prepare:>6.0f}ms {row['upload_ms']:>6.0f}ms")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compare sending screenshots as images with sending their OCR text")
+    parser.add_argument('screens', nargs='*', default=[DEFAULT_SCREENS],
+                        help="Screenshots or directories of .png files "
+                             "(default: synthetic terminal and editor screens)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--region', type=float, default=1.0,
+                        help="Share of width and height read around the recorded cursor")
+    parser.add_argument('--uplink-mbps', type=float, default=10.0,
+                        help="Upload bandwidth for the estimated transfer time")
+    parser.add_argument('--output', help="Also write the results as JSON here")
+    args = parser.parse_args(argv)
+
+    ocr = ScreenOcr(region=args.region)
+    with tempfile.TemporaryDirectory() as scratch:
+        screens = find_screens(args.screens)
+        if not screens:
+            print(f"No screenshots at {', '.join(args.screens)}; using synthetic screens")
+            screens = synthetic_screens(scratch)
+        results = []
+        for path in screens:
+            result = measure(path, ocr, args.repeat, args.uplink_mbps)
+            if result is None:
+                print("OCR failed; is Tesseract installed (pip install pytesseract, "
+                      "plus the tesseract binary)?")
+                return 1
+            results.append(result)
+
+    print(format_table(results))
+    image = sum(r["image"]["tokens"] or 0 for r in results)
+    text = sum(r["text"]["tokens"] for r in results)
+    if text:
+        print(f"\nText mode sends {image / text:.1f}x fewer input tokens than image mode "
+              f"({text} vs {image}). OCR runs at key-down, while the user is speaking, "
+              f"so its time is off the critical path unless the recording is shorter.")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,270 @@
+import json
+import os
+import time
+
+from .. import tracing
+from .services import MockAnthropic, MockTTS, SimulatedWhisper
+
+# Rate the recorder captures at; pipeline.process() expects float32 frames at it
+RECORD_RATE = 44100
+
+DEFAULT_CORPUS = os.path.join('benchmarks', 'corpus')
+DEFAULT_BASELINE = os.path.join('benchmarks', 'baseline.json')
+
+# Percentiles compared against the baseline
+COMPARED = ('p50', 'p95')
+
+
+class CorpusItem:
+    """One recorded utterance, with the screenshot taken alongside it
+
+    `audio` is float32 mono bytes at RECORD_RATE, as the recorder delivers.
+    `transcript` is the expected text from a sidecar .txt, if there is one.
+    """
+
+    def __init__(self, name, audio, screenshot=None, transcript=None):
+        self.name = name
+        self.audio = audio
+        self.screenshot = screenshot
+        self.transcript = transcript
+
+    @property
+    def frames(self):
+        return len(self.audio) // 4
+
+    @property
+    def duration(self):
+        return self.frames / RECORD_RATE
+
+
+def read_audio(path, rate=RECORD_RATE):
+    """A WAV file as float32 mono bytes at `rate`"""
+    import soundfile as sf
+
+    data, source_rate = sf.read(path, dtype='float32', always_2d=True)
+    return resample(data.mean(axis=1), source_rate, rate).tobytes()
+
+
+def resample(samples, source_rate, rate):
+    import numpy as np
+
+    samples = np.asarray(samples, dtype=np.float32)
+    if source_rate == rate or not len(samples):
+        return samples
+    count = int(round(len(samples) * rate / source_rate))
+    positions = np.arange(count) * (source_rate / rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+def load_corpus(directory):
+    """Every <name>.wav in `directory`, with <name>.png and <name>.txt if present"""
+    items = []
+    for filename in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() != '.wav':
+            continue
+        base = os.path.join(directory, name)
+        screenshot = base + '.png' if os.path.exists(base + '.png') else None
+        transcript = None
+        if os.path.exists(base + '.txt'):
+            with open(base + '.txt') as f:
+                transcript = f.read().strip()
+        items.append(CorpusItem(name, read_audio(base + '.wav'), screenshot, transcript))
+    return items
+
+
+def synthetic_corpus(count=5, min_seconds=1.0, max_seconds=4.0):
+    """Speech-like clips of increasing length, for runs without a recorded corpus"""
+    from ..processing.warmup import WHISPER_RATE, synthetic_utterance
+
+    items = []
+    for i in range(count):
+        seconds = min_seconds + (max_seconds - min_seconds) * i / max(1, count - 1)
+        audio = resample(synthetic_utterance(seconds), WHISPER_RATE, RECORD_RATE)
+        items.append(CorpusItem(f"synthetic-{i}", audio.tobytes()))
+    return items
+
+
+def simulated_whisper(corpus, rtf=0.1):
+    return SimulatedWhisper({item.frames: item.transcript for item in corpus if item.transcript},
+                            rtf=rtf)
+
+
+def build_pipeline(anthropic_url, tts_url, whisper=None, **options):
+    """A ProcessingPipeline whose API clients talk to the mock services
+
+    With `whisper` (e.g. a SimulatedWhisper) that object replaces the real
+    model; otherwise Whisper loads as usual. `options` go to the pipeline.
+    """
+    from anthropic import Anthropic
+    from openai import OpenAI
+    from ..processing import ProcessingPipeline
+
+    pipeline = ProcessingPipeline(background=True, **options)
+    pipeline.anthropic_client = Anthropic(api_key='bench', base_url=anthropic_url)
+    pipeline.tts_client = OpenAI(api_key='bench', base_url=tts_url + '/v1')
+    if whisper is not None:
+        pipeline.model = whisper
+    pipeline.load_models(show_progress=False)
+    return pipeline
+
+
+def run_item(pipeline, item, cancel_token=None):
+    """Process one item under a fresh trace; returns the trace's record"""
+    trace = tracing.RequestTrace()
+    # Recording has just stopped: marks are measured from here
+    trace.mark('key_up')
+    outcome = 'error'
+    try:
+        with tracing.activate(trace), trace.span('total'):
+            if pipeline.process(item.audio, item.screenshot, cancel_token):
+                outcome = 'ok'
+    finally:
+        trace.set(item=item.name, outcome=outcome)
+    return trace.to_record()
+
+
+def replay(pipeline, corpus, repeat=3, warmup=1):
+    """Run the corpus `warmup` + `repeat` times; returns the timed runs' records
+
+    Warm-up passes absorb one-time costs (first inference, connection setup)
+    so the breakdown reflects steady state.
+    """
+    records = []
+    for run in range(warmup + repeat):
+        for item in corpus:
+            record = run_item(pipeline, item)
+            if run >= warmup:
+                records.append(record)
+    return records
+
+
+def compare(summary, baseline, tolerance=0.2, min_delta_ms=5.0):
+    """Stages that got slower than the baseline
+
+    A percentile regresses when it exceeds the baseline by more than
+    `tolerance` (relative) and `min_delta_ms` (absolute), so tiny stages
+    don't flap on scheduler noise. Returns [(stage, stat, baseline, current)].
+    """
+    regressions = []
+    for stage, stats in summary.items():
+        base = baseline.get(stage)
+        if not base:
+            continue
+        for stat in COMPARED:
+            if stat not in base:
+                continue
+            limit = max(base[stat] * (1 + tolerance), base[stat] + min_delta_ms)
+            if stats[stat] > limit:
+                regressions.append((stage, stat, base[stat], stats[stat]))
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f).get("stages", {})
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, summary, config):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({"created": time.time(), "config": config, "stages": summary}, f, indent=2)
+
+
+def format_report(summary, baseline=None, regressions=()):
+    flagged = {(stage, stat) for stage, stat, _, _ in regressions}
+    lines = [f"{'stage':<18} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+             + ("  vs baseline p50" if baseline else "")]
+    for stage, stats in summary.items():
+        line = (f"{stage:<18} {stats['count']:>6} {stats['p50']:>9.1f} "
+                f"{stats['p95']:>9.1f} {stats['p99']:>9.1f}")
+        base = (baseline or {}).get(stage)
+        if base and base.get('p50'):
+            change = (stats['p50'] - base['p50']) / base['p50'] * 100
+            line += f"  {change:+15.1f}%"
+        if any((stage, stat) in flagged for stat in COMPARED):
+            line += "  ⚠️  regression"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Replay recorded utterances through the pipeline against local API stand-ins")
+    parser.add_argument('corpus', nargs='?', default=DEFAULT_CORPUS,
+                        help="Directory of .wav files with optional .png screenshots and "
+                             ".txt transcripts (default: a synthetic corpus if it doesn't exist)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1, help="Untimed passes first")
+    parser.add_argument('--asr', choices=('whisper', 'simulated'), default='whisper',
+                        help="Real Whisper, or a stand-in that sleeps --rtf x the clip length")
+    parser.add_argument('--rtf', type=float, default=0.1)
+    parser.add_argument('--llm-ttft', default='normal:0.4,0.1',
+                        help="Time to first token, e.g. fixed:0.3, uniform:0.2,0.6, "
+                             "normal:0.4,0.1, lognormal:0.4,0.3")
+    parser.add_argument('--llm-token-interval', default='fixed:0.015')
+    parser.add_argument('--tts-ttfb', default='normal:0.25,0.05')
+    parser.add_argument('--tts-chunk-interval', default='fixed:0.005')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Relative slowdown allowed before flagging (default: 0.2)")
+    parser.add_argument('--output', help="Also write the trace records as JSONL here")
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.corpus):
+        corpus = load_corpus(args.corpus)
+    else:
+        print(f"No corpus at {args.corpus}; using synthetic utterances")
+        corpus = synthetic_corpus()
+    if not corpus:
+        print(f"No .wav files in {args.corpus}")
+        return 1
+
+    config = {key: getattr(args, key) for key in
+              ('asr', 'rtf', 'llm_ttft', 'llm_token_interval', 'tts_ttfb', 'tts_chunk_interval',
+               'repeat', 'seed')}
+    config["corpus"] = [item.name for item in corpus]
+
+    anthropic = MockAnthropic(args.llm_ttft, args.llm_token_interval, seed=args.seed)
+    tts = MockTTS(args.tts_ttfb, args.tts_chunk_interval, seed=args.seed + 1)
+    with anthropic, tts:
+        whisper = simulated_whisper(corpus, args.rtf) if args.asr == 'simulated' else None
+        pipeline = build_pipeline(anthropic.url, tts.url, whisper)
+        try:
+            records = replay(pipeline, corpus, args.repeat, args.warmup)
+        finally:
+            pipeline.cleanup()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.writelines(json.dumps(record) + "\n" for record in records)
+
+    failed = sum(record.get('outcome') != 'ok' for record in records)
+    summary = tracing.summarize(records)
+    baseline = load_baseline(args.baseline)
+    regressions = compare(summary, baseline, args.tolerance) if baseline else []
+    print(f"\n{len(records)} runs of {len(corpus)} utterances, {failed} failed\n")
+    print(format_report(summary, baseline, regressions))
+
+    if args.update_baseline:
+        save_baseline(args.baseline, summary, config)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to store one")
+    for stage, stat, before, after in regressions:
+        print(f"Regression: {stage} {stat} {before:.1f} ms -> {after:.1f} ms")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
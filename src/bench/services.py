@@ -0,0 +1,285 @@
+import io
+import json
+import math
+import random
+import threading
+import time
+import uuid
+import wave
+
+DEFAULT_RESPONSE = (
+    "Looking at your screen, the test on line 42 fails because the fixture is "
+    "created after the client connects. Move the setup above the connect call "
+    "and run it again."
+)
+
+
+class Latency:
+    """A delay distribution, parsed from a spec string
+
+    Specs (seconds): "fixed:0.2", "uniform:0.1,0.3", "normal:0.3,0.05"
+    (mean, stddev) and "lognormal:0.3,0.5" (median, sigma). Samples are
+    clipped at zero; a bare number means fixed.
+    """
+
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, kind='fixed', params=(0.0,), rng=None):
+        if kind not in self.KINDS:
+            raise ValueError(f"unknown latency distribution {kind!r}; expected one of {self.KINDS}")
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def parse(cls, spec, rng=None):
+        if isinstance(spec, Latency):
+            return spec
+        spec = str(spec)
+        kind, _, params = spec.partition(':')
+        if not params:
+            kind, params = 'fixed', spec
+        return cls(kind, params.split(','), rng)
+
+    def sample(self):
+        p, rng = self.params, self.rng
+        if self.kind == 'fixed':
+            value = p[0]
+        elif self.kind == 'uniform':
+            value = rng.uniform(p[0], p[1])
+        elif self.kind == 'normal':
+            value = rng.gauss(p[0], p[1])
+        else:
+            value = p[0] * math.exp(rng.gauss(0.0, p[1]))
+        return max(0.0, value)
+
+    def __repr__(self):
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+def silence_wav(seconds, rate=24000):
+    """16-bit mono WAV bytes of silence, standing in for synthesized speech"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b'\0\0' * int(seconds * rate))
+    return buffer.getvalue()
+
+
+class _MockService:
+    """A local HTTP server answering like one vendor API
+
+    Runs on 127.0.0.1 with a free port on a background thread; every request
+    gets its own handler thread, so concurrent clients overlap as they would
+    against the real service. Subclasses implement `post(handler, path, body)`.
+    """
+
+    name = None
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._server = None
+        self._thread = None
+
+    def latency(self, spec):
+        return Latency.parse(spec, self.rng)
+
+    def sample(self, latency):
+        # random.Random isn't safe to share between handler threads
+        with self._rng_lock:
+            return latency.sample()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                # Connection priming (see processing.warmup) only needs a reply
+                self._send_json(200, {"data": [], "object": "list"})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length) if length else b''
+                service.requests += 1
+                service.bytes_in += len(body)
+                try:
+                    service.post(self, self.path, json.loads(body or b'{}'))
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _send_json(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def write(self, data):
+                self.wfile.write(data)
+                self.wfile.flush()
+                service.bytes_out += len(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name=f"mock-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def post(self, handler, path, body):
+        raise NotImplementedError
+
+
+class MockAnthropic(_MockService):
+    """Streams /v1/messages as server-sent events, like the Messages API
+
+    The first text delta arrives after `ttft`; each later word after
+    `token_interval`. Usage counts are estimated at four bytes per token.
+    """
+
+    name = 'anthropic'
+
+    def __init__(self, ttft='normal:0.4,0.1', token_interval='fixed:0.015',
+                 response=DEFAULT_RESPONSE, seed=0):
+        super().__init__(seed)
+        self.ttft = self.latency(ttft)
+        self.token_interval = self.latency(token_interval)
+        self.response = response
+
+    def post(self, handler, path, body):
+        if not path.rstrip('/').endswith('/messages'):
+            handler._send_json(404, {"type": "error", "error": {"type": "not_found_error"}})
+            return
+        words = self.response.split(' ')
+        tokens = [word if i == 0 else ' ' + word for i, word in enumerate(words)]
+        input_tokens = max(1, len(json.dumps(body.get('messages', []))) // 4)
+        message = {
+            "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant",
+            "model": body.get('model', 'mock'), "content": [], "stop_reason": None,
+            "stop_sequence": None, "usage": {"input_tokens": input_tokens, "output_tokens": 1},
+        }
+
+        if not body.get('stream'):
+            time.sleep(self.sample(self.ttft) + self.sample(self.token_interval) * len(tokens))
+            message.update(content=[{"type": "text", "text": self.response}],
+                           stop_reason="end_turn",
+                           usage={"input_tokens": input_tokens, "output_tokens": len(tokens)})
+            handler._send_json(200, message)
+            return
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Cache-Control', 'no-cache')
+        handler.end_headers()
+
+        def event(kind, data):
+            handler.write(f"event: {kind}\ndata: {json.dumps(dict(data, type=kind))}\n\n".encode())
+
+        event('message_start', {"message": message})
+        event('content_block_start', {"index": 0, "content_block": {"type": "text", "text": ""}})
+        event('ping', {})
+        time.sleep(self.sample(self.ttft))
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.sample(self.token_interval))
+            event('content_block_delta',
+                  {"index": 0, "delta": {"type": "text_delta", "text": token}})
+        event('content_block_stop', {"index": 0})
+        event('message_delta', {"delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                "usage": {"output_tokens": len(tokens)}})
+        event('message_stop', {})
+
+
+class MockTTS(_MockService):
+    """Answers /v1/audio/speech with streamed audio, like OpenAI's TTS
+
+    The first chunk arrives after `ttfb` and the rest every `chunk_interval`.
+    The audio is `audio` bytes if given, otherwise silence lasting about
+    `seconds_per_word` per input word.
+    """
+
+    name = 'tts'
+
+    def __init__(self, ttfb='normal:0.25,0.05', chunk_interval='fixed:0.005', chunk_size=4096,
+                 audio=None, seconds_per_word=0.3, seed=0):
+        super().__init__(seed)
+        self.ttfb = self.latency(ttfb)
+        self.chunk_interval = self.latency(chunk_interval)
+        self.chunk_size = chunk_size
+        self.audio = audio
+        self.seconds_per_word = seconds_per_word
+
+    def post(self, handler, path, body):
+        if not path.rstrip('/').endswith('/audio/speech'):
+            handler._send_json(404, {"error": {"message": "not found"}})
+            return
+        audio = self.audio
+        if audio is None:
+            words = max(1, len(body.get('input', '').split()))
+            audio = silence_wav(words * self.seconds_per_word)
+
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'audio/mpeg')
+        handler.send_header('Content-Length', str(len(audio)))
+        handler.end_headers()
+        time.sleep(self.sample(self.ttfb))
+        for start in range(0, len(audio), self.chunk_size):
+            if start:
+                time.sleep(self.sample(self.chunk_interval))
+            handler.write(audio[start:start + self.chunk_size])
+
+
+class SimulatedWhisper:
+    """Stands in for a WhisperModel: sleeps `rtf` x the audio length
+
+    Transcripts are looked up by clip length in frames (see
+    replay.CorpusItem), with `default` for unknown clips. Use it where no
+    Whisper model is available or to take ASR variance out of a run.
+    """
+
+    def __init__(self, transcripts=None, rtf=0.1, default="What is on my screen right now?"):
+        self.transcripts = dict(transcripts or {})
+        self.rtf = rtf
+        self.default = default
+
+    def transcribe(self, audio, beam_size=5):
+        from types import SimpleNamespace
+        import soundfile as sf
+
+        if isinstance(audio, str):
+            info = sf.info(audio)
+            frames, duration = info.frames, info.duration
+        else:
+            frames, duration = len(audio), len(audio) / 16000
+        time.sleep(duration * self.rtf)
+        text = self.transcripts.get(frames, self.default)
+        return iter([SimpleNamespace(text=text)]), SimpleNamespace(duration=duration)
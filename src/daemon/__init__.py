@@ -0,0 +1,6 @@
+from .client import DaemonClient, DaemonError
+from .protocol import ProtocolError, default_socket_path
+from .server import AssistantDaemon
+
+__all__ = ['AssistantDaemon', 'DaemonClient', 'DaemonError', 'ProtocolError',
+           'default_socket_path']
@@ -0,0 +1,213 @@
+import itertools
+import os
+import socket
+import threading
+
+from ..processing import CancelledError
+from .protocol import (
+    CANCELLED,
+    ERROR,
+    REQUEST,
+    ProtocolError,
+    default_socket_path,
+    recv_frame,
+    send_frame,
+)
+
+
+
+def _absolute(path):
+    # The daemon may run in another working directory
+    return os.path.abspath(path) if path else path
+
+class DaemonError(Exception):
+    """The daemon rejected or failed a request"""
+
+
+class _Pending:
+    def __init__(self):
+        self.done = threading.Event()
+        self.frame = None
+
+
+class DaemonClient:
+    """Thin front-end for AssistantDaemon.
+
+    `process()` has the same signature as ProcessingPipeline.process, so the
+    hotkey listener can use a client in place of a local pipeline. Several
+    requests may be in flight on one connection; a reader thread matches
+    replies to callers by request id.
+    """
+
+    # Playback gain for this client's responses, as the daemon last reported it
+    volume = 1.0
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path or default_socket_path()
+        self._sock = None
+        self._reader = None
+        self._write_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    @property
+    def connected(self):
+        return self._sock is not None
+
+    @property
+    def ready(self):
+        """Whether the daemon has its models loaded"""
+        return self.connected and self.ping().get("ready", False)
+
+    def connect(self, timeout=1.0):
+        """Connect to the daemon; raises OSError if it isn't running"""
+        if self._sock is not None:
+            return self
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(None)
+        self._sock = sock
+        self._reader = threading.Thread(target=self._read_loop, name="daemon-client",
+                                        daemon=True)
+        self._reader.start()
+        return self
+
+    def close(self):
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if self._reader is not None and self._reader is not threading.current_thread():
+            self._reader.join(timeout=1.0)
+        self._reader = None
+        self._fail_pending()
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_loop(self):
+        sock = self._sock
+        try:
+            while True:
+                frame = recv_frame(sock)
+                if frame is None:
+                    break
+                kind, meta, payload = frame
+                with self._pending_lock:
+                    pending = self._pending.pop(meta.get('id'), None)
+                if pending is not None:
+                    pending.frame = frame
+                    pending.done.set()
+        except (OSError, ProtocolError):
+            pass
+        self._fail_pending()
+
+    def _fail_pending(self):
+        """Wake every waiter; a missing frame means the connection went away"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for waiter in pending.values():
+            waiter.done.set()
+
+    def _send(self, meta, payload=b''):
+        if self._sock is None:
+            raise DaemonError("not connected")
+        with self._write_lock:
+            send_frame(self._sock, REQUEST, meta, payload)
+
+    def request(self, op, payload=b'', cancel_token=None, timeout=None, **meta):
+        """Send one request and wait for its reply meta
+
+        If `cancel_token` is cancelled the daemon is told to stop and
+        CancelledError is raised straight away, without waiting for it.
+        """
+        request_id = next(self._ids)
+        waiter = _Pending()
+        with self._pending_lock:
+            self._pending[request_id] = waiter
+
+        def cancel():
+            waiter.done.set()
+            try:
+                self._send({"op": "cancel", "target": request_id})
+            except (OSError, DaemonError):
+                pass
+
+        remove = None
+        try:
+            self._send(dict(meta, op=op, id=request_id), payload)
+            if cancel_token:
+                remove = cancel_token.on_cancel(cancel)
+            if not waiter.done.wait(timeout):
+                raise TimeoutError(f"daemon did not answer {op!r} within {timeout}s")
+        finally:
+            if remove:
+                remove()
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        if waiter.frame is None:
+            raise DaemonError("connection to daemon lost")
+        kind, reply, _ = waiter.frame
+        if kind == CANCELLED:
+            raise CancelledError()
+        if kind == ERROR:
+            raise DaemonError(reply.get("error", "request failed"))
+        return reply
+
+    def ping(self, timeout=1.0):
+        return self.request('ping', timeout=timeout)
+
+    def stats(self):
+        return self.request('stats', timeout=1.0)
+
+    def process(self, audio_data, screenshot_path=None, cancel_token=None):
+        """Run the full pipeline in the daemon; returns the response path or None"""
+        try:
+            reply = self.request('process', audio_data, cancel_token,
+                                 screenshot_path=_absolute(screenshot_path))
+        except DaemonError as e:
+            print(f"Error in processing pipeline: {e}")
+            return None
+        # Playback gain after a "louder"/"quieter" the daemon answered
+        self.volume = reply.get("volume", self.volume)
+        return reply.get("response_path")
+
+    def transcribe(self, audio_data, sample_rate=44100, cancel_token=None):
+        return self.request('transcribe', audio_data, cancel_token,
+                            sample_rate=sample_rate)["text"]
+
+    def respond(self, text, screenshot_path=None, cancel_token=None):
+        return self.request('respond', cancel_token=cancel_token, text=text,
+                            screenshot_path=_absolute(screenshot_path))["text"]
+
+    def speak(self, text, cancel_token=None):
+        return self.request('speak', cancel_token=cancel_token, text=text)["response_path"]
+
+    # Pipeline interface used by the hotkey listener; the daemon owns loading
+    def load_in_background(self, warmup=False):
+        pass
+
+    def prefetch(self):
+        """Ask the daemon to reload an unloaded model; doesn't wait for a reply"""
+        try:
+            self._send({"op": "prefetch"})
+        except (OSError, DaemonError):
+            pass
+
+    def cleanup(self):
+        self.close()
@@ -0,0 +1,89 @@
+import json
+import os
+import struct
+import tempfile
+
+# Every frame is a fixed header, a small JSON object describing the message
+# and a raw binary payload (recorder float32 frames, usually). Audio never
+# goes through JSON, so a 10 s recording costs one memcpy instead of a
+# base64 round trip.
+#
+#   magic  version  kind  meta length  payload length
+#   2s     B        B     I            I              (network byte order)
+MAGIC = b'AC'
+VERSION = 1
+HEADER = struct.Struct('!2sBBII')
+
+# Frame kinds
+REQUEST = 1
+RESPONSE = 2
+ERROR = 3
+CANCELLED = 4
+
+# Guard against a confused peer making us allocate gigabytes
+MAX_META = 1 << 20
+MAX_PAYLOAD = 64 << 20
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a malformed frame"""
+
+
+def default_socket_path():
+    """ASSISTANT_SOCKET, else a per-user socket in the runtime directory"""
+    path = os.getenv('ASSISTANT_SOCKET')
+    if path:
+        return path
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f'ai-companion-{os.getuid()}.sock')
+
+
+def _frame_head(kind, meta, payload_length):
+    meta_bytes = json.dumps(meta, separators=(',', ':')).encode()
+    return HEADER.pack(MAGIC, VERSION, kind, len(meta_bytes), payload_length) + meta_bytes
+
+
+def encode_frame(kind, meta, payload=b''):
+    """Serialize one frame; `payload` may be any bytes-like object"""
+    return _frame_head(kind, meta, len(payload)) + bytes(payload)
+
+
+def send_frame(sock, kind, meta, payload=b''):
+    """Write one frame; callers sharing a socket must hold a lock
+
+    The payload is sent as-is rather than concatenated into the header.
+    """
+    sock.sendall(_frame_head(kind, meta, len(payload)))
+    if len(payload):
+        sock.sendall(payload)
+
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            if received:
+                raise ProtocolError("connection closed mid-frame")
+            return None
+        received += count
+    return buffer
+
+
+def recv_frame(sock):
+    """Read one frame as (kind, meta, payload); None when the peer hung up"""
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    magic, version, kind, meta_length, payload_length = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ProtocolError(f"bad frame header {bytes(header[:3])!r}")
+    if meta_length > MAX_META or payload_length > MAX_PAYLOAD:
+        raise ProtocolError("frame too large")
+    meta = _recv_exact(sock, meta_length) if meta_length else b'{}'
+    payload = _recv_exact(sock, payload_length) if payload_length else b''
+    if meta is None or payload is None:
+        raise ProtocolError("connection closed mid-frame")
+    return kind, json.loads(bytes(meta)), payload
@@ -0,0 +1,301 @@
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from .. import gc_control, tracing
+from ..processing import CancelToken, CancelledError, JobExecutor
+from ..processing.admission import job_workers
+from ..processing.intents import IntentState
+from ..processing.ocr import ScreenOcr
+from ..processing.screen_gate import ScreenGate
+from ..processing.slo import SloController
+from .protocol import (
+    CANCELLED,
+    ERROR,
+    REQUEST,
+    RESPONSE,
+    ProtocolError,
+    default_socket_path,
+    recv_frame,
+    send_frame,
+)
+
+
+def _absolute(path):
+    # Clients may run in another working directory
+    return os.path.abspath(path) if isinstance(path, str) else path
+
+
+class _Connection(socketserver.BaseRequestHandler):
+    """One front-end. Reads requests until it hangs up.
+
+    Quick requests are answered inline; pipeline work goes to the daemon's
+    executor and is answered from the worker, so a client can send a cancel
+    while its request runs.
+    """
+
+    def setup(self):
+        self.write_lock = threading.Lock()
+        self.tokens = {}
+        # This client's last answer and volume, for "repeat" / "louder"
+        self.intent_state = IntentState()
+        self.server.daemon.connections.add(self.request)
+
+    def handle(self):
+        daemon = self.server.daemon
+        daemon.clients += 1
+        try:
+            while True:
+                try:
+                    frame = recv_frame(self.request)
+                except (ProtocolError, OSError) as e:
+                    print(f"Daemon connection error: {e}")
+                    return
+                if frame is None:
+                    return
+                kind, meta, payload = frame
+                if kind == REQUEST:
+                    daemon.dispatch(self, meta, payload)
+        finally:
+            daemon.clients -= 1
+            daemon.connections.discard(self.request)
+            # Nobody is left to receive the results
+            for token in list(self.tokens.values()):
+                token.cancel()
+
+    def reply(self, kind, request_id, meta=None, payload=b''):
+        meta = dict(meta or {}, id=request_id)
+        try:
+            with self.write_lock:
+                send_frame(self.request, kind, meta, payload)
+        except OSError:
+            pass
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    allow_reuse_address = False
+
+
+class AssistantDaemon:
+    """Owns one ProcessingPipeline and serves it over a Unix domain socket.
+
+    Models load once when the daemon starts and stay resident; the hotkey
+    listener, CLI and editor plugins connect with DaemonClient and share
+    them. Requests from every client run on a JobExecutor with enough
+    workers to fill the pipeline's stages, so its admission control decides
+    which request waits and which is shed. Above one ASR worker,
+    transcription goes through the pipeline's AsrScheduler so overlapping
+    utterances are batched rather than contending for Whisper. A full queue
+    is answered with a "busy" error rather than queueing without bound.
+
+    Operations (request meta "op"):
+        ping        -> {"ready": bool}
+        stats       -> executor counters, clients, uptime
+        process     audio payload -> {"response_path", "volume"}
+        transcribe  audio payload -> {"text"}
+        respond     {"text", "screenshot_path"} -> {"text"}
+        speak       {"text"} -> {"response_path"}
+        cancel      {"target": id} cancels an earlier request
+        prefetch    reload an idle-unloaded model (no reply)
+
+    Job replies also carry "queued": seconds the job waited for a worker.
+    """
+
+    # Operations that run on the pipeline worker
+    JOBS = ('process', 'transcribe', 'respond', 'speak')
+
+    def __init__(self, socket_path=None, pipeline=None, max_pending=4, warmup=False,
+                 asr_workers=1, batch_window=0.02):
+        self.socket_path = socket_path or default_socket_path()
+        self.pipeline = pipeline
+        self.max_pending = max_pending
+        self.warmup = warmup
+        self.asr_workers = asr_workers
+        self.batch_window = batch_window
+        self.executor = None
+        self.clients = 0
+        self.connections = set()
+        self.started_at = None
+        self._server = None
+        self._thread = None
+        self.tracer = tracing.Tracer()
+
+    def _claim_socket(self):
+        """Remove a stale socket file; refuse if another daemon is listening"""
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.unlink(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"Another daemon is already listening on {self.socket_path}")
+
+    def start(self):
+        """Bind the socket, start loading models and serve on a background thread"""
+        if self.pipeline is None:
+            from ..processing import ProcessingPipeline
+            self.pipeline = ProcessingPipeline(background=True, asr_workers=self.asr_workers,
+                                               asr_batch_window=self.batch_window)
+        slo = getattr(self.pipeline, 'slo', None)
+        if isinstance(slo, SloController):
+            self.tracer.observers.append(slo.observe)
+        self._claim_socket()
+        self.executor = JobExecutor(max_pending=self.max_pending, name="daemon-worker",
+                                    workers=job_workers(self.pipeline, self.asr_workers))
+        self._server = _Server(self.socket_path, _Connection)
+        self._server.daemon = self
+        # Only this user may talk to the models
+        os.chmod(self.socket_path, 0o600)
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="daemon-accept", daemon=True)
+        self._thread.start()
+        if hasattr(self.pipeline, 'load_in_background'):
+            self.pipeline.load_in_background(warmup=self.warmup)
+        print(f"\n🛰️  Assistant daemon listening on {self.socket_path}")
+        return True
+
+    def serve_forever(self):
+        """Run until shutdown() is called or the process is interrupted"""
+        self.start()
+        try:
+            while self._thread is not None and self._thread.is_alive():
+                self._thread.join(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        self._thread = None
+        # Hang up on clients so their waiting requests fail fast
+        for connection in list(self.connections):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        self.tracer.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def stats(self):
+        stats = {
+            "clients": self.clients,
+            "uptime": time.monotonic() - self.started_at if self.started_at else 0.0,
+            "ready": bool(getattr(self.pipeline, 'ready', False)),
+        }
+        if self.executor:
+            stats.update(self.executor.stats())
+        admission = getattr(self.pipeline, 'admission', None)
+        if admission is not None:
+            stats["stages"] = admission.stats()
+        memory = getattr(self.pipeline, 'memory', None)
+        if memory is not None:
+            stats["memory"] = memory.stats()
+        asr = getattr(self.pipeline, 'asr', None)
+        if asr is not None:
+            stats["asr"] = asr.stats()
+        controller = gc_control.current()
+        if controller is not None:
+            stats["gc"] = controller.stats()
+        slo = getattr(self.pipeline, 'slo', None)
+        if isinstance(slo, SloController):
+            stats["slo"] = slo.stats()
+        gate = getattr(self.pipeline, 'screen_gate', None)
+        if isinstance(gate, ScreenGate):
+            stats["screenshots"] = gate.stats()
+        ocr = getattr(self.pipeline, 'ocr', None)
+        if isinstance(ocr, ScreenOcr):
+            stats["ocr"] = ocr.stats()
+        return stats
+
+    def dispatch(self, connection, meta, payload):
+        """Answer a request inline or queue it for the pipeline worker"""
+        request_id = meta.get('id')
+        op = meta.get('op')
+        if op == 'ping':
+            connection.reply(RESPONSE, request_id, {"ready": self.stats()["ready"]})
+        elif op == 'stats':
+            connection.reply(RESPONSE, request_id, self.stats())
+        elif op == 'prefetch':
+            if hasattr(self.pipeline, 'prefetch'):
+                self.pipeline.prefetch()
+        elif op == 'cancel':
+            token = connection.tokens.get(meta.get('target'))
+            if token:
+                token.cancel()
+        elif op in self.JOBS:
+            token = CancelToken()
+            connection.tokens[request_id] = token
+            if not self.executor.submit(self._run, connection, request_id, op, meta, payload,
+                                        token, time.perf_counter(), cancel_token=token):
+                connection.tokens.pop(request_id, None)
+                connection.reply(ERROR, request_id, {"error": "busy"})
+        else:
+            connection.reply(ERROR, request_id, {"error": f"unknown op {op!r}"})
+
+    def _run(self, connection, request_id, op, meta, payload, token, received):
+        queued = time.perf_counter() - received
+        trace = self.tracer.start()
+        release_gc = gc_control.hold()
+        outcome = 'error'
+        try:
+            with tracing.activate(trace):
+                result = getattr(self, f'_op_{op}')(meta, payload, token,
+                                                    connection.intent_state)
+            connection.reply(RESPONSE, request_id, dict(result, queued=queued))
+            outcome = 'ok'
+        except CancelledError:
+            connection.reply(CANCELLED, request_id)
+            outcome = 'cancelled'
+        except Exception as e:
+            connection.reply(ERROR, request_id, {"error": str(e)})
+        finally:
+            connection.tokens.pop(request_id, None)
+            self.tracer.finish(trace, op=op, outcome=outcome)
+            # After the reply, so the deferred collection doesn't delay it
+            release_gc()
+
+    def _op_process(self, meta, payload, token, state):
+        path = self.pipeline.process(bytes(payload), meta.get('screenshot_path'), token,
+                                     state=state)
+        return {"response_path": _absolute(path), "volume": state.volume}
+
+    # The single-stage ops count as in-flight work like process(), so the
+    # memory manager doesn't unload Whisper under them, and take a stage slot
+
+    def _op_transcribe(self, meta, payload, token, state):
+        with self.pipeline.in_flight():
+            self.pipeline.wait_until_ready()
+            path = self.pipeline.save_recording(bytes(payload), meta.get('sample_rate', 44100))
+            with self.pipeline.stage('asr', token):
+                return {"text": self.pipeline.transcribe_audio(path, token)}
+
+    def _op_respond(self, meta, payload, token, state):
+        with self.pipeline.in_flight():
+            self.pipeline.wait_until_ready()
+            with self.pipeline.stage('llm', token):
+                text = self.pipeline.get_ai_response(meta['text'], meta.get('screenshot_path'),
+                                                     token)
+        return {"text": text}
+
+    def _op_speak(self, meta, payload, token, state):
+        with self.pipeline.in_flight():
+            self.pipeline.wait_until_ready()
+            with self.pipeline.stage('tts', token):
+                path = self.pipeline.text_to_speech(meta['text'], token)
+        return {"response_path": _absolute(path)}
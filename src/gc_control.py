@@ -0,0 +1,274 @@
+import gc
+import os
+import threading
+import time
+from collections import deque
+
+from . import metrics
+
+# GC_MODE: "off" leaves the collector alone, "measure" only times pauses,
+# "realtime" also freezes the heap after model loads, raises the generation
+# thresholds and defers collections until no request is running.
+MODES = ('off', 'measure', 'realtime')
+
+# Fewer young collections once the long-lived model objects are frozen
+REALTIME_THRESHOLDS = (10000, 20, 100)
+
+# A glitch this soon after a pause ended (or during one) counts as GC-related
+GLITCH_WINDOW = 0.05
+
+GC_PAUSE_SECONDS = metrics.REGISTRY.register(metrics.Histogram(
+    'gc_pause_seconds', "Garbage collector pauses by generation", ('generation',),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)))
+
+
+class GcController:
+    """Times collector pauses and keeps collections out of busy periods.
+
+    In realtime mode `hold()` disables automatic collection while a request
+    (recording, inference, playback) is running; when the last hold is
+    released the deferred work runs as one collection, between requests.
+    Once holds have kept collection off for `max_hold` seconds, automatic
+    collection resumes until every hold is released, so a stuck request or
+    a run of overlapping ones can't grow the heap without bound. `model_loaded()`
+    collects and then freezes everything alive, so the objects from a
+    Whisper load are never scanned again; `model_unloading()` thaws them
+    first when the model is dropped, or its cycles would never be freed.
+
+    Every pause is timed through gc.callbacks. Audio glitches reported via
+    `glitch()` are matched against recent pauses, and `stats()` compares
+    the share of glitches near a pause with what chance would give.
+    """
+
+    def __init__(self, mode='measure', thresholds=None, max_hold=30.0,
+                 glitch_window=GLITCH_WINDOW):
+        if mode not in MODES:
+            raise ValueError(f"unknown GC mode {mode!r}; expected one of {MODES}")
+        self.mode = mode
+        self.thresholds = thresholds or (REALTIME_THRESHOLDS if mode == 'realtime' else None)
+        self.max_hold = max_hold
+        self.glitch_window = glitch_window
+        self.started_at = time.perf_counter()
+        self.pauses = deque(maxlen=4096)
+        self.collections = [0, 0, 0]
+        self.busy_pauses = 0
+        self.idle_collections = 0
+        self.forced = 0
+        self.glitches = 0
+        self.glitches_near_gc = 0
+        self._holds = 0
+        self._held_since = None
+        self._expired = False
+        self._lock = threading.Lock()
+        self._collecting_since = None
+        self._last_pause_end = None
+        self._pause_total = 0.0
+        self._saved_thresholds = None
+        self._installed = False
+        self._stop = threading.Event()
+        self._watchdog = None
+
+    @property
+    def realtime(self):
+        return self.mode == 'realtime'
+
+    def install(self):
+        if self._installed or self.mode == 'off':
+            return self
+        gc.callbacks.append(self._on_gc)
+        if self.thresholds:
+            self._saved_thresholds = gc.get_threshold()
+            gc.set_threshold(*self.thresholds)
+        if self.realtime:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="gc-watchdog",
+                                              daemon=True)
+            self._watchdog.start()
+        self._installed = True
+        return self
+
+    def uninstall(self):
+        if not self._installed:
+            return
+        self._stop.set()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self._saved_thresholds:
+            gc.set_threshold(*self._saved_thresholds)
+        gc.enable()
+        self._installed = False
+
+    def _on_gc(self, phase, info):
+        # Runs inside the collector, with the GIL held: keep it to a few stores
+        now = time.perf_counter()
+        if phase == 'start':
+            self._collecting_since = now
+            return
+        started = self._collecting_since
+        if started is None:
+            return
+        self._collecting_since = None
+        duration = now - started
+        generation = info.get('generation', 2)
+        self.collections[generation] += 1
+        self._pause_total += duration
+        self._last_pause_end = now
+        self.pauses.append((started, duration, generation))
+        if self._holds:
+            self.busy_pauses += 1
+        GC_PAUSE_SECONDS.observe(duration, str(generation))
+
+    def model_loaded(self):
+        """Collect the load's garbage and freeze what survives (realtime mode)"""
+        if not self.realtime or not hasattr(gc, 'freeze'):
+            return
+        gc.collect()
+        gc.freeze()
+
+    def model_unloading(self):
+        """Unfreeze before a model is dropped, so the collector can free it"""
+        if not self.realtime or not hasattr(gc, 'unfreeze'):
+            return
+        gc.unfreeze()
+
+    def hold(self):
+        """Defer collections until the returned release() is called
+
+        release() is idempotent, so every exit path of a request can call it.
+        """
+        if not self.realtime:
+            return _noop
+        with self._lock:
+            self._holds += 1
+            if self._holds == 1:
+                self._held_since = time.monotonic()
+                gc.disable()
+        released = [False]
+
+        def release():
+            if released[0]:
+                return
+            released[0] = True
+            self._release()
+        return release
+
+    def _release(self):
+        with self._lock:
+            self._holds -= 1
+            if self._holds:
+                return
+            self._held_since = None
+            self._expired = False
+            gc.enable()
+        # Idle now: pay for the deferred garbage before the next key-down
+        gc.collect()
+        self.idle_collections += 1
+
+    def _watch(self):
+        while not self._stop.wait(1.0):
+            self._expire_holds()
+
+    def _expire_holds(self):
+        # Holds can overlap indefinitely, so this counts from the first one
+        with self._lock:
+            if (self._held_since is None or self._expired
+                    or time.monotonic() - self._held_since <= self.max_hold):
+                return
+            self._expired = True
+            gc.enable()
+            self.forced += 1
+
+    def glitch(self, at=None):
+        """Note an audio glitch at perf_counter() time `at` (now by default)"""
+        at = time.perf_counter() if at is None else at
+        self.glitches += 1
+        collecting = self._collecting_since is not None
+        last_end = self._last_pause_end
+        if collecting or (last_end is not None and 0 <= at - last_end <= self.glitch_window):
+            self.glitches_near_gc += 1
+
+    def stats(self):
+        pauses = sorted(duration for _, duration, _ in list(self.pauses))
+
+        def pct(q):
+            return pauses[min(len(pauses) - 1, int(q * len(pauses)))] * 1000 if pauses else 0.0
+
+        elapsed = time.perf_counter() - self.started_at
+        # Share of time within a pause or the window after one: the rate at
+        # which glitches would land near a pause by coincidence
+        covered = self._pause_total + len(pauses) * self.glitch_window
+        return {
+            "mode": self.mode,
+            "thresholds": gc.get_threshold(),
+            "frozen": gc.get_freeze_count() if hasattr(gc, 'get_freeze_count') else 0,
+            "collections": list(self.collections),
+            "pause_p50_ms": pct(0.50),
+            "pause_p99_ms": pct(0.99),
+            "pause_max_ms": pauses[-1] * 1000 if pauses else 0.0,
+            "pause_total_ms": self._pause_total * 1000,
+            "busy_pauses": self.busy_pauses,
+            "idle_collections": self.idle_collections,
+            "forced": self.forced,
+            "glitches": self.glitches,
+            "glitches_near_gc": self.glitches_near_gc,
+            "chance_near_gc": min(1.0, covered / elapsed) if elapsed else 0.0,
+        }
+
+    def summary(self):
+        stats = self.stats()
+        line = (f"🧹 GC ({self.mode}): {sum(stats['collections'])} collections, "
+                f"p99 pause {stats['pause_p99_ms']:.1f} ms, max {stats['pause_max_ms']:.1f} ms, "
+                f"{stats['busy_pauses']} during requests")
+        if stats["glitches"]:
+            share = stats["glitches_near_gc"] / stats["glitches"]
+            line += (f"; {stats['glitches_near_gc']}/{stats['glitches']} audio glitches within "
+                     f"{self.glitch_window * 1000:.0f} ms of a pause ({share:.0%}, "
+                     f"{stats['chance_near_gc']:.0%} expected by chance)")
+        return line
+
+
+def _noop():
+    pass
+
+
+# The process-wide controller; None until configure() is called
+_controller = None
+
+
+def configure(mode=None, **options):
+    """Install the controller for GC_MODE (or `mode`); returns it, or None when off"""
+    global _controller
+    mode = mode or os.getenv('GC_MODE', 'off')
+    if _controller is not None:
+        _controller.uninstall()
+        _controller = None
+    if mode == 'off':
+        return None
+    _controller = GcController(mode, **options).install()
+    return _controller
+
+
+def current():
+    return _controller
+
+
+def model_loaded():
+    if _controller is not None:
+        _controller.model_loaded()
+
+
+def model_unloading():
+    if _controller is not None:
+        _controller.model_unloading()
+
+
+def hold():
+    """Defer collections for a request; returns its release() (a no-op when off)"""
+    if _controller is None:
+        return _noop
+    return _controller.hold()
+
+
+def glitch(at=None):
+    if _controller is not None:
+        _controller.glitch(at)
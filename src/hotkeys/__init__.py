@@ -1,3 +1,4 @@
+from .backends import HotkeyBackend, KeyEvent, SyntheticBackend, get_backend
 from .listener import HotkeyListener
 
-__all__ = ['HotkeyListener'] 
\ No newline at end of file
+__all__ = ['HotkeyBackend', 'HotkeyListener', 'KeyEvent', 'SyntheticBackend', 'get_backend']
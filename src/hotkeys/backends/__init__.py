@@ -0,0 +1,48 @@
+import os
+import sys
+
+from .base import KEY_DOWN, KEY_UP, HotkeyBackend, KeyEvent
+from .synthetic import SyntheticBackend
+
+BACKENDS = ('appkit', 'evdev', 'x11', 'synthetic')
+
+
+def default_backend_name():
+    """Pick a backend for this platform; HOTKEY_BACKEND overrides it"""
+    name = os.getenv('HOTKEY_BACKEND')
+    if name:
+        return name
+    if sys.platform == 'darwin':
+        return 'appkit'
+    if os.getenv('DISPLAY') and not os.getenv('WAYLAND_DISPLAY'):
+        return 'x11'
+    return 'evdev'
+
+
+def get_backend(name=None):
+    """Create a hotkey backend by name. Platform modules are imported on demand."""
+    name = name or default_backend_name()
+    if name == 'appkit':
+        from .appkit import AppKitBackend
+        return AppKitBackend()
+    if name == 'evdev':
+        from .linux import EvdevBackend
+        return EvdevBackend()
+    if name == 'x11':
+        from .linux import X11Backend
+        return X11Backend()
+    if name == 'synthetic':
+        return SyntheticBackend()
+    raise ValueError(f"Unknown hotkey backend {name!r}, expected one of {BACKENDS}")
+
+
+__all__ = [
+    'BACKENDS',
+    'HotkeyBackend',
+    'KEY_DOWN',
+    'KEY_UP',
+    'KeyEvent',
+    'SyntheticBackend',
+    'default_backend_name',
+    'get_backend',
+]
@@ -0,0 +1,69 @@
+from AppKit import (
+    NSApplication,
+    NSEvent,
+    NSEventMaskKeyDown,
+    NSEventMaskKeyUp,
+)
+
+from .base import HotkeyBackend
+
+
+class AppKitBackend(HotkeyBackend):
+    """Global and local NSEvent monitors on macOS.
+
+    NSEvents are passed to the handler as-is: their type values and
+    modifier bits are the ones the neutral constants are defined by.
+    """
+
+    name = 'appkit'
+
+    def __init__(self):
+        super().__init__()
+        self.app = None
+        self.monitor = None
+        self.local_monitor = None
+        self.monitors = []
+
+    def start(self, handler):
+        self.handler = handler
+        try:
+            self.app = NSApplication.sharedApplication()
+            
+            # Set up event monitors
+            mask = NSEventMaskKeyDown | NSEventMaskKeyUp
+            self.monitor = NSEvent.addGlobalMonitorForEventsMatchingMask_handler_(
+                mask, handler)
+            self.local_monitor = NSEvent.addLocalMonitorForEventsMatchingMask_handler_(
+                mask, handler)
+                
+            # Check if monitors were created successfully
+            if not self.monitor or not self.local_monitor:
+                print("\n⚠️  Error setting up event monitor: Failed to create monitors")
+                self.stop()
+                return False
+                
+            self.monitors.extend([self.monitor, self.local_monitor])
+            return True
+            
+        except Exception as e:
+            print(f"\n⚠️  Error setting up event monitor: {e}")
+            self.stop()
+            return False
+
+    def run(self):
+        if self.app:
+            self.app.run()
+
+    def stop(self):
+        for monitor in list(self.monitors):
+            try:
+                NSEvent.removeMonitor_(monitor)
+            except Exception as e:
+                print(f"Error removing monitor: {e}")
+        self.monitors.clear()
+        if self.app:
+            try:
+                self.app.stop_(None)
+            except Exception:
+                pass
+        self.handler = None
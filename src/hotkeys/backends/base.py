@@ -0,0 +1,68 @@
+import time
+
+from ..hotkey_manager import KEY_CODES, MODIFIER_MASKS
+
+# Event types. The values match NSEventTypeKeyDown/NSEventTypeKeyUp so AppKit
+# events can be handed to the listener without translation.
+KEY_DOWN = 10
+KEY_UP = 11
+
+
+class KeyEvent:
+    """Platform-neutral key event.
+
+    Mirrors the three NSEvent accessors the listener uses, so native AppKit
+    events and events from other backends go through the same code path.
+    `timestamp` is a time.perf_counter() value taken when the event was
+    read, for latency measurements.
+    """
+
+    __slots__ = ('_type', '_key_code', '_flags', 'timestamp')
+
+    def __init__(self, event_type, key_code, flags=0, timestamp=None):
+        self._type = event_type
+        self._key_code = key_code
+        self._flags = flags
+        self.timestamp = time.perf_counter() if timestamp is None else timestamp
+
+    def type(self):
+        return self._type
+
+    def keyCode(self):
+        return self._key_code
+
+    def modifierFlags(self):
+        return self._flags
+
+    def __repr__(self):
+        kind = {KEY_DOWN: 'down', KEY_UP: 'up'}.get(self._type, self._type)
+        return f"KeyEvent({kind}, key_code={self._key_code}, flags={self._flags:#x})"
+
+
+class HotkeyBackend:
+    """Source of global key events for HotkeyListener.
+
+    Subclasses deliver events to the handler passed to `start()`. Each event
+    exposes type(), keyCode() and modifierFlags(). Key codes are native to
+    the backend (`key_codes` maps key names to them). Modifier flags always
+    use the MODIFIER_MASKS bits.
+    """
+
+    name = None
+    key_codes = KEY_CODES
+    modifier_masks = MODIFIER_MASKS
+
+    def __init__(self):
+        self.handler = None
+
+    def start(self, handler):
+        """Begin delivering events to `handler`. Returns False on failure."""
+        raise NotImplementedError
+
+    def run(self):
+        """Block running the platform event loop until stop() is called"""
+        raise NotImplementedError
+
+    def stop(self):
+        """Stop delivering events and release platform resources"""
+        raise NotImplementedError
@@ -0,0 +1,269 @@
+import selectors
+import threading
+
+from ..hotkey_manager import MODIFIER_MASKS
+from .base import KEY_DOWN, KEY_UP, HotkeyBackend, KeyEvent
+
+# Linux input event codes (linux/input-event-codes.h)
+EVDEV_KEY_CODES = {
+    'escape': 1, '1': 2, '2': 3, '3': 4, '4': 5, '5': 6, '6': 7, '7': 8,
+    '8': 9, '9': 10, '0': 11, 'q': 16, 'w': 17, 'e': 18, 'r': 19, 't': 20,
+    'y': 21, 'u': 22, 'i': 23, 'o': 24, 'p': 25, 'a': 30, 's': 31, 'd': 32,
+    'f': 33, 'g': 34, 'h': 35, 'j': 36, 'k': 37, 'l': 38, 'z': 44, 'x': 45,
+    'c': 46, 'v': 47, 'b': 48, 'n': 49, 'm': 50, 'space': 57,
+}
+
+# Modifier keys, mapped onto the neutral modifier bits. The Super/Meta key
+# stands in for Command.
+EVDEV_MODIFIER_KEYS = {
+    42: MODIFIER_MASKS['shift'], 54: MODIFIER_MASKS['shift'],    # KEY_LEFTSHIFT, KEY_RIGHTSHIFT
+    29: MODIFIER_MASKS['ctrl'], 97: MODIFIER_MASKS['ctrl'],      # KEY_LEFTCTRL, KEY_RIGHTCTRL
+    56: MODIFIER_MASKS['alt'], 100: MODIFIER_MASKS['alt'],       # KEY_LEFTALT, KEY_RIGHTALT
+    125: MODIFIER_MASKS['cmd'], 126: MODIFIER_MASKS['cmd'],      # KEY_LEFTMETA, KEY_RIGHTMETA
+}
+
+# X11 keycodes are the evdev codes offset by 8
+X11_KEYCODE_OFFSET = 8
+
+# X11 state bits -> neutral modifier bits (Mod1 is Alt, Mod4 is Super)
+X11_STATE_MASKS = (
+    (1 << 0, MODIFIER_MASKS['shift']),
+    (1 << 2, MODIFIER_MASKS['ctrl']),
+    (1 << 3, MODIFIER_MASKS['alt']),
+    (1 << 6, MODIFIER_MASKS['cmd']),
+)
+
+
+class ModifierState:
+    """Tracks which modifier keys are held from raw key events"""
+
+    def __init__(self, modifier_keys):
+        self.modifier_keys = modifier_keys
+        self._held = {}
+        self.flags = 0
+
+    def update(self, key_code, pressed):
+        """Update state for a key event; returns True if it was a modifier"""
+        mask = self.modifier_keys.get(key_code)
+        if mask is None:
+            return False
+        if pressed:
+            self._held[key_code] = mask
+        else:
+            self._held.pop(key_code, None)
+        flags = 0
+        for held_mask in self._held.values():
+            flags |= held_mask
+        self.flags = flags
+        return True
+
+
+class EvdevBackend(HotkeyBackend):
+    """Reads keyboards directly from /dev/input with python-evdev.
+
+    Works under X11, Wayland and on a bare console, but needs read access to
+    the input devices (usually membership of the `input` group).
+    """
+
+    name = 'evdev'
+    key_codes = EVDEV_KEY_CODES
+
+    def __init__(self, devices=None):
+        super().__init__()
+        self.device_paths = devices
+        self.devices = []
+        self.modifiers = ModifierState(EVDEV_MODIFIER_KEYS)
+        self._selector = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _open_keyboards(self, evdev):
+        paths = self.device_paths or evdev.list_devices()
+        keyboards = []
+        for path in paths:
+            device = evdev.InputDevice(path)
+            keys = device.capabilities().get(evdev.ecodes.EV_KEY, [])
+            if self.device_paths or evdev.ecodes.KEY_A in keys:
+                keyboards.append(device)
+            else:
+                device.close()
+        return keyboards
+
+    def start(self, handler):
+        self.handler = handler
+        try:
+            import evdev
+            self.devices = self._open_keyboards(evdev)
+            if not self.devices:
+                print("\n⚠️  No readable keyboard devices found (are you in the 'input' group?)")
+                return False
+            self._selector = selectors.DefaultSelector()
+            for device in self.devices:
+                self._selector.register(device, selectors.EVENT_READ)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._read_loop, name="evdev-reader",
+                                            daemon=True)
+            self._thread.start()
+            return True
+        except Exception as e:
+            print(f"\n⚠️  Error setting up evdev backend: {e}")
+            self.stop()
+            return False
+
+    def _read_loop(self):
+        EV_KEY = 1
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(timeout=0.1):
+                if self._stop.is_set():
+                    # A handler stopped the backend from this thread
+                    return
+                try:
+                    events = key.fileobj.read()
+                    for event in events:
+                        if event.type == EV_KEY:
+                            self.translate(event.code, event.value)
+                except OSError:
+                    # Device unplugged
+                    self._selector.unregister(key.fileobj)
+
+    def translate(self, key_code, value):
+        """Turn a raw EV_KEY (value 0=up, 1=down, 2=repeat) into a KeyEvent"""
+        if self.modifiers.update(key_code, value != 0):
+            return None
+        event = KeyEvent(KEY_UP if value == 0 else KEY_DOWN, key_code, self.modifiers.flags)
+        handler = self.handler
+        if handler is not None:
+            handler(event)
+        return event
+
+    def run(self):
+        while not self._stop.wait(0.5):
+            pass
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            # A handler may stop the backend from the reader thread itself
+            if self._thread is not threading.current_thread():
+                self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        for device in self.devices:
+            try:
+                device.close()
+            except Exception:
+                pass
+        self.devices = []
+        self.handler = None
+
+
+class X11Backend(HotkeyBackend):
+    """Global key monitoring on X11 through the RECORD extension (python-xlib)"""
+
+    name = 'x11'
+    key_codes = {name: code + X11_KEYCODE_OFFSET for name, code in EVDEV_KEY_CODES.items()}
+
+    def __init__(self, display_name=None):
+        super().__init__()
+        self.display_name = display_name
+        self._control = None
+        self._record = None
+        self._context = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self, handler):
+        self.handler = handler
+        try:
+            from Xlib import X, display
+            from Xlib.ext import record
+
+            self._control = display.Display(self.display_name)
+            self._record = display.Display(self.display_name)
+            if not self._record.has_extension('RECORD'):
+                print("\n⚠️  X server has no RECORD extension")
+                self.stop()
+                return False
+            self._context = self._record.record_create_context(
+                0, [record.AllClients], [{
+                    'core_requests': (0, 0), 'core_replies': (0, 0),
+                    'ext_requests': (0, 0, 0, 0), 'ext_replies': (0, 0, 0, 0),
+                    'delivered_events': (0, 0),
+                    'device_events': (X.KeyPress, X.KeyRelease),
+                    'errors': (0, 0),
+                    'client_started': False, 'client_died': False,
+                }])
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._record_loop, name="x11-record",
+                                            daemon=True)
+            self._thread.start()
+            return True
+        except Exception as e:
+            print(f"\n⚠️  Error setting up X11 backend: {e}")
+            self.stop()
+            return False
+
+    def _record_loop(self):
+        # Blocks until the context is disabled from the control connection
+        record, context = self._record, self._context
+        try:
+            record.record_enable_context(context, self._on_record)
+            record.record_free_context(context)
+        except Exception:
+            # stop() from a handler closes the connection under us
+            if not self._stopped.is_set():
+                raise
+
+    def _on_record(self, reply):
+        from Xlib import X
+        from Xlib.ext import record
+        from Xlib.protocol import rq
+
+        if reply.category != record.FromServer or reply.client_swapped:
+            return
+        data = reply.data
+        while len(data):
+            event, data = rq.EventField(None).parse_binary_value(
+                data, self._record.display, None, None)
+            if event.type in (X.KeyPress, X.KeyRelease):
+                self.translate(event.type == X.KeyPress, event.detail, event.state)
+
+    def translate(self, pressed, keycode, state):
+        """Turn an X11 key event and its modifier state into a KeyEvent"""
+        flags = 0
+        for x_mask, mask in X11_STATE_MASKS:
+            if state & x_mask:
+                flags |= mask
+        event = KeyEvent(KEY_DOWN if pressed else KEY_UP, keycode, flags)
+        handler = self.handler
+        if handler is not None:
+            handler(event)
+        return event
+
+    def run(self):
+        while not self._stopped.wait(0.5):
+            pass
+
+    def stop(self):
+        self._stopped.set()
+        if self._control is not None and self._context is not None:
+            try:
+                self._control.record_disable_context(self._context)
+                self._control.flush()
+            except Exception:
+                pass
+        if self._thread is not None:
+            # A handler may stop the backend from the record thread itself
+            if self._thread is not threading.current_thread():
+                self._thread.join(timeout=1.0)
+            self._thread = None
+        for connection in (self._record, self._control):
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        self._record = self._control = self._context = None
+        self.handler = None
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from ..hotkey_manager import parse_hotkey
+from .base import KEY_DOWN, KEY_UP, HotkeyBackend, KeyEvent
+
+
+class SyntheticBackend(HotkeyBackend):
+    """Scripted key events for headless tests and benchmarks.
+
+    Events are delivered synchronously on the calling thread, either one at
+    a time with key_down()/key_up()/press() or from a script with replay().
+    A script is a list of (delay_seconds, 'down' | 'up', hotkey) steps.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, script=None, speed=1.0):
+        super().__init__()
+        self.script = script or []
+        self.speed = speed
+        self.delivered = []
+        self._stopped = threading.Event()
+
+    def start(self, handler):
+        self.handler = handler
+        self._stopped.clear()
+        return True
+
+    def emit(self, event_type, key_code, flags=0):
+        """Deliver one event and return it (with its timestamp)"""
+        event = KeyEvent(event_type, key_code, flags)
+        self.delivered.append(event)
+        if self.handler is not None:
+            self.handler(event)
+        return event
+
+    def key_down(self, hotkey):
+        key_code, flags = parse_hotkey(hotkey, self.key_codes, self.modifier_masks)
+        return self.emit(KEY_DOWN, key_code, flags)
+
+    def key_up(self, hotkey):
+        key_code, flags = parse_hotkey(hotkey, self.key_codes, self.modifier_masks)
+        return self.emit(KEY_UP, key_code, flags)
+
+    def press(self, hotkey, hold=0.0):
+        """Key down, optionally hold, then key up. Returns both events."""
+        down = self.key_down(hotkey)
+        if hold:
+            self._stopped.wait(hold / self.speed)
+        return down, self.key_up(hotkey)
+
+    def replay(self, script=None):
+        """Play a script with its delays scaled by `speed`; returns the events"""
+        events = []
+        for delay, kind, hotkey in (script if script is not None else self.script):
+            if delay and self._stopped.wait(delay / self.speed):
+                break
+            if kind == 'down':
+                events.append(self.key_down(hotkey))
+            elif kind == 'up':
+                events.append(self.key_up(hotkey))
+            else:
+                raise ValueError(f"Unknown synthetic event kind: {kind!r}")
+        return events
+
+    def run(self):
+        self.replay()
+
+    def stop(self):
+        self._stopped.set()
+        self.handler = None
@@ -1,29 +1,108 @@
+# Modifier flag masks (NSEventModifierFlag values)
+MODIFIER_MASKS = {
+    'cmd': 1 << 20,
+    'command': 1 << 20,
+    'shift': 1 << 17,
+    'alt': 1 << 19,
+    'option': 1 << 19,
+    'ctrl': 1 << 18,
+    'control': 1 << 18,
+}
+
+# Only these bits take part in matching; caps lock, fn, etc. are ignored
+MODIFIER_MASK = (1 << 17) | (1 << 18) | (1 << 19) | (1 << 20)
+
+# macOS virtual key codes (ANSI layout)
+KEY_CODES = {
+    'a': 0, 's': 1, 'd': 2, 'f': 3, 'h': 4, 'g': 5, 'z': 6, 'x': 7,
+    'c': 8, 'v': 9, 'b': 11, 'q': 12, 'w': 13, 'e': 14, 'r': 15,
+    'y': 16, 't': 17, '1': 18, '2': 19, '3': 20, '4': 21, '6': 22,
+    '5': 23, '9': 25, '7': 26, '8': 28, '0': 29, 'o': 31, 'u': 32,
+    'i': 34, 'p': 35, 'l': 37, 'j': 38, 'k': 40, 'n': 45, 'm': 46,
+    'space': 49, 'escape': 53,
+}
+
+
+def parse_hotkey(hotkey: str, key_codes=None, modifier_masks=None):
+    """Parse a hotkey string like 'cmd+shift+a' into (key_code, modifiers)
+
+    Key codes default to the macOS table; backends pass their own.
+    """
+    key_codes = KEY_CODES if key_codes is None else key_codes
+    modifier_masks = MODIFIER_MASKS if modifier_masks is None else modifier_masks
+    *modifier_names, key = [part.strip().lower() for part in hotkey.split('+')]
+    if key not in key_codes:
+        raise ValueError(f"Unknown key in hotkey {hotkey!r}: {key!r}")
+    modifiers = 0
+    for name in modifier_names:
+        if name not in modifier_masks:
+            raise ValueError(f"Unknown modifier in hotkey {hotkey!r}: {name!r}")
+        modifiers |= modifier_masks[name]
+    return key_codes[key], modifiers
+
+
 class HotkeyManager:
-    def __init__(self):
+    def __init__(self, key_codes=None, modifier_masks=None):
+        self.key_code_map = KEY_CODES if key_codes is None else key_codes
+        self.modifier_masks = MODIFIER_MASKS if modifier_masks is None else modifier_masks
         self.hotkeys = {}
         self.callbacks = {}
-        
-    def register_hotkey(self, hotkey: str, action: str, callback=None):
-        """Register a hotkey with an associated action and optional callback"""
+        self.release_callbacks = {}
+        self.dispatch_table = {}
+        self.key_codes = frozenset()
+
+    def register_hotkey(self, hotkey: str, action: str, callback=None,
+                        release_callback=None):
+        """Register a hotkey with an associated action and optional callbacks
+
+        `callback` runs on key down and `release_callback` on key up.
+        """
+        binding = self.parse(hotkey)
         self.hotkeys[hotkey] = action
         if callback:
             self.callbacks[hotkey] = callback
-        
+        if release_callback:
+            self.release_callbacks[hotkey] = release_callback
+        self._compile()
+        return binding
+
     def unregister_hotkey(self, hotkey: str):
         """Remove a registered hotkey"""
         self.hotkeys.pop(hotkey, None)
         self.callbacks.pop(hotkey, None)
-        
+        self.release_callbacks.pop(hotkey, None)
+        self._compile()
+
+    def parse(self, hotkey: str):
+        """Parse a hotkey using this manager's key code table"""
+        return parse_hotkey(hotkey, self.key_code_map, self.modifier_masks)
+
+    def _compile(self):
+        """Rebuild the (key_code, modifiers) -> binding table used on the hot path"""
+        table = {}
+        for hotkey, action in self.hotkeys.items():
+            table[self.parse(hotkey)] = (
+                action,
+                self.callbacks.get(hotkey),
+                self.release_callbacks.get(hotkey),
+            )
+        self.dispatch_table = table
+        self.key_codes = frozenset(key_code for key_code, _ in table)
+
+    def lookup(self, key_code: int, flags: int):
+        """Return (action, callback, release_callback) for an event, or None"""
+        return self.dispatch_table.get((key_code, flags & MODIFIER_MASK))
+
     def trigger_hotkey(self, hotkey: str):
         """Trigger the action associated with a hotkey"""
         if hotkey in self.callbacks:
             return self.callbacks[hotkey]()
         return None
-        
+
     def is_registered(self, hotkey: str) -> bool:
         """Check if a hotkey is registered"""
         return hotkey in self.hotkeys
-        
+
     def get_action(self, hotkey: str) -> str:
         """Get the action associated with a hotkey"""
-        return self.hotkeys.get(hotkey) 
\ No newline at end of file
+        return self.hotkeys.get(hotkey)
@@ -1,69 +1,130 @@
 print("\n🎧 Initializing AI Assistant...")
-print("   Loading Whisper model (this may take a moment)...")
 
 # Standard library imports
 import os
 import sys
+import logging
 import time
 import signal
-from datetime import datetime
-
-# Third-party imports
-from AppKit import (
-    NSObject, 
-    NSEvent,
-    NSApplication,
-    NSKeyDown,
-    NSKeyUp,
-    NSEventMaskKeyDown,
-    NSEventMaskKeyUp,
-    NSEventTypeKeyDown,
-    NSEventTypeKeyUp,
-    NSCommandKeyMask,
-    NSShiftKeyMask,
-    NSAlternateKeyMask,
-    NSControlKeyMask
-)
-from PIL import ImageGrab
-from objc import super
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Local imports
 from ..audio.recorder import AudioRecorder
+from ..audio.earcons import Earcons
 from ..audio.player import AudioPlayer
-from ..processing import ProcessingPipeline
+from ..processing import CancelToken, CancelledError, JobExecutor, ProcessingPipeline
+from ..processing.admission import job_workers
+from ..processing.ocr import CURSOR_KEY, ScreenOcr, cursor_position
+from ..processing.pipeline import unique_path
+from ..processing.screen_gate import ScreenGate
+from ..processing.slo import SloController
+from ..processing.speculation import SpeculativeLLM
+from .. import gc_control, tracing
+from .backends import KEY_DOWN, KEY_UP, get_backend
+from .hotkey_manager import HotkeyManager
 
-COMMAND_SHIFT_FLAGS = NSCommandKeyMask | NSShiftKeyMask
+logger = logging.getLogger(__name__)
 
 print("   Core components loaded...")
 
-class HotkeyListener(NSObject):
-    # Command key constants
-    CMD_SHIFT_A_MASK = NSCommandKeyMask | NSShiftKeyMask
-    CMD_SHIFT_Q_MASK = NSCommandKeyMask | NSShiftKeyMask
+class HotkeyListener:
+    """Routes hotkeys from a platform backend to recording and the pipeline.
+
+    Construction keeps the two-phase alloc().init() protocol from when this
+    was an NSObject: both `HotkeyListener.alloc().init()` and
+    `HotkeyListener()` return None if a component fails to load.
+    """
     
-    def init(self):
-        # Call super's init first
-        self = super().init()
-        if self is None:
-            return None
-            
+    # Default hotkeys
+    RECORD_HOTKEY = 'cmd+shift+a'
+    QUIT_HOTKEY = 'cmd+shift+q'
+    
+    # Upper bound for key-down -> fresh recording when barging in on a response
+    BARGE_IN_BUDGET = 0.050
+    
+    @classmethod
+    def alloc(cls):
+        return object.__new__(cls)
+    
+    def __new__(cls, *args, **kwargs):
+        return cls.alloc().init(*args, **kwargs)
+    
+    def __init__(self, *args, **kwargs):
+        # All initialization happens in init()
+        pass
+    
+    def init(self, backend=None, preload=True, warmup=False, pipeline=None):
+        """Initialize components; returns None on failure
+
+        Models are not loaded here. start() begins loading them in the
+        background once hotkeys are live, so the listener is usable within
+        a fraction of a second.
+
+        Args:
+            backend: HotkeyBackend instance or backend name; defaults to
+                the platform's backend (see backends.default_backend_name)
+            preload: Load models in the background from start(); otherwise
+                they load on the first request
+            warmup: After preloading, run warm-up inference so the first
+                request is as fast as the rest
+            pipeline: Object with ProcessingPipeline's process() to use
+                instead of a local pipeline, e.g. a connected DaemonClient
+        """
         # Initialize all attributes
         self.recording_in_progress = False
-        self.monitor = None
-        self.local_monitor = None
-        self.monitors = []
-        self.app = None
+        self.backend = None
+        self.preload = preload
+        self.warmup = warmup
         self.recorder = None
         self.player = None
+        self.earcons = None
+        self.speculator = None
+        self.speculation = None
         self.pipeline = None
+        self.screenshot_path = None
+        self.active_token = None
+        self.barge_in_latencies = deque(maxlen=100)
+        self.event_durations = deque(maxlen=1000)
+        self.executor = None
+        self.screenshot_future = None
+        self._screenshot_pool = None
+        self._held = {}
+        self.trace = None
+        self.tracer = tracing.Tracer()
+        # Keeps collections out of the current recording and its response
+        self._release_gc = None
             
         try:
+            if backend is None or isinstance(backend, str):
+                backend = get_backend(backend)
+            self.backend = backend
+            self.hotkey_manager = HotkeyManager(
+                backend.key_codes, backend.modifier_masks)
+            self._register_hotkeys()
+            
             print("\n1. Loading audio components...")
             self.recorder = AudioRecorder()
-            self.player = AudioPlayer()
+            # Cues between key-up and the first response audio; EARCONS=0 turns them off
+            if os.getenv('EARCONS', '1') != '0':
+                self.earcons = Earcons()
+            self.player = AudioPlayer(earcons=self.earcons)
             
-            print("\n2. Loading AI pipeline...")
-            self.pipeline = ProcessingPipeline()
+            print("\n2. Setting up AI pipeline...")
+            self.pipeline = pipeline or ProcessingPipeline(background=True)
+            # Early Claude requests from partial transcripts (SPECULATIVE_LLM=1);
+            # needs the local Whisper model, so not with a daemon pipeline
+            if pipeline is None:
+                self.speculator = SpeculativeLLM.from_env(self.pipeline)
+            # Finished requests drive the latency controller (SLO_TTFA)
+            slo = getattr(self.pipeline, 'slo', None)
+            if isinstance(slo, SloController):
+                self.tracer.observers.append(slo.observe)
+            
+            # Pipeline runs and screenshots happen off the event callback
+            self.executor = JobExecutor(workers=job_workers(self.pipeline))
+            self._screenshot_pool = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="screenshot")
             
         except Exception as e:
             print(f"\n⚠️  Error during initialization: {e}")
@@ -76,37 +137,22 @@ class HotkeyListener(NSObject):
         """Start listening for events"""
         print("\nStarting event monitor...")
         
-        try:
-            self.app = NSApplication.sharedApplication()
-            
-            # Set up event monitors
-            mask = NSEventMaskKeyDown | NSEventMaskKeyUp
-            self.monitor = NSEvent.addGlobalMonitorForEventsMatchingMask_handler_(
-                mask, self.handle_event)
-            self.local_monitor = NSEvent.addLocalMonitorForEventsMatchingMask_handler_(
-                mask, self.handle_event)
-                
-            # Check if monitors were created successfully
-            if not self.monitor or not self.local_monitor:
-                print("\n⚠️  Error setting up event monitor: Failed to create monitors")
-                self.cleanup()
-                return False
-                
-            # Add successful monitors to list
-            if self.monitor:
-                self.monitors.append(self.monitor)
-            if self.local_monitor:
-                self.monitors.append(self.local_monitor)
-                
-            print("\n🎧 Setting up event monitor...")
-            
-        except Exception as e:
-            print(f"\n⚠️  Error setting up event monitor: {e}")
+        if not self.backend or not self.backend.start(self.handle_event):
             self.cleanup()
             return False
         
+        print(f"\n🎧 Listening for hotkeys ({self.backend.name})...")
+        if self.earcons:
+            self.earcons.open_in_background()
+        if self.preload and self.pipeline:
+            self.pipeline.load_in_background(warmup=self.warmup)
         return True
 
+    def run(self):
+        """Run the backend's event loop until stopped"""
+        if self.backend:
+            self.backend.run()
+
     def lazy_setup(self):
         """Lazy initialization of components when first needed"""
         if self.setup_complete:
@@ -117,8 +163,8 @@ class HotkeyListener(NSObject):
             self.recorder = AudioRecorder()
             self.player = AudioPlayer()
             
-            print("\n2. Loading AI pipeline...")
-            self.pipeline = ProcessingPipeline()
+            print("\n2. Setting up AI pipeline...")
+            self.pipeline = ProcessingPipeline(background=True)
             
             self.setup_complete = True
             return True
@@ -127,37 +173,71 @@ class HotkeyListener(NSObject):
             print(f"\n⚠️  Error during lazy setup: {e}")
             return False
 
+    def _register_hotkeys(self):
+        """Build the dispatch table used by handle_event"""
+        self.hotkey_manager.register_hotkey(
+            self.RECORD_HOTKEY, 'record',
+            callback=self._on_record_pressed,
+            release_callback=self._on_record_released)
+        self.hotkey_manager.register_hotkey(
+            self.QUIT_HOTKEY, 'quit', callback=self._on_quit)
+
+    def _on_record_pressed(self):
+        # Only start if not already recording
+        if not self.recording_in_progress:
+            self.start_recording()
+
+    def _on_record_released(self):
+        # Only stop if currently recording
+        if self.recording_in_progress:
+            self.stop_recording()
+
+    def _on_quit(self):
+        self.cleanup()
+
     def handle_event(self, event):
+        """Dispatch a key event to its hotkey binding
+
+        This runs for every key press system-wide, so events whose key code
+        isn't bound are rejected after a single set lookup. Key-downs for a
+        hotkey that is already held (auto-repeat) are ignored, and a key-up
+        is matched to its key-down by key code alone so releasing a modifier
+        first still ends the press.
+        """
         if event is None:
             return None
             
         try:
-            event_type = event.type()
             key_code = event.keyCode()
-            flags = event.modifierFlags()
-            
-            if __debug__:
-                print(f"\nDEBUG: Event received:")
-                print(f"  - Type: {event_type}")
-                print(f"  - KeyCode: {key_code}")
-                print(f"  - Flags: {flags}")
+            if key_code not in self.hotkey_manager.key_codes:
+                return event
             
-            # Handle Command+Shift+A (start/stop recording)
-            if key_code == 0 and flags & self.CMD_SHIFT_A_MASK:
-                if event_type == NSEventTypeKeyDown:
-                    # Only start if not already recording
-                    if not self.recording_in_progress:
-                        self.start_recording()
-                elif event_type == NSEventTypeKeyUp:
-                    # Only stop if currently recording
-                    if self.recording_in_progress:
-                        self.stop_recording()
-                    
-            # Handle Command+Shift+Q (quit)
-            elif key_code == 12 and flags & self.CMD_SHIFT_Q_MASK:
-                if event_type == NSEventTypeKeyDown:  # Only trigger on key down
-                    self.cleanup()
+            started = time.perf_counter()
+            event_type = event.type()
+            if event_type == KEY_DOWN:
+                if key_code in self._held:
+                    return event
+                binding = self.hotkey_manager.lookup(key_code, event.modifierFlags())
+                if binding is None:
+                    return event
+                action, on_press, on_release = binding
+                self._held[key_code] = on_release
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Hotkey %s pressed (keyCode=%d)", action, key_code)
+                if on_press:
+                    on_press()
+            elif event_type == KEY_UP:
+                if key_code not in self._held:
+                    return event
+                on_release = self._held.pop(key_code)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Hotkey released (keyCode=%d)", key_code)
+                if on_release:
+                    on_release()
+            else:
+                return event
                 
+            self.event_durations.append(time.perf_counter() - started)
             return event
             
         except Exception as e:
@@ -165,12 +245,55 @@ class HotkeyListener(NSObject):
             return event
 
     def start_recording(self):
-        """Start recording audio"""
+        """Start recording audio, cancelling any response still in flight"""
         if not self.recorder:
             return
+        started = time.perf_counter()
+        self.trace = trace = self.tracer.start()
+        trace.mark('key_down', at=started)
+        if self._release_gc:
+            self._release_gc()
+        self._release_gc = gc_control.hold()
+        barged_in = self.cancel_active()
+        # Don't let a cue leak into the microphone
+        if self.earcons:
+            self.earcons.stop()
         print("\n🎤 Starting recording...")
         self.recording_in_progress = True
         self.recorder.start()
+        if barged_in:
+            self._record_barge_in(time.perf_counter() - started)
+            trace.set(barge_in=True)
+        # Capture the screen as it was at key-down, without blocking the callback
+        self.screenshot_future = None
+        if self._screenshot_pool:
+            self.screenshot_future = self._screenshot_pool.submit(
+                self._traced_screenshot, trace)
+        # Reload an idle-unloaded model while the user is still speaking
+        if self.pipeline:
+            self.pipeline.prefetch()
+        if self.speculator:
+            if self.speculation:
+                self.speculation.discard()
+            self.speculation = self.speculator.start(self.recorder.snapshot,
+                                                     self.screenshot_future)
+
+    def cancel_active(self):
+        """Cancel the in-flight interaction, if any. Returns True if one was cancelled."""
+        token = self.active_token
+        if token is None or token.cancelled:
+            return False
+        token.cancel()
+        return True
+
+    def _record_barge_in(self, latency):
+        """Keep the key-down -> recording latency of a barge-in"""
+        self.barge_in_latencies.append(latency)
+        if latency > self.BARGE_IN_BUDGET:
+            print(f"⚠️  Barge-in took {latency * 1000:.1f} ms "
+                  f"(budget {self.BARGE_IN_BUDGET * 1000:.0f} ms)")
+        else:
+            logger.debug("Barge-in latency %.2f ms", latency * 1000)
 
     def stop_recording(self):
         """Stop recording and process audio"""
@@ -179,30 +302,140 @@ class HotkeyListener(NSObject):
             print("DEBUG: Not recording, nothing to stop")
             return False
         
+        # The interaction takes over the GC hold; any other exit releases it
+        release_gc, self._release_gc = self._release_gc or (lambda: None), None
+        speculation, self.speculation = self.speculation, None
+        if speculation:
+            speculation.stop()
+        handed_off = False
         try:
             if not self.recorder:
                 raise RuntimeError("Recorder not initialized")
             
             audio_data = self.recorder.stop()
             self.recording_in_progress = False
+            trace, self.trace = self.trace, None
+            if trace is not None:
+                trace.mark('key_up')
+                trace.add_span('capture', trace.started_at)
+                report = getattr(self.recorder, 'last_glitch_report', None)
+                if report is not None:
+                    trace.set(capture_glitches=report)
             
             if not audio_data:
                 print("DEBUG: No audio data captured")
                 return False
             
-            if not self.pipeline:
+            if not self.pipeline or not self.executor:
                 raise RuntimeError("Pipeline not initialized")
             
-            return self.pipeline.process(audio_data)
+            # Heard right away; loops until the response's first audio stops it.
+            # Started before the job exists, so a job that ends at once (e.g. a
+            # daemon "busy") stops it rather than being overtaken by it
+            if self.earcons:
+                self.earcons.play('ack', then='thinking')
+            # Only enqueue here; the worker runs the pipeline and playback
+            token = CancelToken()
+            self.active_token = token
+            if not self.executor.submit(self._run_interaction, audio_data,
+                                        self.screenshot_future, token, trace, release_gc,
+                                        speculation, cancel_token=token):
+                self.active_token = None
+                self.tracer.finish(trace, outcome='rejected')
+                print("⚠️  Still working on earlier requests, please try again")
+                if self.earcons:
+                    # Replaces the thinking cue
+                    self.earcons.play('busy')
+                return False
+            handed_off = True
+            return True
             
         except Exception as e:
             print(f"Error stopping recording: {e}")
             self.recording_in_progress = False
             return False
+        finally:
+            if not handed_off:
+                release_gc()
+                if speculation:
+                    speculation.discard()
+
+    def _run_interaction(self, audio_data, screenshot_future, token, trace=None,
+                         release_gc=None, speculation=None):
+        """Run the pipeline and play the response until done or cancelled
+
+        Calls `release_gc` when finished, so deferred collections run here,
+        after playback, rather than mid-response.
+        """
+        outcome = 'error'
+        try:
+            with tracing.activate(trace):
+                screenshot_path = screenshot_future.result() if screenshot_future else None
+                token.raise_if_cancelled()
+                if speculation:
+                    response_file = self.pipeline.process(audio_data, screenshot_path, token,
+                                                          speculation=speculation)
+                else:
+                    response_file = self.pipeline.process(audio_data, screenshot_path, token)
+                if isinstance(response_file, str) and self.player:
+                    self.player.play_file(response_file, cancel_token=token,
+                                          volume=getattr(self.pipeline, 'volume', 1.0))
+                outcome = 'ok' if response_file else 'empty'
+                return bool(response_file)
+        except CancelledError:
+            outcome = 'cancelled'
+            print("⏹️  Response cancelled")
+            return False
+        finally:
+            if self.active_token is token:
+                self.active_token = None
+            if speculation:
+                speculation.discard()
+            # Nothing more is coming: end the "thinking" cue if playback didn't
+            if self.earcons and self.active_token is None:
+                self.earcons.stop()
+            self.tracer.finish(trace, outcome=outcome)
+            if release_gc:
+                release_gc()
+
+    def get_stats(self):
+        """Event-handler timing and job queue instrumentation"""
+        durations = sorted(self.event_durations)
+        stats = {
+            "events": len(durations),
+            "event_p50_us": durations[len(durations) // 2] * 1e6 if durations else 0.0,
+            "event_max_us": durations[-1] * 1e6 if durations else 0.0,
+        }
+        if self.executor:
+            stats.update(self.executor.stats())
+        admission = getattr(self.pipeline, 'admission', None)
+        if admission is not None:
+            stats["stages"] = admission.stats()
+        memory = getattr(self.pipeline, 'memory', None)
+        if memory is not None:
+            stats["memory"] = memory.stats()
+        controller = gc_control.current()
+        if controller is not None:
+            stats["gc"] = controller.stats()
+        if self.speculator:
+            stats["speculation"] = self.speculator.stats()
+        slo = getattr(self.pipeline, 'slo', None)
+        if isinstance(slo, SloController):
+            stats["slo"] = slo.stats()
+        gate = getattr(self.pipeline, 'screen_gate', None)
+        if isinstance(gate, ScreenGate):
+            stats["screenshots"] = gate.stats()
+        ocr = getattr(self.pipeline, 'ocr', None)
+        if isinstance(ocr, ScreenOcr):
+            stats["ocr"] = ocr.stats()
+        return stats
 
     def cleanup(self):
         """Clean up resources and stop monitoring"""
         try:
+            # Abort any response still being generated or played
+            self.cancel_active()
+            
             # First stop recording if in progress
             if self.recording_in_progress:
                 try:
@@ -211,13 +444,12 @@ class HotkeyListener(NSObject):
                     pass
                 self.recording_in_progress = False
                 
-            # Clean up monitors
-            for monitor in list(self.monitors):
+            # Stop event delivery
+            if self.backend:
                 try:
-                    NSEvent.removeMonitor_(monitor)
-                    self.monitors.remove(monitor)
+                    self.backend.stop()
                 except Exception as e:
-                    print(f"Error removing monitor: {e}")
+                    print(f"Error stopping hotkey backend: {e}")
                     
             # Clean up audio resources
             if self.recorder:
@@ -233,6 +465,22 @@ class HotkeyListener(NSObject):
                 except:
                     pass
                 self.player = None
+            if self.earcons:
+                self.earcons.close()
+                self.earcons = None
+                
+            # Stop the worker before tearing down what it uses
+            if self.executor:
+                self.executor.shutdown()
+                self.executor = None
+            if self._screenshot_pool:
+                self._screenshot_pool.shutdown(wait=False)
+                self._screenshot_pool = None
+            if self.tracer:
+                self.tracer.close()
+            controller = gc_control.current()
+            if controller is not None:
+                print(controller.summary())
                 
             # Clean up pipeline
             if self.pipeline:
@@ -245,19 +493,32 @@ class HotkeyListener(NSObject):
         except Exception as e:
             print(f"Error during cleanup: {e}")
         finally:
-            self.monitors.clear()
             self.recording_in_progress = False
 
+    def _traced_screenshot(self, trace):
+        with trace.span('screenshot'):
+            path = self.take_screenshot()
+        # Read the screen's text while the user is still speaking
+        ocr = getattr(self.pipeline, 'ocr', None)
+        if path and isinstance(ocr, ScreenOcr):
+            ocr.prefetch(path)
+        return path
+
     def take_screenshot(self):
         """Capture and save screenshot"""
         try:
+            from PIL import ImageGrab
+            from PIL.PngImagePlugin import PngInfo
+            cursor = cursor_position()
             screenshot = ImageGrab.grab()
-            # Create screenshots directory if it doesn't exist
-            os.makedirs('screenshots', exist_ok=True)
-            # Save with timestamp
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            path = f'screenshots/screen_{timestamp}.png'
-            screenshot.save(path)
+            # Where the pointer was, for OCR of the region around it
+            info = PngInfo()
+            if cursor:
+                info.add_text(CURSOR_KEY, f"{cursor[0] * screenshot.width:.0f},"
+                                          f"{cursor[1] * screenshot.height:.0f}")
+            # Unique per capture: two requests in one second must not share a file
+            path = unique_path('screenshots', 'screen', 'png')
+            screenshot.save(path, pnginfo=info)
             print(f"Screenshot saved: {path}")
             return path
         except Exception as e:
@@ -269,8 +530,6 @@ class HotkeyListener(NSObject):
         print("\n\n⚠️  Interrupted by user")
         print("Cleaning up...")
         self.cleanup()
-        if self.app:
-            self.app.terminate_(None)
         sys.exit(0)
 
     def stop_recording_session(self):
@@ -295,4 +554,5 @@ if __name__ == "__main__":
     print("\n🎧 Initializing AI Assistant...")
     print("   This may take a few moments while models load\n")
     listener = HotkeyListener()
-    listener.start() 
\ No newline at end of file
+    if listener and listener.start():
+        listener.run() 
\ No newline at end of file
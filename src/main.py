@@ -1,15 +1,19 @@
+import argparse
+import importlib.util
 import time
 from datetime import datetime
 import signal
 import sys
 
 print("\n🎧 Initializing AI Assistant...")
-print("   This may take a few moments while models load")
+print("   Models load in the background; hotkeys work right away")
 print("   Press Ctrl+C at any time to quit\n")
 
 import os
 from dotenv import load_dotenv
-from hotkeys import HotkeyListener
+from src import gc_control, metrics
+from src.hotkeys import HotkeyListener
+from src.startup_profile import READY_MARKER, profile_startup
 
 def signal_handler(sig, frame):
     print("\n\n⚠️  Initialization interrupted by user")
@@ -34,25 +38,84 @@ def test_environment():
             os.makedirs(directory)
             print(f"     Created {directory}/ directory")
     
-    # Test basic imports
-    print("   • Testing imports...")
-    try:
-        import sounddevice as sd
-        print(f"     - sounddevice version: {sd.__version__}")
-    except ImportError as e:
-        print(f"❌ Error: Failed to import sounddevice: {e}")
-        return False
-        
-    try:
-        from faster_whisper import WhisperModel
-        print("     - faster_whisper imported successfully")
-    except ImportError as e:
-        print(f"❌ Error: Failed to import faster_whisper: {e}")
-        return False
+    # Check that heavy dependencies are installed without importing them;
+    # they load later, off the startup path
+    print("   • Checking dependencies...")
+    for module in ('sounddevice', 'faster_whisper'):
+        if importlib.util.find_spec(module) is None:
+            print(f"❌ Error: {module} is not installed")
+            return False
+        print(f"     - {module} found")
     
     return True
 
-def main():
+def startup_probe():
+    """Start the listener without loading models, report ready and exit
+
+    Run by --startup-profile in a child interpreter.
+    """
+    listener = HotkeyListener.alloc().init(preload=False)
+    if listener is None or not listener.start():
+        return 1
+    print(READY_MARKER, flush=True)
+    print(READY_MARKER, file=sys.stderr, flush=True)
+    listener.cleanup()
+    return 0
+
+def start_metrics(args, get_stats):
+    """Start the metrics endpoint if a port was given on the command line or in the env"""
+    port = args.metrics_port if args.metrics_port is not None else metrics.metrics_port()
+    if port is None:
+        return None
+    return metrics.serve(port, get_stats)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Voice-driven AI assistant")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="Measure time until hotkeys are live and show the slowest imports")
+    parser.add_argument('--startup-budget', type=float, default=1.0,
+                        help="Seconds allowed until hotkeys are live (default: 1.0)")
+    parser.add_argument('--module-budget', type=float, default=None,
+                        help="Seconds any single top-level import may take")
+    parser.add_argument('--warmup', action='store_true',
+                        help="Run warm-up inference after models load")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Keep models loaded and serve other front-ends over a Unix socket")
+    parser.add_argument('--connect', action='store_true',
+                        help="Use a running daemon instead of loading models here")
+    parser.add_argument('--asr-workers', type=int, default=1,
+                        help="Daemon: utterances transcribed concurrently (default: 1)")
+    parser.add_argument('--batch-window', type=float, default=0.02,
+                        help="Daemon: seconds to gather concurrent utterances into a batch")
+    parser.add_argument('--socket', default=None,
+                        help="Daemon socket path (default: $ASSISTANT_SOCKET or a per-user path)")
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help="Serve Prometheus metrics on localhost:PORT (default: $METRICS_PORT)")
+    parser.add_argument('--gc-mode', choices=gc_control.MODES, default=None,
+                        help="off, measure (time collector pauses) or realtime (also freeze "
+                             "after model load and defer collections between requests; "
+                             "default: $GC_MODE or off)")
+    parser.add_argument('--startup-probe', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    # Before anything reads its settings (GC_MODE, TRACE_FILE, HOTKEY_BACKEND,
+    # EARCONS...), including under --connect where no pipeline is built here
+    load_dotenv()
+    args = parse_args(argv)
+    if args.startup_probe:
+        sys.exit(startup_probe())
+    if args.startup_profile:
+        sys.exit(profile_startup(args.startup_budget, args.module_budget))
+    gc_control.configure(args.gc_mode)
+    if args.daemon:
+        from src.daemon import AssistantDaemon
+        daemon = AssistantDaemon(args.socket, warmup=args.warmup, asr_workers=args.asr_workers,
+                                 batch_window=args.batch_window)
+        start_metrics(args, daemon.stats)
+        daemon.serve_forever()
+        return
+    
     try:
         # Test environment first
         if not test_environment():
@@ -61,10 +124,22 @@ def main():
             
         # Initialize hotkey listener
         print("\n2. Initializing hotkey listener and components...")
-        listener = HotkeyListener()
+        pipeline = None
+        if args.connect:
+            from src.daemon import DaemonClient
+            try:
+                pipeline = DaemonClient(args.socket).connect()
+            except OSError as e:
+                print(f"\n❌ Could not reach the assistant daemon: {e}")
+                return
+        listener = HotkeyListener(warmup=args.warmup, pipeline=pipeline)
+        if listener is None:
+            print("\n❌ Failed to initialize components.")
+            return
+        start_metrics(args, listener.get_stats)
         
-        print("\nStarting event monitor...")
-        listener.start()
+        if listener.start():
+            listener.run()
         
     except KeyboardInterrupt:
         print("\n\n⚠️  Initialization interrupted by user")
@@ -0,0 +1,394 @@
+import os
+import threading
+from bisect import bisect_left
+
+# Opt-in: no endpoint unless METRICS_PORT (or --metrics-port) is set
+DEFAULT_HOST = '127.0.0.1'
+PREFIX = 'assistant_'
+
+# Seconds; covers a 10 ms encode up to a slow 30 s LLM answer
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        # Updates come from executor, daemon and audio threads at once
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {labels}")
+        return labels
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, per combination of label values
+
+    `inc()` is a dict lookup and an add under an uncontended lock: cheap
+    enough for audio callbacks, and no update is lost between threads.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name + '_total', _format_labels(self.labelnames, key), value
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values = {}
+
+    def set(self, value, *labels):
+        self._values[self._key(labels)] = value
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        for key, value in list(self._values.items()):
+            yield self.name, _format_labels(self.labelnames, key), value
+
+    def reset(self):
+        self._values.clear()
+
+
+class Histogram(_Metric):
+    """Bucketed observations, per combination of label values
+
+    `observe()` is a bisect and three adds under the metric's lock; buckets
+    are made cumulative only when the endpoint is scraped.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+
+    def observe(self, value, *labels):
+        key = self._key(labels)
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # counts per bucket (last one is +Inf), sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bucket] += 1
+            series[1] += value
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        bounds = self.buckets + (float('inf'),)
+        with self._lock:
+            # A consistent snapshot: every series' counts agree with its sum
+            series = [(key, list(counts), total)
+                      for key, (counts, total) in self._series.items()]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield (self.name + '_bucket',
+                       _format_labels(self.labelnames, key, [('le', _format_value(bound))]),
+                       cumulative)
+            labels = _format_labels(self.labelnames, key)
+            yield self.name + '_sum', labels, total
+            yield self.name + '_count', labels, cumulative
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Registry:
+    """Metrics plus collectors that produce gauges at scrape time
+
+    A collector is a callable returning an iterable of
+    (name, kind, help, [(labels dict, value), ...]); it runs only when the
+    endpoint is scraped, so queue depths and RSS cost nothing in between.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        self.collectors.append(collector)
+        return collector
+
+    def remove_collector(self, collector):
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def render(self):
+        """Everything in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines += metric.header()
+            lines += [f"{name}{labels} {_format_value(value)}"
+                      for name, labels, value in metric.samples()]
+        for collector in list(self.collectors):
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+                continue
+            for name, kind, help, samples in families:
+                name = PREFIX + name
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                suffix = '_total' if kind == 'counter' else ''
+                for labels, value in samples:
+                    label_text = _format_labels(labels.keys(), labels.values())
+                    lines.append(f"{name}{suffix}{label_text} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Zero every metric and drop collectors (for tests)"""
+        for metric in self.metrics:
+            metric.reset()
+        self.collectors.clear()
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'stage_seconds', "Duration of each pipeline stage", ('stage',)))
+LATENCY_SECONDS = REGISTRY.register(Histogram(
+    'latency_seconds', "Time from key-up to first token, first TTS byte and first audio",
+    ('event',)))
+REQUESTS = REGISTRY.register(Counter(
+    'requests', "Finished requests by outcome", ('outcome',)))
+AUDIO_XRUNS = REGISTRY.register(Counter(
+    'audio_xruns', "Audio callbacks reporting an overflow or underflow",
+    ('stream', 'kind')))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'cache_lookups', "Cache lookups by result (hit or miss)", ('cache', 'result')))
+API_TOKENS = REGISTRY.register(Counter(
+    'api_tokens', "Model tokens used per API", ('api', 'direction')))
+API_BYTES = REGISTRY.register(Counter(
+    'api_bytes', "Payload bytes sent to and received from each API", ('api', 'direction')))
+LOCAL_INTENTS = REGISTRY.register(Counter(
+    'local_intents', "Utterances answered locally, without the LLM or TTS", ('intent',)))
+
+# Marks reported relative to key-up, named as in tracing.STAGES
+LATENCY_MARKS = ('llm_first_token', 'tts_first_byte', 'first_audio_out')
+
+# (status flag, stream, kind); values are PortAudio's paInputUnderflow, etc.
+_XRUN_FLAGS = (
+    (0x1, 'input', 'underflow'),
+    (0x2, 'input', 'overflow'),
+    (0x4, 'output', 'underflow'),
+    (0x8, 'output', 'overflow'),
+)
+_XRUN_ATTRS = {
+    ('input', 'underflow'): 'input_underflow',
+    ('input', 'overflow'): 'input_overflow',
+    ('output', 'underflow'): 'output_underflow',
+    ('output', 'overflow'): 'output_overflow',
+}
+
+
+def record_audio_status(status):
+    """Count the xruns in an audio callback's status
+
+    Accepts PortAudio integer flags (PyAudio, virtual devices) and
+    sounddevice's CallbackFlags. Call it only when `status` is truthy.
+    """
+    for flag, stream, kind in _XRUN_FLAGS:
+        if isinstance(status, int):
+            hit = status & flag
+        else:
+            hit = getattr(status, _XRUN_ATTRS[stream, kind], False)
+        if hit:
+            AUDIO_XRUNS.inc(stream, kind)
+
+
+def cache_lookup(cache, hit):
+    CACHE_LOOKUPS.inc(cache, 'hit' if hit else 'miss')
+
+
+def observe_trace(trace, outcome=None):
+    """Feed a finished RequestTrace's spans and first-output marks into histograms"""
+    for name, (_, duration) in list(trace.spans.items()):
+        STAGE_SECONDS.observe(duration / 1000, name)
+    key_up = trace.marks.get('key_up')
+    for name in LATENCY_MARKS:
+        at = trace.marks.get(name)
+        if at is not None:
+            since = at - key_up if key_up is not None else at
+            LATENCY_SECONDS.observe(max(0.0, since) / 1000, name)
+    REQUESTS.inc(outcome or trace.attrs.get('outcome', 'unknown'))
+
+
+def stats_collector(get_stats):
+    """Collector exposing a listener's or daemon's stats() dict as gauges
+
+    Reports the job queue, per-stage admission queues, ASR throughput and
+    process RSS, all read when the endpoint is scraped.
+    """
+    def collect():
+        stats = get_stats()
+        depths = [({"queue": "jobs"}, stats.get("depth", 0))]
+        in_use, shed, waits = [], [], []
+        for name, stage in stats.get("stages", {}).items():
+            depths.append(({"queue": name}, stage["waiting"]))
+            in_use.append(({"stage": name}, stage["in_use"]))
+            shed.append(({"stage": name}, stage["shed"]))
+            waits.append(({"stage": name, "quantile": "0.5"}, stage["wait_p50"]))
+            waits.append(({"stage": name, "quantile": "0.95"}, stage["wait_p95"]))
+        yield 'queue_depth', 'gauge', "Requests waiting per queue", depths
+        yield 'stage_in_use', 'gauge', "Busy slots per pipeline stage", in_use
+        yield 'stage_shed', 'counter', "Requests shed per pipeline stage", shed
+        yield ('stage_wait_seconds', 'gauge', "Time admitted requests queued for a stage slot",
+               waits)
+        if "rejected" in stats:
+            yield ('jobs_rejected', 'counter', "Jobs rejected by a full queue",
+                   [({}, stats["rejected"])])
+
+        memory = stats.get("memory")
+        if memory is not None:
+            yield ('resident_memory_bytes', 'gauge', "Process RSS",
+                   [({}, int(memory["rss_mb"] * 2**20))])
+            yield ('component_memory_bytes', 'gauge', "RSS measured while loading each component",
+                   [({"component": name}, int(mb * 2**20))
+                    for name, mb in memory.get("components_mb", {}).items()])
+            yield ('model_loaded', 'gauge', "Whether Whisper is loaded",
+                   [({"model": memory["model_size"]}, int(memory["asr_loaded"]))])
+            yield ('model_evictions', 'counter', "Idle Whisper unloads",
+                   [({}, memory["evictions"])])
+
+        asr = stats.get("asr")
+        if asr is not None:
+            yield ('asr_real_time_factor', 'gauge', "Compute seconds per second of audio",
+                   [({}, asr["rtf"])])
+            yield ('asr_deadline_misses', 'counter', "Utterances dropped for a missed deadline",
+                   [({}, asr["deadline_misses"])])
+    return collect
+
+
+def _handler_class():
+    # http.server pulls in email/html; import it only when the endpoint starts
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            body = self.server.registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class MetricsServer:
+    """Serves the registry at http://host:port/metrics on a background thread
+
+    Binds to localhost by default; port 0 picks a free port (see `port`).
+    """
+
+    def __init__(self, port, host=DEFAULT_HOST, registry=REGISTRY):
+        self.host = host
+        self.requested_port = port
+        self.registry = registry
+        self._server = None
+        self._thread = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1] if self._server else self.requested_port
+
+    def start(self):
+        from http.server import ThreadingHTTPServer
+        self._server = ThreadingHTTPServer((self.host, self.requested_port), _handler_class())
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="metrics-http", daemon=True)
+        self._thread.start()
+        print(f"📈 Metrics at http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        self._thread = None
+
+
+def metrics_port():
+    """Port from METRICS_PORT, or None when the exporter is off"""
+    value = os.getenv('METRICS_PORT', '')
+    return int(value) if value else None
+
+
+def serve(port, get_stats=None, host=DEFAULT_HOST):
+    """Start the endpoint, exposing `get_stats()` gauges alongside the metrics"""
+    if get_stats is not None:
+        REGISTRY.add_collector(stats_collector(get_stats))
+    return MetricsServer(port, host).start()
@@ -1,3 +1,5 @@
+from .cancellation import CancelToken, CancelledError
+from .executor import JobExecutor
 from .pipeline import ProcessingPipeline
 
-__all__ = ['ProcessingPipeline']
+__all__ = ['CancelToken', 'CancelledError', 'JobExecutor', 'ProcessingPipeline']
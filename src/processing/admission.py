@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .cancellation import CancelledError
+
+# Concurrent runs allowed per stage. ASR is CPU-bound, so one run per ASR
+# worker; the LLM and TTS stages mostly wait on the network.
+DEFAULT_LIMITS = {
+    'asr': 1,
+    'llm': 4,
+    'tts': 4,
+}
+
+
+class Overloaded(Exception):
+    """A request was shed because a stage's wait queue was full"""
+
+
+class _Waiter:
+    __slots__ = ('event', 'granted', 'shed', 'queued_at')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+        self.shed = False
+        self.queued_at = time.perf_counter()
+
+
+class StageLimiter:
+    """A counting semaphore with a bounded, newest-first wait queue.
+
+    When every slot is busy a request waits, but at most `max_waiting` may
+    wait at once. A newer request pushes the oldest waiter out (it gets
+    Overloaded), and a freed slot goes to the newest waiter: with a voice
+    assistant the latest utterance is the one the user is waiting on.
+    """
+
+    def __init__(self, name, limit, max_waiting=2):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.in_use = 0
+        self._waiters = []
+        self._lock = threading.Lock()
+
+        # Instrumentation
+        self.admitted = 0
+        self.shed = 0
+        self.waits = deque(maxlen=1000)
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    def acquire(self, cancel_token=None):
+        """Take a slot, waiting if needed
+
+        Raises Overloaded if this request is shed and CancelledError if
+        `cancel_token` is cancelled while waiting.
+        """
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                self.admitted += 1
+                self.waits.append(0.0)
+                return
+            if len(self._waiters) >= self.max_waiting:
+                if not self._waiters:
+                    self.shed += 1
+                    raise Overloaded(f"{self.name} stage is full")
+                victim = self._waiters.pop(0)
+                victim.shed = True
+                victim.event.set()
+                self.shed += 1
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+
+        remove = cancel_token.on_cancel(waiter.event.set) if cancel_token else None
+        try:
+            waiter.event.wait()
+        finally:
+            if remove:
+                remove()
+
+        with self._lock:
+            if waiter.granted:
+                # The slot was handed over by release(); in_use already counts it
+                self.admitted += 1
+                self.waits.append(time.perf_counter() - waiter.queued_at)
+                return
+            if waiter.shed:
+                raise Overloaded(f"{self.name} stage is full")
+            self._waiters.remove(waiter)
+        raise CancelledError()
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.pop()
+                waiter.granted = True
+                waiter.event.set()
+            else:
+                self.in_use -= 1
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self.waits)
+            in_use, waiting = self.in_use, len(self._waiters)
+
+        def pct(q):
+            return waits[min(len(waits) - 1, int(q * len(waits)))] if waits else 0.0
+
+        return {
+            "limit": self.limit,
+            "in_use": in_use,
+            "waiting": waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "wait_p50": pct(0.50),
+            "wait_p95": pct(0.95),
+            "wait_max": waits[-1] if waits else 0.0,
+        }
+
+
+class AdmissionController:
+    """Per-stage concurrency limits for the pipeline.
+
+    Wrap each stage in `with controller.stage('asr', cancel_token):` so that
+    rapid hotkey presses or many daemon clients can't start unbounded
+    Whisper, Claude and TTS work at once.
+    """
+
+    def __init__(self, limits=None, max_waiting=2):
+        limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.max_waiting = max_waiting
+        self.stages = {name: StageLimiter(name, limit, max_waiting)
+                       for name, limit in limits.items()}
+
+    @contextmanager
+    def stage(self, name, cancel_token=None):
+        limiter = self.stages[name]
+        limiter.acquire(cancel_token)
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    @property
+    def capacity(self):
+        """Requests that can be inside the pipeline: every slot plus a full wait queue"""
+        return sum(limiter.limit for limiter in self.stages.values()) + self.max_waiting
+
+    @property
+    def shed(self):
+        return sum(limiter.shed for limiter in self.stages.values())
+
+    def stats(self):
+        """Slots, queue depth, sheds and queue-wait percentiles per stage"""
+        return {name: limiter.stats() for name, limiter in self.stages.items()}
+
+
+def job_workers(pipeline, default=1):
+    """JobExecutor workers for `pipeline`
+
+    Enough to fill its stages and their wait queues, so the stage limits
+    (newest first, shedding with a spoken "busy") decide what runs rather
+    than the executor. `default` for a pipeline without admission control,
+    such as a DaemonClient.
+    """
+    admission = getattr(pipeline, 'admission', None)
+    return admission.capacity if isinstance(admission, AdmissionController) else default
@@ -0,0 +1,268 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .cancellation import CancelledError
+
+# Sample rate faster-whisper expects for raw arrays
+WHISPER_RATE = 16000
+
+
+class DeadlineExceeded(Exception):
+    """An utterance's deadline passed before a worker could start on it"""
+
+
+def audio_duration(audio):
+    """Length in seconds of a file path or a 16 kHz array"""
+    if isinstance(audio, str):
+        import soundfile as sf
+        return sf.info(audio).duration
+    return len(audio) / WHISPER_RATE
+
+
+class _Utterance:
+    __slots__ = ('audio', 'duration', 'deadline', 'cancel_token', 'future', 'submitted_at')
+
+    def __init__(self, audio, duration, deadline, cancel_token):
+        self.audio = audio
+        self.duration = duration
+        self.deadline = deadline
+        self.cancel_token = cancel_token
+        self.future = Future()
+        self.submitted_at = time.monotonic()
+
+
+class AsrScheduler:
+    """Shares one Whisper model between concurrent utterances.
+
+    Submitted utterances are collected for up to `batch_window` seconds
+    after the first arrives (or until `max_batch` are waiting), ordered by
+    deadline and handed to a pool of `workers` threads that transcribe them
+    side by side. With a WhisperModel created with num_workers=workers,
+    CTranslate2 runs the calls in parallel, so cores stay busy instead of
+    idling between back-to-back transcribe() calls. A window of 0
+    dispatches immediately: pure interleaving across the pool.
+
+    `transcribe(audio, cancel_token)` does the actual work and returns text.
+    Utterances whose deadline passes before a worker is free fail with
+    DeadlineExceeded instead of delaying everything behind them.
+    """
+
+    def __init__(self, transcribe, workers=2, batch_window=0.02, max_batch=None,
+                 default_deadline=None):
+        self._transcribe = transcribe
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_batch = max_batch or workers
+        self.default_deadline = default_deadline
+        self._pending = []
+        self._cond = threading.Condition()
+        self._slots = threading.Semaphore(workers)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asr-worker")
+        self._stopped = False
+
+        # Instrumentation
+        self._stats_lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.deadline_misses = 0
+        self.batches = 0
+        self.batched_utterances = 0
+        self.audio_seconds = 0.0
+        self.compute_seconds = 0.0
+        self.first_submit = None
+        self.last_finish = None
+        self.queue_waits = deque(maxlen=1000)
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="asr-dispatch",
+                                            daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, audio, duration=None, deadline=None, cancel_token=None):
+        """Queue an utterance; returns a Future for its transcript
+
+        Args:
+            audio: File path or 16 kHz float32 array
+            duration: Audio length in seconds, for RTF (read from the audio if omitted)
+            deadline: Seconds from now by which transcription must start
+            cancel_token: Skip or stop the utterance once cancelled
+        """
+        if duration is None:
+            duration = audio_duration(audio)
+        deadline = self.default_deadline if deadline is None else deadline
+        absolute = None if deadline is None else time.monotonic() + deadline
+        utterance = _Utterance(audio, duration, absolute, cancel_token)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("ASR scheduler is shut down")
+            if self.first_submit is None:
+                self.first_submit = utterance.submitted_at
+            self._pending.append(utterance)
+            self._cond.notify()
+        return utterance.future
+
+    def transcribe(self, audio, duration=None, deadline=None, cancel_token=None):
+        """Submit and wait for the transcript"""
+        return self.submit(audio, duration, deadline, cancel_token).result()
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._stopped:
+                self._cond.wait()
+            if self._stopped:
+                return None
+            # Give concurrent utterances a moment to join this batch
+            window_ends = time.monotonic() + self.batch_window
+            while len(self._pending) < self.max_batch and not self._stopped:
+                remaining = window_ends - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            # Earliest deadline first; no deadline goes last, in arrival order
+            self._pending.sort(key=lambda u: (u.deadline is None, u.deadline or 0.0))
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            return batch
+
+    def _dispatch_loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            with self._stats_lock:
+                self.batches += 1
+                self.batched_utterances += len(batch)
+            for utterance in batch:
+                # Wait for a free worker so later arrivals can still be
+                # reordered ahead of this batch's tail
+                self._slots.acquire()
+                if not self._start(utterance):
+                    self._slots.release()
+
+    def _start(self, utterance):
+        """Hand an utterance to a worker; False if it was dropped instead"""
+        now = time.monotonic()
+        self.queue_waits.append(now - utterance.submitted_at)
+        if utterance.cancel_token is not None and utterance.cancel_token.cancelled:
+            utterance.future.set_exception(CancelledError())
+            return False
+        if utterance.deadline is not None and now > utterance.deadline:
+            with self._stats_lock:
+                self.deadline_misses += 1
+            utterance.future.set_exception(DeadlineExceeded(
+                f"waited {now - utterance.submitted_at:.3f}s for a worker"))
+            return False
+        self._pool.submit(self._run, utterance)
+        return True
+
+    def _run(self, utterance):
+        started = time.perf_counter()
+        try:
+            text = self._transcribe(utterance.audio, utterance.cancel_token)
+        except BaseException as e:
+            with self._stats_lock:
+                if not isinstance(e, CancelledError):
+                    self.failed += 1
+            utterance.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.completed += 1
+            self.audio_seconds += utterance.duration
+            self.compute_seconds += elapsed
+            self.last_finish = time.monotonic()
+        utterance.future.set_result(text)
+
+    def stats(self):
+        """Throughput counters: utterances/s over the active period and RTF"""
+        with self._stats_lock:
+            wall = ((self.last_finish - self.first_submit)
+                    if self.last_finish and self.first_submit else 0.0)
+            waits = sorted(self.queue_waits)
+            return {
+                "workers": self.workers,
+                "batch_window": self.batch_window,
+                "completed": self.completed,
+                "failed": self.failed,
+                "deadline_misses": self.deadline_misses,
+                "mean_batch": self.batched_utterances / self.batches if self.batches else 0.0,
+                "utterances_per_s": self.completed / wall if wall else 0.0,
+                # Compute time per second of audio; below 1 is faster than real time
+                "rtf": self.compute_seconds / self.audio_seconds if self.audio_seconds else 0.0,
+                # Wall time per second of audio across all workers
+                "effective_rtf": wall / self.audio_seconds if self.audio_seconds else 0.0,
+                "queue_wait_p50": waits[len(waits) // 2] if waits else 0.0,
+                "queue_wait_max": waits[-1] if waits else 0.0,
+            }
+
+    def shutdown(self):
+        """Fail queued utterances and stop the dispatcher and workers"""
+        with self._cond:
+            if self._stopped:
+                return
+            self._stopped = True
+            pending, self._pending = self._pending, []
+            self._cond.notify_all()
+        for utterance in pending:
+            utterance.future.set_exception(CancelledError())
+        self._dispatcher.join(timeout=1.0)
+        self._pool.shutdown(wait=False)
+
+
+def sweep_batch_windows(transcribe, clips, windows=(0.0, 0.01, 0.02, 0.05), workers=2,
+                        concurrency=4):
+    """Measure throughput against batch window for a fixed worker count
+
+    Submits every clip `concurrency` at a time (as that many clients would)
+    for each window and returns one stats() dict per window.
+    """
+    results = []
+    for window in windows:
+        scheduler = AsrScheduler(transcribe, workers=workers, batch_window=window)
+        try:
+            in_flight = deque()
+            for clip in clips:
+                if len(in_flight) >= concurrency:
+                    in_flight.popleft().result()
+                in_flight.append(scheduler.submit(clip))
+            for future in in_flight:
+                future.result()
+            results.append(scheduler.stats())
+        finally:
+            scheduler.shutdown()
+    return results
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ASR throughput versus batch window")
+    parser.add_argument('audio', nargs='?', default='output.wav')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--utterances', type=int, default=12)
+    parser.add_argument('--windows', default='0,0.01,0.02,0.05',
+                        help="Comma-separated batch windows in seconds")
+    args = parser.parse_args(argv)
+
+    from faster_whisper import WhisperModel
+    model = WhisperModel("base", device="cpu", compute_type="float32",
+                         download_root="./models", num_workers=args.workers)
+
+    def transcribe(audio, cancel_token):
+        segments, _ = model.transcribe(audio, beam_size=5)
+        return " ".join(segment.text for segment in segments)
+
+    windows = [float(w) for w in args.windows.split(',')]
+    clips = [args.audio] * args.utterances
+    print(f"{'window':>8} {'utt/s':>8} {'rtf':>6} {'eff rtf':>8} {'batch':>6} {'wait p50':>9}")
+    for stats in sweep_batch_windows(transcribe, clips, windows, args.workers, args.clients):
+        print(f"{stats['batch_window']:>8.3f} {stats['utterances_per_s']:>8.2f} "
+              f"{stats['rtf']:>6.2f} {stats['effective_rtf']:>8.2f} "
+              f"{stats['mean_batch']:>6.1f} {stats['queue_wait_p50'] * 1000:>7.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import threading
+import time
+
+
+class CancelledError(Exception):
+    """Raised inside a pipeline stage when its request has been cancelled"""
+
+
+class CancelToken:
+    """Cooperative cancellation shared by every stage of one interaction.
+
+    Stages either poll `raise_if_cancelled()` between units of work or
+    register a callback with `on_cancel()` that interrupts a blocking call,
+    e.g. closing an HTTP stream or waking a playback wait.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.cancelled_at = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """Cancel the interaction and run registered callbacks once"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.cancelled_at = time.perf_counter()
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in cancel callback: {e}")
+
+    def on_cancel(self, callback):
+        """Register a callback to run on cancel; returns a function that removes it
+
+        If the token is already cancelled the callback runs immediately.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback):
+        with self._lock:
+            try:
+                self._callbacks.remove(callback)
+            except ValueError:
+                pass
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise CancelledError()
+
+    def wait(self, timeout=None):
+        """Block until cancelled or the timeout expires; returns True if cancelled"""
+        return self._event.wait(timeout)
@@ -0,0 +1,136 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from .cancellation import CancelledError
+
+
+class JobExecutor:
+    """Run pipeline jobs on worker threads fed by a bounded queue.
+
+    `submit()` never blocks: when `max_pending` jobs are already waiting the
+    job is rejected and the caller decides how to tell the user. This keeps
+    callers such as the AppKit event monitor down to a queue put. One worker
+    (the default) runs jobs strictly in order; the daemon uses more so
+    requests from different clients overlap.
+    """
+
+    def __init__(self, max_pending=2, name="pipeline-worker", workers=1):
+        self.max_pending = max_pending
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stopped = False
+
+        # Instrumentation
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.queue_waits = deque(maxlen=1000)
+        self.running = 0
+        self._counter_lock = threading.Lock()
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"{name}-{i}" if workers > 1 else name,
+                             daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def depth(self):
+        """Jobs waiting to run (not counting the one running)"""
+        return self._queue.qsize()
+
+    def submit(self, fn, *args, cancel_token=None):
+        """Queue `fn(*args)` to run on the worker. Returns False if the queue is full."""
+        if self._stopped:
+            return False
+        try:
+            self._queue.put_nowait((fn, args, cancel_token, time.perf_counter()))
+        except queue.Full:
+            self.rejected += 1
+            return False
+        self.submitted += 1
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+        return True
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                fn, args, cancel_token, queued_at = job
+                self.queue_waits.append(time.perf_counter() - queued_at)
+                # Skip work that was cancelled while it sat in the queue
+                if cancel_token is not None and cancel_token.cancelled:
+                    continue
+                with self._counter_lock:
+                    self.running += 1
+                try:
+                    fn(*args)
+                    with self._counter_lock:
+                        self.completed += 1
+                except CancelledError:
+                    pass
+                except Exception as e:
+                    with self._counter_lock:
+                        self.failed += 1
+                    print(f"Error in pipeline job: {e}")
+                finally:
+                    with self._counter_lock:
+                        self.running -= 1
+            finally:
+                self._queue.task_done()
+
+    def wait_idle(self, timeout=None):
+        """Wait until every queued job has finished; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stats(self):
+        """Snapshot of queue and job counters"""
+        waits = sorted(self.queue_waits)
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queue_wait_p50": waits[len(waits) // 2] if waits else 0.0,
+            "queue_wait_max": waits[-1] if waits else 0.0,
+        }
+
+    def shutdown(self, timeout=1.0):
+        """Stop accepting jobs and let the worker exit after the current one"""
+        if self._stopped:
+            return
+        self._stopped = True
+        # Drop pending jobs, then wake each worker with a sentinel
+        while True:
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+            except queue.Empty:
+                break
+        deadline = time.monotonic() + timeout
+        for _ in self._threads:
+            try:
+                # With fewer slots than workers, wait for busy workers to take one
+                self._queue.put(None, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
@@ -0,0 +1,148 @@
+import os
+import re
+import shutil
+import subprocess
+import time
+
+# LOCAL_INTENTS: "rules" (default) matches the grammar below, "classifier"
+# also falls back to ExampleClassifier, "off" sends everything to the LLM
+MODES = ('off', 'rules', 'classifier')
+
+# Words that don't change what a short command means
+FILLER = {'please', 'hey', 'ok', 'okay', 'um', 'uh', 'so', 'now', 'just', 'assistant',
+          'claude', 'can', 'could', 'would', 'you', 'will'}
+
+# Whole-utterance patterns, applied after normalize(). Anchored so that
+# "stop the build from failing" still goes to the LLM.
+RULES = (
+    ('stop', r'(stop|cancel|never ?mind|forget it|shut up|be quiet|quiet|silence|enough)'
+             r'( that| it| talking)?'),
+    ('repeat', r'(repeat|say)( that| it)?( again)?|what did (you )?say|come again|'
+               r'again|pardon|sorry what'),
+    ('louder', r'(louder|speak up|(turn )?(the )?volume up|turn (it )?up|more volume)'),
+    ('quieter', r'(quieter|softer|(turn )?(the )?volume down|turn (it )?down|less volume|'
+                r'not so loud)'),
+    ('time', r"what( i|')?s the time|what time is it|(tell me )?the time|time"),
+)
+
+# Phrases the optional classifier compares utterances against
+EXAMPLES = {
+    'stop': ('stop talking', 'cancel that', 'never mind', 'that is enough'),
+    'repeat': ('repeat that', 'say that again', 'what did you say', 'i did not catch that',
+               'repeat the last answer'),
+    'louder': ('louder', 'turn the volume up', 'i can not hear you', 'speak louder'),
+    'quieter': ('quieter', 'turn the volume down', 'too loud', 'speak more quietly'),
+    'time': ('what time is it', 'what is the time', 'tell me the time', 'current time'),
+}
+
+VOLUME_STEP = 0.25
+MAX_VOLUME = 2.0
+
+
+class IntentState:
+    """What "repeat" and "louder"/"quieter" act on, kept per user
+
+    A local pipeline is its own state; the daemon keeps one per connection
+    so clients don't replay each other's answers or share a volume.
+    """
+
+    def __init__(self):
+        self.last_response = None
+        self.volume = 1.0
+
+
+def normalize(text):
+    """Lower-case words without punctuation or filler"""
+    words = re.findall(r"[a-z']+", text.lower())
+    return ' '.join(word for word in words if word not in FILLER)
+
+
+class ExampleClassifier:
+    """Nearest example phrase by word overlap: a tiny, dependency-free fallback
+
+    Scores are the Jaccard similarity of the word sets. Only utterances of
+    up to `max_words` words are considered, so real questions that happen
+    to share words with a command still reach the LLM.
+    """
+
+    def __init__(self, examples=EXAMPLES, threshold=0.6, max_words=6):
+        self.examples = [(intent, set(normalize(phrase).split()) or set(phrase.split()))
+                         for intent, phrases in examples.items() for phrase in phrases]
+        self.threshold = threshold
+        self.max_words = max_words
+
+    def classify(self, text):
+        """(intent, score) of the closest example, or (None, 0.0)"""
+        words = set(normalize(text).split())
+        if not words or len(words) > self.max_words:
+            return None, 0.0
+        best, best_score = None, 0.0
+        for intent, example in self.examples:
+            score = len(words & example) / len(words | example)
+            if score > best_score:
+                best, best_score = intent, score
+        if best_score < self.threshold:
+            return None, best_score
+        return best, best_score
+
+
+class IntentMatcher:
+    """Finds utterances the assistant can answer on its own"""
+
+    def __init__(self, rules=RULES, classifier=None):
+        self.rules = [(intent, re.compile(pattern)) for intent, pattern in rules]
+        self.classifier = classifier
+
+    @classmethod
+    def from_env(cls):
+        """The matcher LOCAL_INTENTS asks for, or None when it's "off" """
+        mode = os.getenv('LOCAL_INTENTS', 'rules')
+        if mode not in MODES:
+            raise ValueError(f"unknown LOCAL_INTENTS {mode!r}; expected one of {MODES}")
+        if mode == 'off':
+            return None
+        return cls(classifier=ExampleClassifier() if mode == 'classifier' else None)
+
+    def match(self, text):
+        """The intent name for `text`, or None if it needs the LLM"""
+        normalized = normalize(text or '')
+        if not normalized:
+            return None
+        for intent, pattern in self.rules:
+            if pattern.fullmatch(normalized):
+                return intent
+        if self.classifier is not None:
+            return self.classifier.classify(text)[0]
+        return None
+
+
+def spoken_time(now=None):
+    now = now or time.localtime()
+    hour = now.tm_hour % 12 or 12
+    minute = f"{now.tm_min:02d}" if now.tm_min else "o'clock"
+    return f"It's {hour} {minute} {'PM' if now.tm_hour >= 12 else 'AM'}."
+
+
+def speak_locally(text, directory='responses'):
+    """Synthesize `text` with the OS voice (say on macOS, espeak elsewhere)
+
+    Returns the audio file's path, or None if no local voice is installed;
+    nothing goes over the network.
+    """
+    from datetime import datetime
+
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, f"local_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+    if shutil.which('say'):
+        path, command = stem + '.aiff', ['say', '-o', stem + '.aiff', text]
+    elif shutil.which('espeak-ng') or shutil.which('espeak'):
+        voice = shutil.which('espeak-ng') or shutil.which('espeak')
+        path, command = stem + '.wav', [voice, '-w', stem + '.wav', text]
+    else:
+        return None
+    try:
+        subprocess.run(command, check=True, timeout=10, capture_output=True)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Local speech failed: {e}")
+        return None
+    return path
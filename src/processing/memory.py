@@ -0,0 +1,134 @@
+import gc
+import os
+import subprocess
+import sys
+import threading
+from contextlib import contextmanager
+
+# Whisper sizes from largest to smallest; downgrades walk down this list
+MODEL_SIZES = ('large-v2', 'medium', 'small', 'base', 'tiny')
+
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    if sys.platform.startswith('linux'):
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    # macOS has no /proc; ps reports RSS in KiB
+    output = subprocess.run(['ps', '-o', 'rss=', '-p', str(os.getpid())],
+                            capture_output=True, text=True).stdout
+    return int(output.strip() or 0) * 1024
+
+
+def release_memory():
+    """Collect garbage and hand freed heap pages back to the OS where possible"""
+    gc.collect()
+    if sys.platform.startswith('linux'):
+        try:
+            import ctypes
+            ctypes.CDLL('libc.so.6').malloc_trim(0)
+        except (OSError, AttributeError):
+            pass
+
+
+def smaller_model(size):
+    """Next smaller Whisper size, or None if `size` is already the smallest"""
+    try:
+        index = MODEL_SIZES.index(size)
+    except ValueError:
+        return None
+    return MODEL_SIZES[index + 1] if index + 1 < len(MODEL_SIZES) else None
+
+
+class ComponentMemory:
+    """RSS attributed to each component, measured around its load"""
+
+    def __init__(self):
+        self.components = {}
+
+    @contextmanager
+    def measure(self, name):
+        """Record the RSS growth of the with block as `name`"""
+        before = rss_bytes()
+        yield
+        self.components[name] = max(0, rss_bytes() - before)
+
+    def forget(self, name):
+        self.components.pop(name, None)
+
+    def stats(self):
+        return {name: size / 2**20 for name, size in self.components.items()}
+
+
+class MemoryManager:
+    """Unloads the ASR model when idle and keeps RSS under a ceiling.
+
+    Every `interval` seconds it checks the pipeline: a model unused for
+    `idle_timeout` seconds is unloaded (the pipeline reloads it in the
+    background on the next key-down), and if RSS exceeds `ceiling_mb` the
+    model is swapped for the next smaller size. Nothing is touched while a
+    request is in flight.
+    """
+
+    def __init__(self, pipeline, idle_timeout=None, ceiling_mb=None, interval=10.0):
+        self.pipeline = pipeline
+        self.idle_timeout = idle_timeout
+        self.ceiling_mb = ceiling_mb
+        self.interval = interval
+        self.evictions = 0
+        self.downgrades = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return bool(self.idle_timeout or self.ceiling_mb)
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-manager", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error in memory manager: {e}")
+
+    def check(self):
+        """Run one eviction/ceiling pass; returns what it did, if anything"""
+        pipeline = self.pipeline
+        if self.ceiling_mb and rss_bytes() > self.ceiling_mb * 2**20:
+            target = smaller_model(pipeline.model_size)
+            if target and pipeline.downgrade_asr(target):
+                self.downgrades += 1
+                print(f"\n🧠 Over {self.ceiling_mb} MB, switched Whisper to '{target}'")
+                return 'downgrade'
+        if (self.idle_timeout and pipeline.model is not None
+                and pipeline.idle_for() > self.idle_timeout):
+            if pipeline.unload_asr():
+                self.evictions += 1
+                print(f"\n🧠 Idle for {self.idle_timeout:.0f}s, unloaded Whisper")
+                return 'evict'
+        return None
+
+    def stats(self):
+        return {
+            "rss_mb": rss_bytes() / 2**20,
+            "ceiling_mb": self.ceiling_mb,
+            "idle_timeout": self.idle_timeout,
+            "model_size": self.pipeline.model_size,
+            "asr_loaded": self.pipeline.model is not None,
+            "evictions": self.evictions,
+            "downgrades": self.downgrades,
+            "components_mb": self.pipeline.component_memory.stats(),
+        }
@@ -0,0 +1,261 @@
+import io
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import metrics, tracing
+from .screen_gate import image_tokens
+
+# SCREEN_OCR: "off" (default) always sends the image, "text" sends the text
+# read near the cursor instead when it's confident, "thumbnail" sends that
+# text plus a small JPEG of the whole screen
+MODES = ('off', 'text', 'thumbnail')
+
+# Longest side of the thumbnail sent with the text
+THUMBNAIL = 512
+
+# PNG text chunk where take_screenshot() stores the cursor position
+CURSOR_KEY = 'cursor'
+
+SCREEN_OCR = metrics.REGISTRY.register(metrics.Counter(
+    'screen_ocr', "Screenshots sent as OCR text, or as an image when OCR wasn't confident",
+    ('decision',)))
+
+
+def text_tokens(text):
+    """Rough token count: about four characters per token for prose and code"""
+    return math.ceil(len(text) / 4)
+
+
+def cursor_position():
+    """Pointer position as fractions (x, y) of the main screen, or None
+
+    Uses AppKit on macOS and Xlib on X11, whichever is importable.
+    """
+    try:
+        from AppKit import NSEvent, NSScreen
+        location = NSEvent.mouseLocation()
+        frame = NSScreen.mainScreen().frame()
+        # AppKit counts y up from the bottom of the screen
+        return (location.x / frame.size.width, 1 - location.y / frame.size.height)
+    except Exception:
+        pass
+    try:
+        from Xlib import display
+        connection = display.Display()
+        try:
+            screen = connection.screen()
+            pointer = screen.root.query_pointer()
+            return (pointer.root_x / screen.width_in_pixels,
+                    pointer.root_y / screen.height_in_pixels)
+        finally:
+            connection.close()
+    except Exception:
+        return None
+
+
+def tesseract_words(image):
+    """[(line key, word, confidence)] from Tesseract, or None if it isn't installed"""
+    try:
+        import pytesseract
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    except Exception:
+        return None
+    words = []
+    for i, word in enumerate(data['text']):
+        confidence = float(data['conf'][i])
+        if word.strip() and confidence >= 0:
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            words.append((key, word, confidence))
+    return words
+
+
+class OcrResult:
+    __slots__ = ('text', 'confidence', 'words', 'seconds', 'region')
+
+    def __init__(self, text, confidence, words, seconds, region):
+        self.text = text
+        self.confidence = confidence
+        self.words = words
+        self.seconds = seconds
+        self.region = region
+
+
+class ScreenOcr:
+    """Reads the text near the cursor so Claude can get it instead of the image
+
+    A terminal, editor or document costs far fewer tokens and upload bytes
+    as text than as a base64 PNG. `content()` returns the text (and, in
+    "thumbnail" mode, a small JPEG of the whole screen) when Tesseract read
+    at least `min_words` words with a mean confidence of `min_confidence`;
+    otherwise None, and the caller sends the image as usual. `region` is the
+    share of the screen's width and height read around the cursor.
+
+    The listener calls `prefetch()` right after the key-down capture, so OCR
+    overlaps the recording rather than adding to the response time.
+    """
+
+    def __init__(self, thumbnail=False, min_confidence=80.0, min_words=15, region=0.5,
+                 engine=tesseract_words):
+        self.thumbnail = thumbnail
+        self.min_confidence = min_confidence
+        self.min_words = min_words
+        self.region = region
+        self.engine = engine
+        self.used_text = 0
+        self.used_image = 0
+        self.ocr_seconds = 0.0
+        self.tokens_saved = 0
+        self._pending = OrderedDict()
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """The OCR stage SCREEN_OCR asks for, or None when it's "off" """
+        mode = os.getenv('SCREEN_OCR', 'off')
+        if mode not in MODES:
+            raise ValueError(f"unknown SCREEN_OCR {mode!r}; expected one of {MODES}")
+        if mode == 'off':
+            return None
+        return cls(thumbnail=mode == 'thumbnail',
+                   min_confidence=float(os.getenv('SCREEN_OCR_CONFIDENCE', 80)),
+                   region=float(os.getenv('SCREEN_OCR_REGION', 0.5)))
+
+    def crop_box(self, size, cursor):
+        """(left, top, right, bottom) of the region around `cursor` (pixels)"""
+        width, height = size
+        if cursor is None or self.region >= 1:
+            return (0, 0, width, height)
+        box_width, box_height = int(width * self.region), int(height * self.region)
+        left = min(max(0, int(cursor[0]) - box_width // 2), width - box_width)
+        top = min(max(0, int(cursor[1]) - box_height // 2), height - box_height)
+        return (left, top, left + box_width, top + box_height)
+
+    def extract(self, path):
+        """OCR the region near the cursor recorded in the screenshot; None on failure"""
+        from PIL import Image
+
+        started = time.perf_counter()
+        try:
+            with Image.open(path) as image:
+                cursor = image.info.get(CURSOR_KEY)
+                if cursor:
+                    cursor = tuple(float(value) for value in cursor.split(','))
+                box = self.crop_box(image.size, cursor)
+                words = self.engine(image.crop(box).convert('L'))
+        except Exception as e:
+            print(f"   - OCR failed: {e}")
+            return None
+        if words is None:
+            return None
+        lines = OrderedDict()
+        for key, word, _ in words:
+            lines.setdefault(key, []).append(word)
+        text = "\n".join(" ".join(line) for line in lines.values())
+        weight = sum(len(word) for _, word, _ in words)
+        confidence = (sum(len(word) * conf for _, word, conf in words) / weight
+                      if weight else 0.0)
+        return OcrResult(text, confidence, len(words), time.perf_counter() - started, box)
+
+    def prefetch(self, path):
+        """Start reading `path` in the background; returns its future
+
+        Results are kept per file version (path and modification time), so
+        a screenshot rewritten under the same name is read again.
+        """
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            key = (path, None)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                self._pending.move_to_end(key)
+                return future
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+            future = self._pending[key] = self._pool.submit(self.extract, path)
+            while len(self._pending) > 4:
+                self._pending.popitem(last=False)
+            return future
+
+    def read(self, path):
+        """The OcrResult for `path`, shared by every request that uses it"""
+        started = time.perf_counter()
+        result = self.prefetch(path).result()
+        # Only the part of OCR the request actually waited for
+        tracing.add_span('ocr', started)
+        return result
+
+    def content(self, path):
+        """(description, Claude content blocks) for the screen as text, or None"""
+        result = self.read(path)
+        confident = (result is not None and result.words >= self.min_words
+                     and result.confidence >= self.min_confidence)
+        trace = tracing.current()
+        if trace is not None and result is not None:
+            trace.set(ocr={"used": confident, "confidence": round(result.confidence, 1),
+                           "words": result.words, "ms": round(result.seconds * 1000, 1)})
+        with self._lock:
+            if result is not None:
+                self.ocr_seconds += result.seconds
+            if not confident:
+                self.used_image += 1
+        if not confident:
+            SCREEN_OCR.inc('image')
+            return None
+
+        blocks = [{"type": "text",
+                   "text": f"Text on my screen near the cursor (OCR):\n```\n{result.text}\n```"}]
+        description = "the text on my screen below"
+        sent = text_tokens(result.text)
+        thumbnail = self._thumbnail(path) if self.thumbnail else None
+        if thumbnail is not None:
+            import base64
+            data, tokens = thumbnail
+            blocks.append({"type": "image", "source": {
+                "type": "base64", "media_type": "image/jpeg",
+                "data": base64.b64encode(data).decode()}})
+            description += " and a thumbnail of the whole screen"
+            sent += tokens
+        saved = (image_tokens(path) or 0) - sent
+        with self._lock:
+            self.used_text += 1
+            self.tokens_saved += max(0, saved)
+        SCREEN_OCR.inc('text')
+        return description, blocks
+
+    def _thumbnail(self, path):
+        """(JPEG bytes, estimated tokens) of a small copy of the screen, or None"""
+        try:
+            from PIL import Image
+            with Image.open(path) as image:
+                image = image.convert('RGB')
+                image.thumbnail((THUMBNAIL, THUMBNAIL))
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=70)
+                width, height = image.size
+            return buffer.getvalue(), int(width * height / 750)
+        except Exception:
+            return None
+
+    def stats(self):
+        with self._lock:
+            total = self.used_text + self.used_image
+            return {
+                "used_text": self.used_text,
+                "used_image": self.used_image,
+                "ocr_ms": round(self.ocr_seconds / total * 1000, 1) if total else None,
+                "tokens_saved": self.tokens_saved,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pending.clear()
+        if pool is not None:
+            pool.shutdown(wait=False)
@@ -1,38 +1,183 @@
 from dotenv import load_dotenv
 import os
+import threading
 import time
+from contextlib import contextmanager, nullcontext
+
+from .. import gc_control, metrics, tracing
+from .admission import AdmissionController, Overloaded
+from .cancellation import CancelToken, CancelledError
+from .intents import MAX_VOLUME, VOLUME_STEP, IntentMatcher, speak_locally, spoken_time
+from .memory import ComponentMemory, MemoryManager, release_memory
+from .ocr import ScreenOcr
+from .screen_gate import ScreenGate
+from .slo import DEFAULT_SETTINGS, SloController
+
+
+def unique_path(directory, prefix, extension):
+    """A new file name in `directory`, timestamped for humans and unique per call
+
+    Requests run concurrently, so a timestamp alone can repeat within a second.
+    """
+    import uuid
+    from datetime import datetime
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(directory, f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}.{extension}")
 
 
 class ProcessingPipeline:
-    def __init__(self):
-        """Initialize the processing pipeline with necessary models and clients"""
+    # Set by load_in_background(); None means models load on first use
+    _loader = None
+    # Set while warm_up() runs so a real request can stop it
+    _warmup_token = None
+    # AsrScheduler shared by concurrent requests; None transcribes inline
+    asr = None
+    # Per-stage concurrency limits; None runs stages unrestricted
+    admission = None
+    # Idle eviction / memory ceiling; None never unloads anything
+    memory = None
+    _asr_loader = None
+    _in_flight = 0
+    last_used = 0.0
+    # Matches commands answered without the LLM; None sends everything to it
+    intents = None
+    # Path of the last spoken LLM response, for "repeat that", and the playback
+    # gain set by "louder" / "quieter": the default IntentState (see process())
+    last_response = None
+    volume = 1.0
+    # Latency controller picking quality settings (SLO_TTFA); None keeps full quality
+    slo = None
+    # Withholds the screenshot from questions that don't refer to the screen
+    screen_gate = None
+    # Sends text read off the screen instead of the image (SCREEN_OCR)
+    ocr = None
+    
+    # Longest side of a screenshot sent at the "reduced" quality level
+    REDUCED_SCREENSHOT = 1024
+    
+    BUSY_MESSAGE = "Sorry, I'm still working on other requests. Please try again in a moment."
+    
+    def __init__(self, background=False, asr_workers=1, asr_batch_window=0.02,
+                 stage_limits=None, max_waiting=2, model_size=None, idle_timeout=None,
+                 memory_ceiling_mb=None):
+        """Initialize the processing pipeline with necessary models and clients
+
+        Args:
+            background: Don't load anything yet. Call load_in_background()
+                once the app is up, or let the first request load them.
+            asr_workers: Concurrent transcriptions. Above 1, requests go
+                through an AsrScheduler (server mode).
+            asr_batch_window: Seconds the scheduler waits to gather
+                concurrent utterances into one batch
+            stage_limits: Concurrent runs per stage, e.g. {'llm': 2};
+                see admission.DEFAULT_LIMITS (ASR defaults to asr_workers)
+            max_waiting: Requests that may queue per stage before the
+                oldest is shed with a spoken "busy" response
+            model_size: Whisper size (WHISPER_MODEL, default "base")
+            idle_timeout: Unload Whisper after this many idle seconds
+                (ASR_IDLE_UNLOAD); it reloads on the next key-down
+            memory_ceiling_mb: Switch to a smaller Whisper when RSS goes
+                above this (MEMORY_CEILING_MB)
+        """
         print("   Loading environment configuration...")
         load_dotenv()
         
+        self.model_size = model_size or os.getenv('WHISPER_MODEL', 'base')
+        self.tts_model = os.getenv('TTS_MODEL', 'tts-1')
+        self.component_memory = ComponentMemory()
+        self.last_used = time.monotonic()
+        self.model = None
+        self.anthropic_client = None
+        self.tts_client = None
+        self.load_error = None
+        self.warmup_report = None
+        self.asr_workers = asr_workers
+        self.asr_batch_window = asr_batch_window
+        self.admission = AdmissionController(
+            dict({'asr': asr_workers}, **(stage_limits or {})), max_waiting)
+        self._load_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self.memory = MemoryManager(
+            self,
+            idle_timeout or float(os.getenv('ASR_IDLE_UNLOAD', 0)) or None,
+            memory_ceiling_mb or float(os.getenv('MEMORY_CEILING_MB', 0)) or None)
+        self.memory.start()
+        self.intents = IntentMatcher.from_env()
+        self.slo = SloController.from_env(self)
+        self.screen_gate = ScreenGate.from_env()
+        self.ocr = ScreenOcr.from_env()
+        
+        if not background:
+            self.load_models()
+    
+    @property
+    def settings(self):
+        """Quality settings for the next request (see slo.LADDER)"""
+        return self.slo.settings if self.slo else DEFAULT_SETTINGS
+    
+    @property
+    def ready(self):
+        return all([self.model, self.anthropic_client, self.tts_client])
+        
+    def load_models(self, show_progress=True):
+        """Load whichever of Whisper and the API clients aren't loaded yet"""
+        with self._load_lock:
+            if self.ready:
+                return
+            self._load_models(show_progress)
+        
+    def _load_models(self, show_progress):
         print("   Loading AI models and clients...")
-        print("      • Loading Whisper (this may take 15-20 seconds)...")
-        print("        Please wait", end="", flush=True)
+        if self.model is None:
+            self._load_asr(show_progress)
+        
+        if self.anthropic_client is None:
+            print("      • Loading Anthropic client...")
+            with self.component_memory.measure('anthropic'):
+                from anthropic import Anthropic
+                self.anthropic_client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+        
+        if self.tts_client is None:
+            print("      • Loading OpenAI TTS client...")
+            with self.component_memory.measure('openai'):
+                from openai import OpenAI
+                self.tts_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        
+        # Everything loaded so far lives as long as the process
+        gc_control.model_loaded()
+        print("\n✅ Processing pipeline ready!")
+        
+    def _load_asr(self, show_progress=False):
+        print(f"      • Loading Whisper '{self.model_size}' (this may take 15-20 seconds)...")
+        if show_progress:
+            print("        Please wait", end="", flush=True)
         
         # Show loading indicator while model loads
         loading_thread = None
         try:
-            import threading
-            
             def loading_indicator():
                 while loading_thread and loading_thread.is_alive():
                     print(".", end="", flush=True)
                     time.sleep(0.5)
             
-            loading_thread = threading.Thread(target=loading_indicator)
-            loading_thread.start()
+            if show_progress:
+                loading_thread = threading.Thread(target=loading_indicator)
+                loading_thread.start()
             
-            from faster_whisper import WhisperModel
-            self.model = WhisperModel(
-                "base",
-                device="cpu",
-                compute_type="float32",
-                download_root="./models"
-            )
+            with self.component_memory.measure('asr'):
+                from faster_whisper import WhisperModel
+                self.model = WhisperModel(
+                    self.model_size,
+                    device="cpu",
+                    compute_type="float32",
+                    download_root="./models",
+                    num_workers=self.asr_workers
+                )
+            if self.asr_workers > 1:
+                from .asr_scheduler import AsrScheduler
+                self.asr = AsrScheduler(self.transcribe_text, workers=self.asr_workers,
+                                        batch_window=self.asr_batch_window)
             
             # Stop loading indicator
             loading_thread = None
@@ -43,116 +188,495 @@ class ProcessingPipeline:
             print(f"\n        ❌ Error loading model: {str(e)}")
             raise
         
-        print("      • Loading Anthropic client...")
-        from anthropic import Anthropic
-        self.anthropic_client = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+    def unload_asr(self):
+        """Drop the Whisper model unless a request is using it; True if unloaded"""
+        with self._load_lock:
+            if self.model is None or self._in_flight:
+                return False
+            self._drop_asr()
+        release_memory()
+        return True
         
-        print("      • Loading OpenAI TTS client...")
-        from openai import OpenAI
-        self.tts_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    def _drop_asr(self):
+        # The load froze Whisper's objects (realtime GC mode); thaw them so
+        # release_memory() can free the model, and the reload freezes anew
+        gc_control.model_unloading()
+        if self.asr is not None:
+            self.asr.shutdown()
+            self.asr = None
+        self.model = None
+        self.component_memory.forget('asr')
         
-        print("\n✅ Processing pipeline ready!")
+    def downgrade_asr(self, model_size):
+        """Replace Whisper with a smaller size when idle; True if switched"""
+        with self._load_lock:
+            if self._in_flight:
+                return False
+            was_loaded = self.model is not None
+            self._drop_asr()
+            self.model_size = model_size
+        release_memory()
+        if was_loaded:
+            self.prefetch()
+        return True
+        
+    def prefetch(self):
+        """Reload an unloaded Whisper in the background, e.g. on key-down
+
+        The reload overlaps with the user speaking; process() waits for it
+        only if it hasn't finished by the time the recording stops.
+        """
+        self.last_used = time.monotonic()
+        if self.model is not None:
+            return
+        # The initial background load is still running
+        if self._loader is not None and not self._loaded.is_set():
+            return
+        loader = self._asr_loader
+        if loader is not None and loader.is_alive():
+            return
+        
+        def load():
+            try:
+                self.load_models(show_progress=False)
+            except Exception as e:
+                print(f"Error reloading models: {e}")
+        
+        self._asr_loader = threading.Thread(target=load, name="asr-reload", daemon=True)
+        self._asr_loader.start()
+        
+    def idle_for(self):
+        """Seconds since the last request or key-down; 0 while one is running"""
+        if self._in_flight:
+            return 0.0
+        return time.monotonic() - self.last_used
+        
+    def load_in_background(self, warmup=False):
+        """Start loading models on a background thread
+
+        With warmup=True the same thread then runs warm_up() so the first
+        real request doesn't pay one-time costs. Requests don't wait for the
+        warm-up, and the first one to arrive stops it.
+        """
+        if self._loader is not None or self.ready:
+            return
         
-    def transcribe_audio(self, audio_path):
+        def load():
+            try:
+                self.load_models(show_progress=False)
+            except Exception as e:
+                self.load_error = e
+                return
+            finally:
+                self._loaded.set()
+            # Have the "busy" message ready before it is needed under load
+            self.busy_response()
+            if warmup:
+                self.warm_up()
+        
+        self._loader = threading.Thread(target=load, name="model-loader", daemon=True)
+        self._loader.start()
+        
+    def wait_until_ready(self, timeout=None):
+        """Block until models are loaded, loading them here if nobody started to
+
+        Also reloads a model the memory manager unloaded, joining a reload
+        that prefetch() already started.
+        """
+        if self._loader is not None:
+            if not self._loaded.wait(timeout):
+                return False
+            if self.load_error:
+                raise self.load_error
+        if not self.ready:
+            self.load_models()
+        return self.ready
+        
+    def warm_up(self, rounds=3):
+        """Run warm-up inference and API priming, then print the cold penalty"""
+        from .warmup import warm_up
+        
+        self._warmup_token = CancelToken()
+        report = warm_up(self, rounds=rounds, cancel_token=self._warmup_token)
+        self._warmup_token = None
+        self.warmup_report = report
+        print("\n🔥 Warm-up: " + "; ".join(report.summary()))
+        return report
+        
+    def transcribe_segments(self, audio):
+        """Run Whisper on a path or 16 kHz float32 array; yields segments lazily"""
+        segments, info = self.model.transcribe(audio, beam_size=self.settings['beam_size'])
+        return segments
+        
+    def transcribe_audio(self, audio_path, cancel_token=None):
         """Transcribe audio file using Whisper"""
         print("\n🎤 Transcribing your message...")
-        segments, info = self.whisper_model.transcribe(audio_path, beam_size=5)
-        
-        # Combine all segments into one text
-        transcript = " ".join(segment.text for segment in segments)
+        if self.asr is not None:
+            transcript = self.asr.transcribe(audio_path, cancel_token=cancel_token)
+        else:
+            transcript = self.transcribe_text(audio_path, cancel_token)
         print(f"📝 Transcription: \"{transcript}\"")
         return transcript
+        
+    def transcribe_text(self, audio, cancel_token=None):
+        """Run Whisper and join the segments, stopping between segments if cancelled"""
+        texts = []
+        for segment in self.transcribe_segments(audio):
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            texts.append(segment.text)
+        return " ".join(texts)
     
-    def get_ai_response(self, transcript, screenshot_path):
-        """Get AI response from Claude using transcript and screenshot context"""
+    def get_ai_response(self, transcript, screenshot_path, cancel_token=None, usage=None):
+        """Get AI response from Claude using transcript and screenshot context
+
+        If `usage` is a dict it receives the 'input'/'output' token counts
+        Claude reported, also when the stream is cancelled part way.
+        """
         print("\n🤖 Getting AI response...")
-        print("   - Reading screenshot...")
+        settings = self.settings
+        with_image = bool(screenshot_path) and settings['screenshot'] != 'none'
+        if with_image and self.screen_gate:
+            with_image = self.screen_gate.decide(transcript, screenshot_path)
+            if not with_image:
+                print("   - Question doesn't refer to the screen, leaving the screenshot out")
+        # Text read off the screen replaces the image when OCR is confident
+        screen_text = self.ocr.content(screenshot_path) if with_image and self.ocr else None
+        if screen_text:
+            print("   - Sending the text on screen instead of the screenshot")
+            with_image = False
         
-        # Read screenshot as base64 for Claude
-        with open(screenshot_path, "rb") as img_file:
+        prompt = f"Here is my question/request: {transcript}\nPlease help me with this"
+        if screen_text:
+            prompt += f", taking into account {screen_text[0]}."
+        elif with_image:
+            prompt += ", taking into account the screenshot of my current work context."
+        else:
+            prompt += "."
+        if settings['brevity']:
+            prompt += " " + settings['brevity']
+        content = [{
+            "type": "text",
+            "text": prompt
+        }]
+        if screen_text:
+            content.extend(screen_text[1])
+        encode = None
+        if with_image:
+            print("   - Reading screenshot...")
+            # Read screenshot as base64 for Claude
             import base64
-            image_base64 = base64.b64encode(img_file.read()).decode()
+            encode_started = time.perf_counter()
+            media_type, image = self._read_screenshot(screenshot_path, settings['screenshot'])
+            image_base64 = base64.b64encode(image).decode()
+            encode = time.perf_counter() - encode_started
+            content.append({
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": media_type,
+                    "data": image_base64
+                }
+            })
         
+        metrics.API_BYTES.inc('anthropic', 'sent',
+                              amount=sum(len(c.get("text") or c["source"]["data"]) for c in content))
         print("   - Sending request to Claude...")
-        # Create message with both text and image
-        response = self.anthropic_client.messages.create(
+        # Stream the response so a cancel can close the connection mid-request
+        parts = []
+        first_token = None
+        started = time.perf_counter()
+        with self.anthropic_client.messages.stream(
             model="claude-3-sonnet-20240229",
-            max_tokens=1024,
-            messages=[{
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Here is my question/request: {transcript}\nPlease help me with this, taking into account the screenshot of my current work context."
-                    },
-                    {
-                        "type": "image",
-                        "source": {
-                            "type": "base64",
-                            "media_type": "image/png",
-                            "data": image_base64
-                        }
-                    }
-                ]
-            }]
-        )
-        
-        ai_response = response.content[0].text
+            max_tokens=settings['max_tokens'],
+            messages=[{"role": "user", "content": content}]
+        ) as stream:
+            remove = cancel_token.on_cancel(stream.close) if cancel_token else None
+            try:
+                for text in stream.text_stream:
+                    if not parts:
+                        tracing.mark('llm_first_token')
+                        first_token = time.perf_counter() - started
+                    parts.append(text)
+            except Exception:
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                raise
+            finally:
+                if remove:
+                    remove()
+                if usage is not None:
+                    usage.update(self._stream_usage(stream))
+            if not (cancel_token and cancel_token.cancelled):
+                self._record_usage(stream)
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        tracing.mark('llm_complete')
+        tracing.add_span('llm', started)
+        if self.screen_gate:
+            self.screen_gate.observe(with_image, first_token, encode)
+        
+        ai_response = "".join(parts)
+        metrics.API_BYTES.inc('anthropic', 'received', amount=len(ai_response.encode()))
         print(f"\n💭 AI response: \"{ai_response}\"")
         return ai_response
     
-    def text_to_speech(self, text):
+    def _read_screenshot(self, path, quality='full'):
+        """(media type, bytes) of a screenshot; 'reduced' downscales it to a JPEG"""
+        if quality == 'reduced':
+            try:
+                import io
+                from PIL import Image
+                with Image.open(path) as image:
+                    image = image.convert('RGB')
+                    image.thumbnail((self.REDUCED_SCREENSHOT, self.REDUCED_SCREENSHOT))
+                    buffer = io.BytesIO()
+                    image.save(buffer, format='JPEG', quality=80)
+                return 'image/jpeg', buffer.getvalue()
+            except Exception as e:
+                print(f"   - Couldn't reduce screenshot, sending it as is: {e}")
+        with open(path, "rb") as img_file:
+            return 'image/png', img_file.read()
+    
+    def _record_usage(self, stream):
+        """Count the tokens Claude reports for a finished stream"""
+        try:
+            usage = stream.get_final_message().usage
+        except Exception:
+            return
+        for direction, field in (('input', 'input_tokens'), ('output', 'output_tokens')):
+            tokens = getattr(usage, field, None)
+            if isinstance(tokens, int):
+                metrics.API_TOKENS.inc('anthropic', direction, amount=tokens)
+    
+    def _stream_usage(self, stream):
+        """Tokens used so far by a stream, finished or not"""
+        try:
+            usage = stream.current_message_snapshot.usage
+        except Exception:
+            return {}
+        counts = {}
+        for direction, field in (('input', 'input_tokens'), ('output', 'output_tokens')):
+            tokens = getattr(usage, field, None)
+            if isinstance(tokens, int):
+                counts[direction] = tokens
+        return counts
+    
+    def text_to_speech(self, text, cancel_token=None):
         """Convert text to speech using OpenAI TTS"""
         print("\n🔊 Converting response to speech...")
         
-        response = self.tts_client.audio.speech.create(
-            model="tts-1",
-            voice="nova",
-            input=text
-        )
-        
-        # Save to file with timestamp
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = f"responses/response_{timestamp}.mp3"
-        
-        # Create responses directory if it doesn't exist
-        os.makedirs('responses', exist_ok=True)
+        # A name of its own, so a failed request can't delete another's response
+        output_file = unique_path('responses', 'response', 'mp3')
         
         print("   - Saving audio response...")
-        response.stream_to_file(output_file)
+        metrics.API_BYTES.inc('openai_tts', 'sent', amount=len(text.encode()))
+        started = time.perf_counter()
+        try:
+            with self.tts_client.audio.speech.with_streaming_response.create(
+                model=self.settings['tts_model'] or self.tts_model,
+                voice="nova",
+                input=text
+            ) as response:
+                remove = cancel_token.on_cancel(response.close) if cancel_token else None
+                try:
+                    with open(output_file, "wb") as f:
+                        for chunk in response.iter_bytes():
+                            if not f.tell():
+                                tracing.mark('tts_first_byte')
+                            f.write(chunk)
+                        metrics.API_BYTES.inc('openai_tts', 'received', amount=f.tell())
+                    tracing.mark('tts_complete')
+                    tracing.add_span('tts', started)
+                finally:
+                    if remove:
+                        remove()
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+        except Exception:
+            # Don't leave a truncated response behind
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            if cancel_token:
+                cancel_token.raise_if_cancelled()
+            raise
         print(f"✅ Response saved to: {output_file}")
         return output_file
     
-    def process(self, audio_data):
-        """Process recorded audio"""
+    @contextmanager
+    def in_flight(self):
+        """Count a request as running for the with block
+
+        Counted under the load lock, so the memory manager can't unload or
+        swap Whisper while the request uses it, and idle time restarts
+        when it ends.
+        """
+        with self._load_lock:
+            self._in_flight += 1
+            self.last_used = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._load_lock:
+                self._in_flight -= 1
+                self.last_used = time.monotonic()
+    
+    def stage(self, name, cancel_token=None):
+        """Hold one of the stage's slots for the duration of a with block"""
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.stage(name, cancel_token)
+    
+    def busy_response(self):
+        """Path of the spoken "busy" message, synthesized once and then reused"""
+        path = os.path.join('responses', 'busy.mp3')
+        cached = os.path.exists(path)
+        metrics.cache_lookup('busy_response', cached)
+        if cached:
+            return path
+        try:
+            os.makedirs('responses', exist_ok=True)
+            partial = path + '.part'
+            with self.tts_client.audio.speech.with_streaming_response.create(
+                model="tts-1",
+                voice="nova",
+                input=self.BUSY_MESSAGE
+            ) as response:
+                with open(partial, "wb") as f:
+                    for chunk in response.iter_bytes():
+                        f.write(chunk)
+            os.replace(partial, path)
+            return path
+        except Exception as e:
+            print(f"Error creating busy response: {e}")
+            return None
+    
+    def save_recording(self, audio_data, sample_rate=44100):
+        """Write raw float32 recorder frames to a WAV file for transcription"""
+        import numpy as np
+        import soundfile as sf
+        path = unique_path('recordings', 'recording', 'wav')
+        sf.write(path, np.frombuffer(audio_data, dtype=np.float32), sample_rate)
+        return path
+    
+    def process(self, audio_data, screenshot_path=None, cancel_token=None, speculation=None,
+                state=None):
+        """Process recorded audio
+
+        Returns the path of the spoken response, or None if there's nothing
+        to play. Raises CancelledError if `cancel_token` is cancelled while
+        a stage is running. With a SpeculationSession, a Claude request it
+        started during recording is used if the final transcript matches.
+        `state` (an IntentState) holds the caller's last response and volume;
+        by default the pipeline's own.
+        """
+        state = state or self
         if not audio_data or len(audio_data) == 0:
             print("DEBUG: No audio data to process")
-            return False
+            return None
             
-        try:
-            if not all([self.whisper, self.anthropic, self.tts]):
-                raise RuntimeError("Pipeline components not properly initialized")
-                
-            text = self.transcribe(audio_data)
-            if not text:
-                print("DEBUG: No text transcribed from audio")
-                return False
+        # Real work takes priority over a warm-up still in progress
+        warmup_token = self._warmup_token
+        if warmup_token:
+            warmup_token.cancel()
+            
+        if self.slo:
+            # Lets the controller judge each level only by its own requests
+            trace = tracing.current()
+            if trace is not None:
+                trace.set(slo_level=self.slo.level)
+            
+        # The model can't be evicted mid-request
+        with self.in_flight():
+            release_gc = gc_control.hold()
+            try:
+                if not self.ready:
+                    print("   Waiting for models to finish loading...")
+                    self.wait_until_ready()
+                if not self.ready:
+                    raise RuntimeError("Pipeline components not properly initialized")
                 
-            response = self.get_ai_response(text)
-            if not response:
-                print("DEBUG: No response from AI")
-                return False
+                with tracing.span('encode'):
+                    audio_path = self.save_recording(audio_data)
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+            
+                with self.stage('asr', cancel_token), tracing.span('transcribe'):
+                    text = self.transcribe_audio(audio_path, cancel_token)
+                if not text:
+                    print("DEBUG: No text transcribed from audio")
+                    return None
+            
+                intent = self.intents.match(text) if self.intents else None
+                if intent:
+                    return self.handle_intent(intent, state)
+            
+                response = speculation.resolve(text, cancel_token) if speculation else None
+                if response is None:
+                    with self.stage('llm', cancel_token):
+                        response = self.get_ai_response(text, screenshot_path, cancel_token)
+                if not response:
+                    print("DEBUG: No response from AI")
+                    return None
                 
-            return self.synthesize_speech(response)
+                with self.stage('tts', cancel_token):
+                    state.last_response = self.text_to_speech(response, cancel_token)
+                    return state.last_response
             
-        except Exception as e:
-            print(f"Error in processing pipeline: {e}")
-            return False
+            except CancelledError:
+                raise
+            except Overloaded as e:
+                print(f"⚠️  Overloaded, dropping request: {e}")
+                return self.busy_response()
+            except Exception as e:
+                print(f"Error in processing pipeline: {e}")
+                return None
+            finally:
+                release_gc()
+                if speculation:
+                    # No-op after resolve(); otherwise the answer isn't needed
+                    speculation.discard()
+    
+    def handle_intent(self, intent, state=None):
+        """Answer a local intent; returns a path to play or None, like process()
+
+        Nothing here touches the network: "repeat" replays the last response
+        file, and spoken answers come from the OS voice (see speak_locally).
+        """
+        print(f"\n⚡ Local intent: {intent}")
+        state = state or self
+        trace = tracing.current()
+        if trace is not None:
+            trace.set(intent=intent)
+        metrics.LOCAL_INTENTS.inc(intent)
+        if intent == 'stop':
+            # The key-down already cancelled any response that was playing
+            return None
+        if intent == 'repeat':
+            if state.last_response and os.path.exists(state.last_response):
+                return state.last_response
+            return speak_locally("I haven't said anything yet.")
+        if intent in ('louder', 'quieter'):
+            step = VOLUME_STEP if intent == 'louder' else -VOLUME_STEP
+            state.volume = min(MAX_VOLUME, max(VOLUME_STEP, state.volume + step))
+            return speak_locally(f"Volume {state.volume * 100:.0f} percent.")
+        if intent == 'time':
+            answer = spoken_time()
+            print(f"   {answer}")
+            return speak_locally(answer)
+        return None
     
     def cleanup(self):
         """Clean up resources and stop monitoring"""
         try:
+            if self.memory is not None:
+                self.memory.stop()
+            if self.ocr is not None:
+                self.ocr.shutdown()
+            if self.asr is not None:
+                self.asr.shutdown()
+                self.asr = None
+                
             # Stop recording if active
             if hasattr(self, 'recording_in_progress') and self.recording_in_progress:
                 self.stop_recording()
@@ -0,0 +1,145 @@
+import os
+import re
+import threading
+from collections import deque
+
+from .. import metrics, tracing
+
+# SCREENSHOT_GATE: "auto" (default) sends the screenshot only when the
+# transcript refers to something on screen, "always" sends every one,
+# "never" none
+MODES = ('always', 'auto', 'never')
+
+# Cues that a question is about the screen, searched anywhere in the
+# lower-cased transcript. SCREENSHOT_CUES adds more (regexes separated by ';').
+CUES = (
+    ('deictic', r"\b(this|these|those|here)\b"),
+    ('screen', r"\b(screen|display|monitor|visible|showing|shown|highlighted|selected|"
+               r"cursor)\b|\bon the (left|right)\b|\bat the (top|bottom)\b|\b(above|below)\b"),
+    ('look', r"\b(look|looking) at\b|\b(can|do) you see\b|\bwhat do you see\b"),
+    ('workspace', r"\b(my|the|that|your) (code|file|function|class|method|variable|error|"
+                  r"warning|exception|stack ?trace|traceback|output|log|terminal|editor|diff|"
+                  r"window|tab|page|document|email|message|chart|graph|table|image|picture|"
+                  r"diagram|slide|spreadsheet|form|test|build|query|command|result)s?\b"),
+    ('line', r"\bline (\d+|one|two|three|four|five|six|seven|eight|nine|ten)\b"),
+)
+
+# Claude downscales images to fit these before counting ~1 token per 750 pixels
+MAX_IMAGE_EDGE = 1568
+MAX_IMAGE_PIXELS = 1_150_000
+
+SCREENSHOTS = metrics.REGISTRY.register(metrics.Counter(
+    'screenshots', "Screenshots sent to or withheld from Claude", ('decision',)))
+SCREENSHOT_TOKENS_SAVED = metrics.REGISTRY.register(metrics.Counter(
+    'screenshot_tokens_saved', "Estimated image input tokens not sent to Claude"))
+
+
+def image_tokens(path):
+    """Estimated input tokens of the image at `path`, or None if unreadable
+
+    Only the header is read, so this is cheap even for a full-screen PNG.
+    """
+    try:
+        from PIL import Image
+        with Image.open(path) as image:
+            width, height = image.size
+    except Exception:
+        return None
+    scale = min(1.0, MAX_IMAGE_EDGE / max(width, height),
+                (MAX_IMAGE_PIXELS / (width * height)) ** 0.5)
+    return int(width * scale * height * scale / 750)
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+
+class ScreenGate:
+    """Decides per request whether Claude needs the screenshot
+
+    The capture still starts at key-down; when the transcript has no cue
+    that it refers to the screen, the file is simply never read, encoded or
+    uploaded. `stats()` reports how often that happened, the image tokens it
+    saved, and the encode time and time to first token with and without an
+    image, from which the latency saved per skipped image follows.
+    """
+
+    def __init__(self, cues=CUES, extra=(), window=50):
+        self.cues = [(name, re.compile(pattern)) for name, pattern in cues]
+        self.cues += [('custom', re.compile(pattern)) for pattern in extra]
+        self.sent = 0
+        self.skipped = 0
+        self.tokens_saved = 0
+        self._encode = deque(maxlen=window)
+        self._first_token = {True: deque(maxlen=window), False: deque(maxlen=window)}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """The gate SCREENSHOT_GATE asks for: None for "always", or a gate
+        that never sends for "never" """
+        mode = os.getenv('SCREENSHOT_GATE', 'auto')
+        if mode not in MODES:
+            raise ValueError(f"unknown SCREENSHOT_GATE {mode!r}; expected one of {MODES}")
+        if mode == 'always':
+            return None
+        if mode == 'never':
+            return cls(cues=())
+        extra = [pattern for pattern in os.getenv('SCREENSHOT_CUES', '').split(';') if pattern]
+        return cls(extra=extra)
+
+    def cue(self, text):
+        """Name of the first cue `text` matches, or None"""
+        text = (text or '').lower()
+        for name, pattern in self.cues:
+            if pattern.search(text):
+                return name
+        return None
+
+    def decide(self, transcript, screenshot_path):
+        """True if the screenshot at `screenshot_path` should be sent"""
+        cue = self.cue(transcript)
+        sent = cue is not None
+        saved = None if sent else image_tokens(screenshot_path)
+        with self._lock:
+            if sent:
+                self.sent += 1
+            else:
+                self.skipped += 1
+                self.tokens_saved += saved or 0
+        SCREENSHOTS.inc('sent' if sent else 'skipped')
+        if saved:
+            SCREENSHOT_TOKENS_SAVED.inc(amount=saved)
+        trace = tracing.current()
+        if trace is not None:
+            trace.set(screenshot={"sent": sent, "cue": cue})
+        return sent
+
+    def observe(self, with_image, first_token=None, encode=None):
+        """Seconds to first token (and to read and encode the image) of one request"""
+        with self._lock:
+            if first_token is not None:
+                self._first_token[with_image].append(first_token)
+            if encode is not None:
+                self._encode.append(encode)
+
+    def stats(self):
+        with self._lock:
+            total = self.sent + self.skipped
+            encode = sum(self._encode) / len(self._encode) if self._encode else None
+            with_image = _median(self._first_token[True])
+            without_image = _median(self._first_token[False])
+            return {
+                "sent": self.sent,
+                "skipped": self.skipped,
+                "skip_rate": round(self.skipped / total, 3) if total else None,
+                "tokens_saved": self.tokens_saved,
+                "encode_ms": round(encode * 1000, 1) if encode is not None else None,
+                "encode_ms_saved": (round(encode * self.skipped * 1000, 1)
+                                    if encode is not None else None),
+                "first_token_ms_with_image": (round(with_image * 1000, 1)
+                                              if with_image is not None else None),
+                "first_token_ms_without_image": (round(without_image * 1000, 1)
+                                                 if without_image is not None else None),
+            }
@@ -0,0 +1,187 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from .. import metrics
+from .memory import smaller_model
+
+logger = logging.getLogger(__name__)
+
+# Full quality; each ladder rung below overrides some of these
+DEFAULT_SETTINGS = {
+    'beam_size': 5,
+    'screenshot': 'full',        # 'full', 'reduced' (downscaled JPEG) or 'none'
+    'max_tokens': 1024,
+    'brevity': None,             # Extra instruction asking for a shorter answer
+    'tts_model': None,           # None: the pipeline's TTS_MODEL
+    'asr_downgrade': False,      # Run the next smaller Whisper size
+}
+
+# Rungs, cheapest quality loss first. Level n applies rungs 1..n together.
+LADDER = (
+    ('full quality', {}),
+    ('greedy decoding', {'beam_size': 1}),
+    ('reduced screenshot', {'screenshot': 'reduced'}),
+    ('shorter answers', {'max_tokens': 512,
+                         'brevity': "Answer in two or three short sentences."}),
+    # 'tts_model' only changes anything when TTS_MODEL is overridden (e.g.
+    # tts-1-hd): tts-1 is already the default
+    ('no screenshot, brief answers',
+     {'screenshot': 'none', 'max_tokens': 256, 'tts_model': 'tts-1',
+      'brevity': "Answer in one or two short sentences."}),
+    ('smaller Whisper model', {'asr_downgrade': True}),
+)
+
+# Stages whose recent medians are reported with each decision
+STAGES = ('transcribe', 'llm', 'tts', 'playback')
+
+SLO_LEVEL = metrics.REGISTRY.register(metrics.Gauge(
+    'slo_level', "Current rung of the latency degradation ladder (0 = full quality)"))
+SLO_DECISIONS = metrics.REGISTRY.register(metrics.Counter(
+    'slo_decisions', "Degradation ladder steps by direction", ('direction',)))
+
+
+def settings_for(level):
+    settings = dict(DEFAULT_SETTINGS)
+    for _, overrides in LADDER[1:level + 1]:
+        settings.update(overrides)
+    return settings
+
+
+def time_to_first_audio(record):
+    """Milliseconds from key-up to first audio (or to the finished response
+    file when nothing was played here, as in the daemon); None if neither"""
+    marks = record.get("marks_ms", {})
+    at = marks.get('first_audio_out', marks.get('tts_complete'))
+    if at is None:
+        return None
+    return at - marks.get('key_up', 0.0)
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+
+class SloController:
+    """Keeps time-to-first-audio near a target by trading quality for speed
+
+    Fed every finished trace through `observe()`. Once `window` requests
+    have run at the current level, their median time-to-first-audio is
+    compared with `target`: above `target * (1 + tolerance)` the controller
+    steps one rung down LADDER; below `target * recover` it steps back up.
+    The window restarts after every step, so each level is judged on its
+    own requests, and the gap between the two thresholds keeps it from
+    flapping. Each decision is logged with the per-stage medians that led
+    to it and kept in `decisions`.
+    """
+
+    def __init__(self, pipeline, target, window=5, tolerance=0.2, recover=0.6,
+                 max_level=len(LADDER) - 1):
+        self.pipeline = pipeline
+        self.target = target
+        self.window = window
+        self.tolerance = tolerance
+        self.recover = recover
+        self.max_level = max_level
+        self.level = 0
+        self.settings = settings_for(0)
+        self.decisions = deque(maxlen=100)
+        self._ttfa = deque(maxlen=window)
+        self._stages = {stage: deque(maxlen=window) for stage in STAGES}
+        self._base_model = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, pipeline):
+        """A controller for SLO_TTFA seconds, or None if it isn't set"""
+        target = float(os.getenv('SLO_TTFA', 0) or 0)
+        return cls(pipeline, target) if target > 0 else None
+
+    def observe(self, trace):
+        """Add a finished RequestTrace (or its record); may change the level"""
+        record = trace.to_record() if hasattr(trace, 'to_record') else trace
+        if record.get('outcome', 'ok') != 'ok' or record.get('slo_level', self.level) != self.level:
+            return None
+        ttfa = time_to_first_audio(record)
+        if ttfa is None:
+            return None
+        with self._lock:
+            self._ttfa.append(ttfa / 1000)
+            for stage in STAGES:
+                span = record.get("spans_ms", {}).get(stage)
+                if span:
+                    self._stages[stage].append(span["duration"] / 1000)
+            if len(self._ttfa) < self.window:
+                return None
+            median = _median(self._ttfa)
+            if median > self.target * (1 + self.tolerance) and self.level < self.max_level:
+                return self._step(self.level + 1, median)
+            if median < self.target * self.recover and self.level > 0:
+                return self._step(self.level - 1, median)
+        return None
+
+    def _step(self, level, median):
+        previous, self.level = self.level, level
+        self.settings = settings_for(level)
+        self._apply_asr(previous, level)
+        direction = 'down' if level > previous else 'up'
+        stages = {stage: round(_median(values), 3)
+                  for stage, values in self._stages.items() if values}
+        decision = {
+            "time": time.time(), "from": previous, "to": level, "direction": direction,
+            "rung": LADDER[level][0], "median_ttfa": round(median, 3),
+            "target": self.target, "stages": stages,
+        }
+        self.decisions.append(decision)
+        self._ttfa.clear()
+        for values in self._stages.values():
+            values.clear()
+        SLO_LEVEL.set(level)
+        SLO_DECISIONS.inc(direction)
+        breakdown = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stages.items())
+        message = (f"Time to first audio {median:.2f}s vs target {self.target:.2f}s: "
+                   f"level {previous} -> {level} ({LADDER[level][0]}); {breakdown}")
+        logger.info(message)
+        print(f"\n🎚️  {message}")
+        return decision
+
+    def _apply_asr(self, previous, level):
+        downgrade = settings_for(level)['asr_downgrade']
+        if downgrade == settings_for(previous)['asr_downgrade']:
+            return
+        pipeline = self.pipeline
+        if downgrade:
+            target = smaller_model(pipeline.model_size)
+            if target is None:
+                return
+            self._base_model = pipeline.model_size
+            switch = target
+        elif self._base_model:
+            switch, self._base_model = self._base_model, None
+        else:
+            return
+        # Swapped on a background thread once no request is in flight
+        threading.Thread(target=self._switch_asr, args=(switch,), name="slo-asr",
+                         daemon=True).start()
+
+    def _switch_asr(self, model_size, attempts=50):
+        for _ in range(attempts):
+            if self.pipeline.downgrade_asr(model_size):
+                return True
+            time.sleep(0.2)
+        logger.warning("Could not switch Whisper to %r: pipeline stayed busy", model_size)
+        return False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "target": self.target,
+                "level": self.level,
+                "rung": LADDER[self.level][0],
+                "recent_ttfa": round(_median(self._ttfa), 3) if self._ttfa else None,
+                "decisions": len(self.decisions),
+                "last_decision": self.decisions[-1] if self.decisions else None,
+            }
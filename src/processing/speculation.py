@@ -0,0 +1,325 @@
+import os
+import threading
+import time
+
+from .. import metrics, tracing
+from .admission import Overloaded
+from .cancellation import CancelToken, CancelledError
+from .intents import normalize
+
+WHISPER_RATE = 16000
+
+SPECULATIONS = metrics.REGISTRY.register(metrics.Counter(
+    'speculations', "Speculative LLM requests by result (kept or discarded)", ('result',)))
+SPECULATION_WASTED_TOKENS = metrics.REGISTRY.register(metrics.Counter(
+    'speculation_wasted_tokens', "Tokens spent on discarded speculative requests",
+    ('direction',)))
+SPECULATION_SAVED_SECONDS = metrics.REGISTRY.register(metrics.Counter(
+    'speculation_saved_seconds', "LLM latency removed by kept speculative requests"))
+
+
+def word_distance(a, b):
+    """Word-level edit distance between two transcripts, over the longer length
+
+    Both are normalized first (see intents.normalize), so punctuation,
+    case and filler words don't count as changes. 0.0 means the same words.
+    """
+    a, b = normalize(a).split(), normalize(b).split()
+    if not a and not b:
+        return 0.0
+    previous = list(range(len(b) + 1))
+    for i, word in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (word != other)))
+        previous = current
+    return previous[-1] / max(len(a), len(b))
+
+
+class Speculation:
+    """One Claude request started from a partial transcript
+
+    Runs on its own thread with its own CancelToken. `usage` collects the
+    tokens Claude reported, including for a request cancelled mid-stream.
+    """
+
+    def __init__(self, transcript, on_finish=None):
+        self.transcript = transcript
+        self.token = CancelToken()
+        self.usage = {}
+        self.response = None
+        self.error = None
+        self.discarded = False
+        self.accounted = False
+        self.started = time.perf_counter()
+        self.finished = None
+        self.done = threading.Event()
+        self._on_finish = on_finish
+
+    @property
+    def duration(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def run(self, pipeline, screenshot_future):
+        try:
+            screenshot = screenshot_future.result() if screenshot_future else None
+            self.token.raise_if_cancelled()
+            # An LLM slot like any request; Overloaded just loses the speculation
+            with pipeline.in_flight(), pipeline.stage('llm', self.token):
+                self.response = pipeline.get_ai_response(self.transcript, screenshot,
+                                                         self.token, usage=self.usage)
+        except Exception as e:  # includes CancelledError when discarded
+            self.error = e
+        finally:
+            self.finished = time.perf_counter()
+            self.done.set()
+            if self._on_finish:
+                self._on_finish(self)
+
+
+class SpeculationSession:
+    """Partial transcripts of one recording, and the speculation they started
+
+    A background thread re-transcribes everything recorded so far every
+    `interval` seconds. Once `stable_passes` passes in a row give the same
+    words, and there are at least `min_words` of them, the utterance
+    probably ended, so Claude is asked right away. If a later partial drifts
+    more than `max_change` from what was sent, that request is cancelled and
+    the next stable partial starts another.
+
+    At key-up, `stop()` ends the partial passes. `resolve(final)` returns the
+    speculative response if `final` is within `max_change` of what it was
+    started from (waiting for it to finish if needed); otherwise it cancels
+    the request and returns None, and the caller asks Claude as usual.
+    """
+
+    def __init__(self, speculator, get_audio, screenshot_future):
+        self.speculator = speculator
+        self.get_audio = get_audio
+        self.screenshot_future = screenshot_future
+        self.partials = []
+        self.speculation = None
+        self._stable = 0
+        self._resolved = False
+        # Orders the partial thread's dispatches against resolve()/discard()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pass_token = CancelToken()
+        self._thread = threading.Thread(target=self._run, name="speculation", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        speculator = self.speculator
+        while not self._stop.wait(speculator.interval):
+            audio = self.get_audio()
+            if not audio or len(audio) // 4 < speculator.rate * speculator.min_seconds:
+                continue
+            try:
+                partial = speculator.transcribe(audio, self._pass_token)
+            except CancelledError:
+                return
+            except Overloaded:
+                # Queued requests come first; try again next interval
+                continue
+            except Exception as e:
+                print(f"Partial transcription failed: {e}")
+                return
+            if partial is None:
+                continue
+            with self._lock:
+                if self._resolved:
+                    return
+                self._on_partial(partial)
+
+    def _on_partial(self, partial):
+        speculator = self.speculator
+        previous = self.partials[-1] if self.partials else None
+        self.partials.append(partial)
+        same = previous is not None and word_distance(previous, partial) == 0.0
+        self._stable = self._stable + 1 if same else 1
+
+        current = self.speculation
+        if current is not None:
+            if word_distance(current.transcript, partial) <= speculator.max_change:
+                return
+            # The user kept talking: that request answers the wrong question
+            speculator.discard(current)
+            self.speculation = None
+        if (self._stable >= speculator.stable_passes
+                and len(normalize(partial).split()) >= speculator.min_words):
+            self.speculation = speculator.dispatch(partial, self.screenshot_future)
+
+    def stop(self):
+        """Key-up: no more partial passes (one in progress finishes first)"""
+        self._stop.set()
+        self._pass_token.cancel()
+
+    def resolve(self, final, cancel_token=None):
+        """The speculative response if it answers `final`, else None"""
+        resolved_at = time.perf_counter()
+        self.stop()
+        with self._lock:
+            if self._resolved:
+                return None
+            self._resolved = True
+            speculation, self.speculation = self.speculation, None
+        if speculation is None:
+            return None
+        distance = word_distance(speculation.transcript, final)
+        if distance > self.speculator.max_change:
+            self.speculator.discard(speculation, distance)
+            return None
+
+        remove = cancel_token.on_cancel(speculation.token.cancel) if cancel_token else None
+        try:
+            speculation.done.wait()
+        finally:
+            if remove:
+                remove()
+        if cancel_token:
+            cancel_token.raise_if_cancelled()
+        if speculation.error is not None or not speculation.response:
+            self.speculator.discard(speculation, distance)
+            return None
+        self.speculator.keep(speculation, resolved_at, distance)
+        return speculation.response
+
+    def discard(self):
+        """Drop whatever was started; safe to call after resolve()"""
+        self.stop()
+        with self._lock:
+            self._resolved = True
+            speculation, self.speculation = self.speculation, None
+        if speculation is not None:
+            self.speculator.discard(speculation)
+
+
+class SpeculativeLLM:
+    """Starts Claude requests before key-up and keeps score
+
+    `stats()` weighs what speculation costs (tokens of discarded requests)
+    against what it buys (LLM time already elapsed at key-up for kept
+    ones). Lower `max_change` or raise `stable_passes`/`min_words` if too
+    many are discarded; do the opposite if few are ever started.
+    """
+
+    def __init__(self, pipeline, interval=1.0, stable_passes=2, min_words=3, max_change=0.15,
+                 min_seconds=1.0, rate=44100):
+        self.pipeline = pipeline
+        self.interval = interval
+        self.stable_passes = stable_passes
+        self.min_words = min_words
+        self.max_change = max_change
+        self.min_seconds = min_seconds
+        self.rate = rate
+        self.started = 0
+        self.kept = 0
+        self.discarded = 0
+        self.saved_seconds = 0.0
+        self.wasted_tokens = {'input': 0, 'output': 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, pipeline):
+        """A speculator if SPECULATIVE_LLM=1, tuned by SPECULATION_MAX_CHANGE
+        and SPECULATION_INTERVAL; None otherwise"""
+        if os.getenv('SPECULATIVE_LLM', '0') != '1':
+            return None
+        return cls(pipeline,
+                   interval=float(os.getenv('SPECULATION_INTERVAL', 1.0)),
+                   max_change=float(os.getenv('SPECULATION_MAX_CHANGE', 0.15)))
+
+    def start(self, get_audio, screenshot_future=None):
+        """Begin a session for the recording `get_audio()` returns so far"""
+        return SpeculationSession(self, get_audio, screenshot_future).start()
+
+    def transcribe(self, audio, cancel_token=None):
+        """Whisper on float32 recorder bytes, without saving them to disk
+
+        Returns None while the model isn't loaded (e.g. after an idle unload)
+        rather than waiting for it. Runs in the ASR stage and, in server
+        mode, through the AsrScheduler, so partial passes count against the
+        same limits as requests; raises Overloaded if shed.
+        """
+        import numpy as np
+
+        pipeline = self.pipeline
+        samples = np.frombuffer(audio, dtype=np.float32)
+        count = int(len(samples) * WHISPER_RATE / self.rate)
+        positions = np.arange(count) * (self.rate / WHISPER_RATE)
+        resampled = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+        # Counted as in flight before checking, so the model can't go in between
+        with pipeline.in_flight():
+            if not pipeline.ready:
+                return None
+            with pipeline.stage('asr', cancel_token):
+                if pipeline.asr is not None:
+                    return pipeline.asr.transcribe(resampled, cancel_token=cancel_token)
+                return pipeline.transcribe_text(resampled, cancel_token)
+
+    def dispatch(self, transcript, screenshot_future=None):
+        print(f"\n🔮 Speculating on: \"{transcript}\"")
+        speculation = Speculation(transcript, on_finish=self._finished)
+        with self._lock:
+            self.started += 1
+        threading.Thread(target=speculation.run, args=(self.pipeline, screenshot_future),
+                         name="speculative-llm", daemon=True).start()
+        return speculation
+
+    def keep(self, speculation, resolved_at, distance=0.0):
+        # The LLM time already behind us when the final transcript arrived
+        saved = min(resolved_at - speculation.started, speculation.duration)
+        with self._lock:
+            self.kept += 1
+            self.saved_seconds += saved
+        SPECULATIONS.inc('kept')
+        SPECULATION_SAVED_SECONDS.inc(amount=saved)
+        trace = tracing.current()
+        if trace is not None:
+            trace.set(speculation={"result": "kept", "distance": round(distance, 3),
+                                   "saved_ms": round(saved * 1000, 1)})
+
+    def discard(self, speculation, distance=None):
+        """Cancel a speculation; its tokens are counted as wasted once it stops"""
+        with self._lock:
+            if speculation.discarded:
+                return
+            speculation.discarded = True
+            self.discarded += 1
+        SPECULATIONS.inc('discarded')
+        speculation.token.cancel()
+        if speculation.done.is_set():
+            self._finished(speculation)
+        trace = tracing.current()
+        if trace is not None and distance is not None:
+            trace.set(speculation={"result": "discarded", "distance": round(distance, 3)})
+
+    def _finished(self, speculation):
+        # Usage is only complete once the stream has closed, so this runs
+        # from whichever of discard() and the request finishing comes last
+        with self._lock:
+            if not speculation.discarded or speculation.accounted:
+                return
+            speculation.accounted = True
+            for direction in ('input', 'output'):
+                tokens = speculation.usage.get(direction, 0)
+                self.wasted_tokens[direction] += tokens
+                SPECULATION_WASTED_TOKENS.inc(direction, amount=tokens)
+
+    def stats(self):
+        with self._lock:
+            wasted = sum(self.wasted_tokens.values())
+            return {
+                "started": self.started,
+                "kept": self.kept,
+                "discarded": self.discarded,
+                "saved_seconds": round(self.saved_seconds, 3),
+                "wasted_tokens": dict(self.wasted_tokens),
+                # Exchange rate to tune against: tokens thrown away per second won
+                "tokens_per_saved_second": (round(wasted / self.saved_seconds, 1)
+                                            if self.saved_seconds else None),
+            }
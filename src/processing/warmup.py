@@ -0,0 +1,132 @@
+import os
+import time
+
+from .cancellation import CancelledError
+
+# Sample rate faster-whisper expects for raw arrays
+WHISPER_RATE = 16000
+
+# Paths requested on each API client to open its connection pool. Any HTTP
+# status will do; the point is the DNS lookup and TLS handshake. Override with
+# WARMUP_LLM_ENDPOINT / WARMUP_TTS_ENDPOINT, or set them empty to skip a stage.
+DEFAULT_ENDPOINTS = {
+    'llm': '/v1/models',
+    'tts': '/models',
+}
+
+
+def synthetic_utterance(seconds=1.5, rate=WHISPER_RATE):
+    """A speech-like test signal: voiced harmonics under a syllable envelope
+
+    Silence would be skipped by Whisper's early exits, so the signal needs
+    enough energy and structure to drive the full encoder/decoder path.
+    """
+    import numpy as np
+
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    syllables = 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+    noise = np.random.default_rng(0).normal(0, 0.02, len(t))
+    signal = 0.3 * voice * syllables + noise
+    return (signal / np.abs(signal).max() * 0.5).astype(np.float32)
+
+
+def endpoints_from_env():
+    """Priming endpoints, with WARMUP_<STAGE>_ENDPOINT overriding the defaults"""
+    endpoints = {}
+    for stage, default in DEFAULT_ENDPOINTS.items():
+        path = os.getenv(f'WARMUP_{stage.upper()}_ENDPOINT', default)
+        if path:
+            endpoints[stage] = path
+    return endpoints
+
+
+class WarmupReport:
+    """Latencies of each warm-up stage, first call versus the rest"""
+
+    def __init__(self):
+        self.timings = {}
+        self.errors = {}
+
+    def record(self, stage, seconds):
+        self.timings.setdefault(stage, []).append(seconds)
+
+    def first(self, stage):
+        times = self.timings.get(stage)
+        return times[0] if times else None
+
+    def steady(self, stage):
+        """Median of every call after the first"""
+        times = sorted(self.timings.get(stage, [])[1:])
+        return times[len(times) // 2] if times else None
+
+    def cold_penalty(self, stage):
+        """How many times slower the first call was than steady state"""
+        first, steady = self.first(stage), self.steady(stage)
+        if first is None or not steady:
+            return None
+        return first / steady
+
+    def summary(self):
+        lines = []
+        for stage in self.timings:
+            first, steady = self.first(stage), self.steady(stage)
+            line = f"{stage}: first {first * 1000:.0f} ms"
+            if steady is not None:
+                line += f", steady {steady * 1000:.0f} ms ({self.cold_penalty(stage):.1f}x)"
+            lines.append(line)
+        for stage, error in self.errors.items():
+            lines.append(f"{stage}: failed ({error})")
+        return lines
+
+
+def _prime_client(client, path):
+    """Issue a cheap GET through an SDK client so its connection pool is warm"""
+    import httpx
+
+    try:
+        client.get(path, cast_to=httpx.Response)
+    except Exception as e:
+        # An error status still means the connection was made
+        if getattr(e, 'status_code', None) is None:
+            raise
+
+
+def warm_up(pipeline, rounds=3, endpoints=None, cancel_token=None):
+    """Run the first-call costs of each stage before a user is waiting on them
+
+    ASR transcribes a synthetic utterance `rounds` times with the same
+    decoding options as a real request; the first run pays for allocator
+    growth and kernel selection and the rest show steady state. The LLM and
+    TTS clients make `rounds` requests to their priming endpoints so the
+    first real request reuses an open connection. Stops between calls once
+    `cancel_token` is cancelled (e.g. when a real request arrives).
+    """
+    endpoints = endpoints_from_env() if endpoints is None else endpoints
+    report = WarmupReport()
+    audio = synthetic_utterance()
+    stages = [('asr', lambda: list(pipeline.transcribe_segments(audio)))]
+    clients = {'llm': pipeline.anthropic_client, 'tts': pipeline.tts_client}
+    for stage, path in endpoints.items():
+        if clients.get(stage) is not None:
+            stages.append((stage, lambda c=clients[stage], p=path: _prime_client(c, p)))
+
+    try:
+        for stage, call in stages:
+            for _ in range(rounds):
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                started = time.perf_counter()
+                try:
+                    call()
+                except CancelledError:
+                    raise
+                except Exception as e:
+                    report.errors[stage] = e
+                    break
+                report.record(stage, time.perf_counter() - started)
+    except CancelledError:
+        pass
+    return report
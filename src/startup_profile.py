@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Printed by the probe once hotkeys are live
+READY_MARKER = "STARTUP_READY"
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(lines):
+    """Parse `python -X importtime` output up to the ready marker
+
+    Returns a list of (module, self_seconds, cumulative_seconds, depth) in
+    the order imports finished. Depth 0 is an import made directly by the
+    application; nested imports are indented one level per two spaces.
+    """
+    imports = []
+    for line in lines:
+        if line.strip() == READY_MARKER:
+            break
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        try:
+            self_s = int(self_us) / 1e6
+            cumulative_s = int(cumulative_us) / 1e6
+        except ValueError:
+            # Header row
+            continue
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        imports.append((stripped.rstrip(), self_s, cumulative_s, depth))
+    return imports
+
+
+def top_imports(imports, limit=10):
+    """Top-level imports (depth 0) sorted by cumulative time, slowest first"""
+    roots = [entry for entry in imports if entry[3] == 0]
+    return sorted(roots, key=lambda entry: entry[2], reverse=True)[:limit]
+
+
+def check_budget(elapsed, imports, budget, module_budget=None):
+    """Return a list of human readable budget violations (empty if none)"""
+    problems = []
+    if elapsed > budget:
+        problems.append(f"ready after {elapsed:.2f}s, budget is {budget:.2f}s")
+    if module_budget is not None:
+        for module, _, cumulative, depth in imports:
+            if depth == 0 and cumulative > module_budget:
+                problems.append(
+                    f"import {module} took {cumulative:.2f}s, budget is {module_budget:.2f}s")
+    return problems
+
+
+def profile_startup(budget=1.0, module_budget=None, limit=10):
+    """Start the app in a child interpreter and time it until hotkeys are live
+
+    The child runs `src.main --startup-probe` under `-X importtime`, which
+    sets up the listener without loading models, prints the ready marker and
+    exits. Returns a process exit code: 1 if any budget was exceeded.
+    """
+    command = [sys.executable, "-X", "importtime", "-m", "src.main", "--startup-probe"]
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.PIPE,
+                                   stderr=stderr, text=True)
+        elapsed = None
+        for line in process.stdout:
+            if line.strip() == READY_MARKER:
+                elapsed = time.perf_counter() - started
+                break
+        process.stdout.close()
+        process.wait()
+        stderr.seek(0)
+        imports = parse_importtime(stderr)
+
+    if elapsed is None:
+        print(f"\n❌ Startup probe exited with code {process.returncode} before becoming ready")
+        return 1
+
+    print(f"\n⏱️  Hotkeys live after {elapsed:.3f}s (budget {budget:.2f}s)")
+    print("\n   Slowest imports (cumulative):")
+    for module, _, cumulative, _ in top_imports(imports, limit):
+        print(f"     {cumulative * 1000:8.1f} ms  {module}")
+
+    problems = check_budget(elapsed, imports, budget, module_budget)
+    for problem in problems:
+        print(f"\n❌ Over budget: {problem}")
+    if not problems:
+        print("\n✅ Startup within budget")
+    return 1 if problems else 0
@@ -0,0 +1,370 @@
+import contextvars
+import json
+import math
+import os
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from . import metrics
+
+# Traces are opt-out: TRACE_FILE="" disables them
+DEFAULT_TRACE_FILE = os.path.join('traces', 'requests.jsonl')
+DEFAULT_MAX_BYTES = 10 << 20
+DEFAULT_BACKUPS = 3
+
+# Stage order for summaries; anything else recorded is listed after these
+STAGES = (
+    'capture', 'screenshot', 'ocr', 'encode', 'transcribe', 'llm', 'llm_first_token',
+    'llm_complete', 'tts', 'tts_first_byte', 'tts_complete', 'first_audio_out', 'playback',
+    'total',
+)
+
+_current = contextvars.ContextVar('request_trace', default=None)
+
+
+class RequestTrace:
+    """Timings for one request, relative to its key-down.
+
+    `marks` are points in time and `spans` are (start, duration) pairs, all
+    in milliseconds since the trace began. Recording is a clock read and a
+    dict store, so it is safe from audio callbacks and event handlers.
+    """
+
+    __slots__ = ('id', 'started_at', 'wall_time', 'marks', 'spans', 'attrs')
+
+    def __init__(self, request_id=None):
+        self.id = request_id or uuid.uuid4().hex[:12]
+        self.started_at = time.perf_counter()
+        self.wall_time = time.time()
+        self.marks = {}
+        self.spans = {}
+        self.attrs = {}
+
+    def _since_start(self, at=None):
+        return ((time.perf_counter() if at is None else at) - self.started_at) * 1000
+
+    def mark(self, name, at=None, once=True):
+        """Record a point in time; with once=True later marks of `name` are ignored"""
+        if once and name in self.marks:
+            return
+        self.marks[name] = self._since_start(at)
+
+    def add_span(self, name, started, ended=None):
+        """Record a span from perf_counter() timestamps"""
+        ended = time.perf_counter() if ended is None else ended
+        self.spans[name] = (self._since_start(started), (ended - started) * 1000)
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_span(name, started)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_record(self):
+        return {
+            "id": self.id,
+            "ts": self.wall_time,
+            "marks_ms": {name: round(value, 3) for name, value in self.marks.items()},
+            "spans_ms": {name: {"start": round(start, 3), "duration": round(duration, 3)}
+                         for name, (start, duration) in self.spans.items()},
+            **self.attrs,
+        }
+
+
+def current():
+    """The trace active in this context, or None"""
+    return _current.get()
+
+
+@contextmanager
+def activate(trace):
+    """Make `trace` current for the with block (and threads it starts via copy_context)"""
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def mark(name, **kwargs):
+    """Mark the current trace, if any"""
+    trace = _current.get()
+    if trace is not None:
+        trace.mark(name, **kwargs)
+
+
+def add_span(name, started, ended=None):
+    """Record a span of the current trace from perf_counter() timestamps, if any"""
+    trace = _current.get()
+    if trace is not None:
+        trace.add_span(name, started, ended)
+
+
+@contextmanager
+def span(name):
+    """Time the with block as a span of the current trace, if any"""
+    trace = _current.get()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name):
+        yield trace
+
+
+class TraceWriter:
+    """Appends records to a JSONL file from a background thread.
+
+    `write()` is a queue put. The writer batches whatever is queued into one
+    write and flush, and rotates the file to .1, .2, ... once it passes
+    `max_bytes`. If the queue fills up, records are dropped and counted
+    rather than blocking the caller.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS,
+                 max_queue=1000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self.written = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            batch = [record]
+            # Drain whatever else is waiting into the same write
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            lines = [json.dumps(r, separators=(',', ':')) + '\n' for r in batch if r is not None]
+            try:
+                self._append(''.join(lines))
+                self.written += len(lines)
+            except OSError as e:
+                print(f"Error writing traces: {e}")
+            for _ in batch:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _append(self, text):
+        if not text:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(text)
+            size = f.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def flush(self, timeout=2.0):
+        """Wait until everything written so far is on disk"""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2.0)
+
+
+class Tracer:
+    """Creates request traces and hands finished ones to a TraceWriter
+
+    Finished traces also feed the stage histograms in `metrics`, whether or
+    not a trace file is configured, and every callable in `observers`.
+    """
+
+    def __init__(self, path=None, max_bytes=None, backups=None):
+        if path is None:
+            path = os.getenv('TRACE_FILE', DEFAULT_TRACE_FILE)
+        self.path = path
+        self.writer = None
+        self.observers = []
+        if path:
+            self.writer = TraceWriter(
+                path,
+                max_bytes or int(os.getenv('TRACE_MAX_BYTES', DEFAULT_MAX_BYTES)),
+                DEFAULT_BACKUPS if backups is None else backups)
+
+    @property
+    def enabled(self):
+        return self.writer is not None
+
+    def start(self, request_id=None):
+        return RequestTrace(request_id)
+
+    def finish(self, trace, **attrs):
+        """Queue the trace's record for writing"""
+        if trace is None:
+            return
+        if attrs:
+            trace.set(**attrs)
+        metrics.observe_trace(trace)
+        for observer in self.observers:
+            try:
+                observer(trace)
+            except Exception as e:
+                print(f"Error in trace observer: {e}")
+        if self.writer is not None:
+            self.writer.write(trace.to_record())
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def _read_records(paths):
+    for path in paths:
+        try:
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            continue
+
+
+def _percentile(values, q):
+    """Nearest-rank percentile of sorted values"""
+    index = max(0, math.ceil(q / 100 * len(values)) - 1)
+    return values[index]
+
+
+def summarize(records):
+    """p50/p95/p99 per stage over trace records
+
+    Spans report their duration. Marks report time since key-up when the
+    record has one (i.e. how long after the user stopped speaking), and
+    time since key-down otherwise. Returns {stage: {"count", "p50", ...}}.
+    """
+    samples = {}
+    for record in records:
+        marks = record.get("marks_ms", {})
+        key_up = marks.get("key_up", 0.0)
+        for name, span in record.get("spans_ms", {}).items():
+            samples.setdefault(name, []).append(span["duration"])
+        for name, at in marks.items():
+            if name in ("key_down", "key_up"):
+                continue
+            samples.setdefault(name, []).append(at - key_up)
+
+    order = {name: index for index, name in enumerate(STAGES)}
+    summary = {}
+    for name in sorted(samples, key=lambda n: (order.get(n, len(order)), n)):
+        values = sorted(samples[name])
+        summary[name] = {
+            "count": len(values),
+            "p50": _percentile(values, 50),
+            "p95": _percentile(values, 95),
+            "p99": _percentile(values, 99),
+        }
+    return summary
+
+
+def glitch_summary(records):
+    """Audio glitches across traces, per glitch report field (capture/playback)
+
+    Returns {field: {"sessions", "glitchy", "glitches", "flags", "overruns",
+    "callback_max_ms"}} for the `*_glitches` reports the audio monitors add.
+    """
+    totals = {}
+    for record in records:
+        for field, report in record.items():
+            if not field.endswith('_glitches') or not isinstance(report, dict):
+                continue
+            total = totals.setdefault(field[:-len('_glitches')], {
+                "sessions": 0, "glitchy": 0, "glitches": 0, "flags": {}, "overruns": 0,
+                "callback_max_ms": 0.0})
+            total["sessions"] += 1
+            total["glitchy"] += bool(report.get("glitches"))
+            total["glitches"] += report.get("glitches", 0)
+            total["overruns"] += report.get("overruns", 0)
+            total["callback_max_ms"] = max(total["callback_max_ms"],
+                                           report.get("callback_max_ms", 0.0))
+            for name, count in report.get("flags", {}).items():
+                total["flags"][name] = total["flags"].get(name, 0) + count
+    return totals
+
+
+def trace_files(path):
+    """A trace file followed by its rotated backups, oldest last"""
+    files = [path]
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        files.append(f"{path}.{index}")
+        index += 1
+    return files
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Per-stage latency percentiles from traces")
+    parser.add_argument('path', nargs='?', default=os.getenv('TRACE_FILE') or DEFAULT_TRACE_FILE,
+                        help="Trace file; rotated backups next to it are included")
+    args = parser.parse_args(argv)
+
+    records = list(_read_records(trace_files(args.path)))
+    summary = summarize(records)
+    if not summary:
+        print(f"No traces in {args.path}")
+        return 1
+    print(f"{'stage':<18} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in summary.items():
+        print(f"{name:<18} {stats['count']:>6} {stats['p50']:>9.1f} "
+              f"{stats['p95']:>9.1f} {stats['p99']:>9.1f}")
+    print("\nSpans are durations; marks (first token, first audio, ...) are times since key-up.")
+    for stream, total in glitch_summary(records).items():
+        flags = ", ".join(f"{count} {name}" for name, count in total["flags"].items()) or "none"
+        print(f"{stream}: {total['glitchy']}/{total['sessions']} sessions glitched; "
+              f"flags: {flags}; {total['overruns']} callback overruns, "
+              f"slowest callback {total['callback_max_ms']:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
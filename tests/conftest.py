@@ -1,6 +1,12 @@
+import os
 import sys
 from unittest.mock import MagicMock
 
+# Don't write request traces into the working tree from tests
+os.environ.setdefault('TRACE_FILE', '')
+# ...or keep an earcon stream open on the real output device
+os.environ.setdefault('EARCONS', '0')
+
 # Mock pyaudio for tests
 class MockPyAudio:
     def __init__(self):
@@ -0,0 +1,32 @@
+import time
+from unittest.mock import MagicMock
+
+from src.processing import ProcessingPipeline
+
+
+def make_pipeline(pipeline_class=ProcessingPipeline):
+    """Build a pipeline without loading Whisper or the API clients"""
+    pipeline = pipeline_class(background=True)
+    pipeline.model = MagicMock()
+    pipeline.anthropic_client = MagicMock()
+    pipeline.tts_client = MagicMock()
+    return pipeline
+
+
+def wait_for(condition, timeout=2.0):
+    """Poll `condition` until it holds or `timeout` seconds pass; returns its last value"""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def mock_claude(pipeline, *chunks):
+    """Give `pipeline` an Anthropic client that streams `chunks`; returns the client
+
+    The request it was sent is in `client.messages.stream.call_args.kwargs`.
+    """
+    client = pipeline.anthropic_client = MagicMock()
+    stream = client.messages.stream.return_value.__enter__.return_value
+    stream.text_stream = iter(chunks)
+    return client
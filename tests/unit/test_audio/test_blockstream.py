@@ -0,0 +1,64 @@
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+import soundfile as sf
+from src.audio.blockstream import BlockStream, blocks_rms_levels
+from src.audio.waveform import rms_levels
+
+
+class TestBlockStream(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'long.wav')
+        rng = np.random.default_rng(0)
+        self.data = (rng.standard_normal((100_000, 2)) * 0.1).astype(np.float32)
+        sf.write(self.path, self.data, 16000, subtype='FLOAT')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read_all(self, stream, frames=1000):
+        chunks = []
+        deadline = time.monotonic() + 5
+        while not stream.finished and time.monotonic() < deadline:
+            out = np.empty((frames, stream.channels), dtype=np.float32)
+            written = stream.read_into(out)
+            chunks.append(out[:written])
+        return np.concatenate(chunks)
+
+    def test_streams_whole_file(self):
+        """All frames come out in order across block boundaries"""
+        with BlockStream(self.path, blocksize=4096, max_blocks=2) as stream:
+            self.assertTrue(stream.wait_ready(timeout=2))
+            self.assertEqual((stream.samplerate, stream.channels), (16000, 2))
+            np.testing.assert_array_equal(self.read_all(stream), self.data)
+
+    def test_resident_blocks_are_bounded(self):
+        """The decoder never queues more than max_blocks ahead"""
+        with BlockStream(self.path, blocksize=1024, max_blocks=3) as stream:
+            stream.wait_ready(timeout=2)
+            time.sleep(0.1)  # Give the decoder time to fill the queue
+            self.assertLessEqual(stream._queue.qsize(), 3)
+            self.assertFalse(stream.finished)
+
+    def test_underrun_zero_fills(self):
+        """Reading before any block is decoded yields silence, not a block"""
+        stream = BlockStream(self.path)
+        out = np.ones((256, 2), dtype=np.float32)
+        self.assertEqual(stream.read_into(out), 0)
+        self.assertFalse(out.any())
+        self.assertEqual(stream.underruns, 1)
+
+    def test_blocks_rms_levels_matches_in_memory(self):
+        """Block-wise preview levels match the in-memory computation"""
+        np.testing.assert_allclose(
+            blocks_rms_levels(self.path, num_bars=50, blocksize=3000),
+            rms_levels(self.data, num_bars=50),
+            rtol=1e-4
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import soundfile as sf
+
+from src.audio import AudioPlayer
+from src.audio.backends.virtual import VirtualOutputDevice
+from src.audio.earcons import SAMPLE_RATE, Earcons, synthesize
+from tests.helpers import wait_for
+
+
+class TestEarcons(unittest.TestCase):
+    def setUp(self):
+        self.device = VirtualOutputDevice(speed=4.0, blocksize=256, capture=True)
+        self.earcons = Earcons(backend=self.device, directory='').open()
+
+    def tearDown(self):
+        self.earcons.close()
+
+    def test_sounds_are_in_memory(self):
+        sounds = synthesize()
+        self.assertEqual(set(sounds), {'ack', 'thinking', 'busy'})
+        for samples in sounds.values():
+            self.assertEqual(samples.dtype, np.float32)
+            self.assertLessEqual(float(np.abs(samples).max()), 1.0)
+
+    def test_idle_stream_is_silent(self):
+        wait_for(lambda: len(self.device.blocks) > 3)
+        self.assertIsNone(self.device.first_sound_at)
+        self.assertFalse(self.earcons.playing)
+
+    def test_play_is_heard_within_a_block(self):
+        played = time.perf_counter()
+        self.assertTrue(self.earcons.play('ack'))
+        self.assertTrue(self.device.sound_arrived.wait(1.0))
+        # One block at 4x speed is ~3 ms; allow for scheduler noise
+        self.assertLess(self.device.first_sound_at - played, 0.1)
+        self.assertTrue(wait_for(lambda: not self.earcons.playing))
+
+    def test_thinking_loops_until_stopped(self):
+        self.earcons.play('ack', then='thinking')
+        thinking = len(self.earcons.sounds['ack']) + len(self.earcons.sounds['thinking'])
+        self.assertTrue(wait_for(lambda: self.device.frames_received > 2 * thinking, 5.0))
+        self.assertTrue(self.earcons.playing)
+
+        self.earcons.stop()
+        self.assertTrue(wait_for(lambda: not self.earcons.playing))
+        received = self.device.frames_received
+        wait_for(lambda: self.device.frames_received > received + 2048)
+        tail = np.concatenate(self.device.captured[-4:])
+        self.assertEqual(float(np.abs(tail).max()), 0.0)
+
+    def test_unknown_or_unopened(self):
+        self.assertFalse(self.earcons.play('fanfare'))
+        self.assertFalse(Earcons(backend=self.device).play('ack'))
+
+    def test_sound_files_override(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sf.write(os.path.join(tmpdir, 'ack.wav'), np.full(800, 0.5, dtype=np.float32),
+                     8000, subtype='FLOAT')
+            sounds = Earcons(directory=tmpdir).load()
+        self.assertEqual(len(sounds['ack']), SAMPLE_RATE // 10)
+        self.assertAlmostEqual(float(sounds['ack'][100]), 0.5, places=5)
+
+    def test_response_audio_stops_cue(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'tone.wav')
+            sf.write(path, np.full(4000, 0.1, dtype=np.float32), 16000, subtype='FLOAT')
+            player = AudioPlayer(backend=VirtualOutputDevice(speed=0, blocksize=512),
+                                 earcons=self.earcons)
+            self.earcons.play('ack', then='thinking')
+            self.assertTrue(player.play_file(path, waveform=None))
+        self.assertTrue(wait_for(lambda: not self.earcons.playing))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import soundfile as sf
+
+from src import tracing
+from src.audio import AudioPlayer, AudioRecorder
+from src.audio.backends import INPUT_OVERFLOW, OUTPUT_UNDERFLOW
+from src.audio.backends.virtual import VirtualInputDevice, VirtualOutputDevice
+from src.audio.glitches import GlitchMonitor, status_names
+
+SAMPLE_WAV = Path(__file__).resolve().parents[3] / 'output.wav'
+
+
+class SlowFrames(list):
+    """Frame buffer whose append takes longer than a 1024-frame period"""
+
+    def append(self, item):
+        time.sleep(0.03)
+        super().append(item)
+
+
+class TestGlitchMonitor(unittest.TestCase):
+    def test_status_names(self):
+        self.assertEqual(status_names(INPUT_OVERFLOW | OUTPUT_UNDERFLOW),
+                         ['input_overflow', 'output_underflow'])
+        self.assertEqual(status_names(SimpleNamespace(output_underflow=True)),
+                         ['output_underflow'])
+        self.assertEqual(status_names(0), [])
+
+    def test_counts_flags_and_overruns(self):
+        monitor = GlitchMonitor('input', rate=1000, frames_per_buffer=10)  # 10 ms deadline
+        now = time.perf_counter()
+        monitor.callback(now, 0)
+        monitor.callback(now - 0.05, INPUT_OVERFLOW)
+        monitor.callback(time.perf_counter(), INPUT_OVERFLOW)
+
+        report = monitor.report()
+        self.assertEqual(report["callbacks"], 3)
+        self.assertEqual(report["flags"], {"input_overflow": 2})
+        self.assertEqual(report["overruns"], 1)
+        self.assertEqual(report["glitches"], 3)
+        self.assertEqual(report["deadline_ms"], 10.0)
+        self.assertGreaterEqual(report["callback_max_ms"], 50)
+        self.assertGreaterEqual(report["max_budget"], 5)
+        self.assertEqual([name for _, name in report["events"]],
+                         ["callback_overrun", "input_overflow", "input_overflow"])
+        self.assertIn("2 input overflow", monitor.summary())
+
+    def test_clean_session(self):
+        monitor = GlitchMonitor('output', rate=48000)
+        monitor.callback(time.perf_counter(), None, 512)
+        self.assertIsNone(monitor.summary())
+        self.assertAlmostEqual(monitor.report()["deadline_ms"], 512 / 48, places=2)
+
+
+class TestStreams(unittest.TestCase):
+    def test_slow_recorder_callback_is_reported(self):
+        device = VirtualInputDevice(SAMPLE_WAV, speed=1.0)
+        recorder = AudioRecorder(backend=device)
+        recorder.start()
+        recorder.frames = SlowFrames()
+        time.sleep(0.2)
+        recorder.stop()
+
+        report = recorder.last_glitch_report
+        self.assertEqual(report["stream"], "input")
+        self.assertGreater(report["overruns"], 0)
+        # The virtual device flags the periods the slow callback made it miss
+        self.assertGreater(report["flags"].get("input_overflow", 0), 0)
+        self.assertGreater(report["max_gap_ms"], report["deadline_ms"])
+
+    def test_playback_report_goes_to_trace(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'tone.wav')
+            tone = (0.5 * np.sin(2 * np.pi * 440 * np.arange(8000) / 16000)).astype(np.float32)
+            sf.write(path, tone, 16000, subtype='FLOAT')
+
+            player = AudioPlayer(backend=VirtualOutputDevice(speed=0, blocksize=512))
+            trace = tracing.RequestTrace()
+            with tracing.activate(trace):
+                self.assertTrue(player.play_file(path, waveform=None))
+
+        report = trace.attrs["playback_glitches"]
+        self.assertIs(report, player.last_glitch_report)
+        self.assertGreaterEqual(report["callbacks"], 16)
+        self.assertEqual(report["glitches"], 0)
+
+    def test_trace_glitch_summary(self):
+        records = [
+            {"capture_glitches": {"glitches": 2, "flags": {"input_overflow": 2}, "overruns": 0,
+                                  "callback_max_ms": 1.0}},
+            {"capture_glitches": {"glitches": 0, "flags": {}, "overruns": 0,
+                                  "callback_max_ms": 3.0},
+             "playback_glitches": {"glitches": 1, "flags": {}, "overruns": 1,
+                                   "callback_max_ms": 40.0}},
+        ]
+        summary = tracing.glitch_summary(records)
+        self.assertEqual(summary["capture"]["sessions"], 2)
+        self.assertEqual(summary["capture"]["glitchy"], 1)
+        self.assertEqual(summary["capture"]["flags"], {"input_overflow": 2})
+        self.assertEqual(summary["capture"]["callback_max_ms"], 3.0)
+        self.assertEqual(summary["playback"]["overruns"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
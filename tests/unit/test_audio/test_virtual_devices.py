@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+import numpy as np
+import soundfile as sf
+from src.audio import AudioPlayer, AudioRecorder
+from src.audio.backends import CONTINUE, INPUT_OVERFLOW
+from src.audio.backends.virtual import VirtualInputDevice, VirtualOutputDevice
+
+SAMPLE_WAV = Path(__file__).resolve().parents[3] / 'output.wav'
+
+
+class TestVirtualDevices(unittest.TestCase):
+    def test_recorder_captures_wav_at_accelerated_pace(self):
+        """The recorder receives the whole WAV, resampled to its rate"""
+        device = VirtualInputDevice(SAMPLE_WAV, speed=0)
+        recorder = AudioRecorder(backend=device)
+        recorder.start()
+        self.assertTrue(device.stream.finished.wait(timeout=5))
+        audio_data = recorder.stop()
+
+        samples = np.frombuffer(audio_data, dtype=np.float32)
+        expected = int(sf.info(SAMPLE_WAV).duration * AudioRecorder.RATE)
+        self.assertGreaterEqual(len(samples), expected)
+        self.assertGreater(np.abs(samples).max(), 0)
+
+    def test_realtime_pacing(self):
+        """At speed=1.0 callbacks arrive once per buffer period"""
+        device = VirtualInputDevice(SAMPLE_WAV, speed=1.0)
+        recorder = AudioRecorder(backend=device)
+        recorder.start()
+        time.sleep(0.25)
+        stream = device.stream
+        recorder.stop()
+
+        period = AudioRecorder.FRAMES_PER_BUFFER / AudioRecorder.RATE
+        summary = stream.stats.summary()
+        self.assertAlmostEqual(summary["period_ms"], period * 1000)
+        self.assertGreaterEqual(summary["callbacks"], 4)
+        self.assertLessEqual(summary["callbacks"], int(0.25 / period) + 2)
+        self.assertEqual(summary["overruns"], 0)
+
+    def test_slow_callback_counts_overruns_and_drops(self):
+        """A callback slower than its deadline is flagged and dropped slots counted"""
+        statuses = []
+
+        def slow_callback(in_data, frame_count, time_info, status):
+            statuses.append(status)
+            time.sleep(0.03)
+            return (None, CONTINUE)
+
+        device = VirtualInputDevice(SAMPLE_WAV, speed=1.0)
+        stream = device.open(44100, 1, 441, slow_callback)  # 10 ms period
+        stream.start_stream()
+        time.sleep(0.2)
+        stream.close()
+
+        self.assertGreater(stream.stats.overruns, 0)
+        self.assertGreater(stream.stats.drops, 0)
+        self.assertTrue(any(status & INPUT_OVERFLOW for status in statuses))
+
+    def test_player_output_sink(self):
+        """The sink receives exactly the played samples, timestamped"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'tone.wav')
+            t = np.arange(8000) / 16000
+            tone = (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+            sf.write(path, tone, 16000, subtype='FLOAT')
+
+            sink = VirtualOutputDevice(speed=0, blocksize=512, capture=True)
+            player = AudioPlayer(backend=sink)
+            started = time.perf_counter()
+            self.assertTrue(player.play_file(path, waveform=None))
+
+        played = np.concatenate(sink.captured)[:, 0]
+        np.testing.assert_allclose(played[:len(tone)], tone, atol=1e-6)
+        self.assertFalse(played[len(tone):].any())
+        self.assertGreaterEqual(sink.first_sound_at, started)
+        self.assertEqual(sink.frames_received, len(played))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import io
+import unittest
+import numpy as np
+from src.audio.waveform import BLOCKS, WaveformMeter, render_levels, rms_levels
+
+
+class TestWaveform(unittest.TestCase):
+    def test_rms_levels_matches_per_chunk_rms(self):
+        """Reshape-based RMS should match the per-chunk computation"""
+        data = np.random.default_rng(0).standard_normal(10_007).astype(np.float32)
+        levels = rms_levels(data, num_bars=50)
+
+        chunk_size = len(data) // 50
+        expected = [np.sqrt(np.mean(data[i * chunk_size:(i + 1) * chunk_size] ** 2))
+                    for i in range(50)]
+        np.testing.assert_allclose(levels, expected, rtol=1e-5)
+
+    def test_rms_levels_stereo_and_short_input(self):
+        """Stereo input is downmixed and too-short input yields no bars"""
+        stereo = np.ones((1000, 2), dtype=np.float32)
+        np.testing.assert_allclose(rms_levels(stereo, num_bars=10), np.ones(10))
+        self.assertEqual(len(rms_levels(np.ones(5), num_bars=10)), 0)
+
+    def test_render_levels(self):
+        """Peak maps to the tallest block and silence to the lowest"""
+        self.assertEqual(render_levels([0.0, 1.0]), BLOCKS[0] + BLOCKS[-1])
+        self.assertEqual(render_levels(np.zeros(3)), BLOCKS[0] * 3)
+        self.assertEqual(render_levels([]), '')
+
+    def test_meter_matches_whole_buffer(self):
+        """Streaming updates should produce the same bars as the full buffer"""
+        data = np.random.default_rng(1).standard_normal(50 * 300).astype(np.float32)
+        meter = WaveformMeter(num_bars=50, samples_per_bar=300, stream=io.StringIO())
+        for start in range(0, len(data), 512):
+            meter.update(data[start:start + 512])
+
+        np.testing.assert_allclose(meter.levels, rms_levels(data, 50), rtol=1e-4)
+        self.assertEqual(meter.render(), render_levels(rms_levels(data, 50)))
+
+    def test_meter_keeps_most_recent_bars(self):
+        """Once full, the meter scrolls and keeps the latest bars"""
+        meter = WaveformMeter(num_bars=3, samples_per_bar=2, stream=io.StringIO())
+        for value in [1, 2, 3, 4]:
+            meter.update(np.full(2, value, dtype=np.float32))
+        np.testing.assert_allclose(meter.levels, [2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
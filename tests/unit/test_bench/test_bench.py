@@ -0,0 +1,161 @@
+import importlib.util
+import json
+import os
+import tempfile
+import time
+import unittest
+import urllib.request
+from unittest.mock import MagicMock
+
+import numpy as np
+import soundfile as sf
+
+from src.bench import Latency, MockAnthropic, MockTTS, SimulatedWhisper
+from src.bench.replay import (
+    RECORD_RATE,
+    CorpusItem,
+    build_pipeline,
+    compare,
+    format_report,
+    load_corpus,
+    replay,
+    simulated_whisper,
+    synthetic_corpus,
+)
+from src.processing import ProcessingPipeline
+from src.tracing import summarize
+
+requires_sdks = unittest.skipUnless(
+    importlib.util.find_spec('anthropic') and importlib.util.find_spec('openai'),
+    "anthropic/openai SDKs not installed")
+
+
+def post(url, payload):
+    request = urllib.request.Request(url, json.dumps(payload).encode(),
+                                     {'Content-Type': 'application/json'})
+    return urllib.request.urlopen(request, timeout=5)
+
+
+class TestLatency(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(Latency.parse('0.2').sample(), 0.2)
+        self.assertEqual(Latency.parse('fixed:0.1').sample(), 0.1)
+        uniform = Latency.parse('uniform:0.1,0.3')
+        self.assertTrue(all(0.1 <= uniform.sample() <= 0.3 for _ in range(100)))
+        self.assertEqual(repr(Latency.parse('normal:0.3,0.05')), 'normal:0.3,0.05')
+        with self.assertRaises(ValueError):
+            Latency.parse('gamma:1,2')
+
+    def test_clipped_at_zero(self):
+        normal = Latency.parse('normal:0,1')
+        self.assertTrue(all(normal.sample() >= 0 for _ in range(100)))
+
+
+class TestMockServices(unittest.TestCase):
+    def test_anthropic_stream(self):
+        with MockAnthropic(ttft='fixed:0.05', token_interval='fixed:0', response="Hi there you") \
+                as service:
+            started = time.perf_counter()
+            with post(service.url + '/v1/messages', {"stream": True, "messages": []}) as response:
+                events = [json.loads(line[6:]) for line in response.read().decode().splitlines()
+                          if line.startswith('data: ')]
+            elapsed = time.perf_counter() - started
+        text = "".join(e["delta"]["text"] for e in events if e["type"] == "content_block_delta")
+        self.assertEqual(text, "Hi there you")
+        self.assertEqual(events[0]["type"], "message_start")
+        self.assertEqual(events[-1]["type"], "message_stop")
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertEqual(service.requests, 1)
+
+    def test_tts(self):
+        with MockTTS(ttfb='fixed:0.05', chunk_interval='fixed:0', seconds_per_word=0.1) as service:
+            with post(service.url + '/v1/audio/speech', {"input": "one two three"}) as response:
+                audio = response.read()
+        with sf.SoundFile(__import__('io').BytesIO(audio)) as f:
+            self.assertAlmostEqual(f.frames / f.samplerate, 0.3, places=2)
+
+    def test_unknown_path(self):
+        with MockTTS() as service:
+            with self.assertRaises(urllib.error.HTTPError):
+                post(service.url + '/v1/other', {})
+
+
+class TestCorpus(unittest.TestCase):
+    def test_load_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sf.write(os.path.join(tmp, 'a.wav'), np.zeros(16000, dtype=np.float32), 16000)
+            sf.write(os.path.join(tmp, 'b.wav'), np.zeros((4410, 2), dtype=np.float32), 44100)
+            open(os.path.join(tmp, 'a.png'), 'wb').close()
+            with open(os.path.join(tmp, 'a.txt'), 'w') as f:
+                f.write("open the file\n")
+            open(os.path.join(tmp, 'notes.md'), 'w').close()
+
+            corpus = load_corpus(tmp)
+        self.assertEqual([item.name for item in corpus], ['a', 'b'])
+        self.assertEqual(corpus[0].frames, RECORD_RATE)
+        self.assertEqual(corpus[0].transcript, "open the file")
+        self.assertTrue(corpus[0].screenshot.endswith('a.png'))
+        self.assertIsNone(corpus[1].screenshot)
+        self.assertAlmostEqual(corpus[1].duration, 0.1)
+
+    def test_simulated_whisper_finds_transcript(self):
+        item = CorpusItem('x', np.zeros(22050, dtype=np.float32).tobytes(), transcript="hello")
+        pipeline = ProcessingPipeline(background=True)
+        pipeline.model = simulated_whisper([item], rtf=0.0)
+        path = pipeline.save_recording(item.audio)
+        try:
+            self.assertEqual(pipeline.transcribe_text(path), "hello")
+        finally:
+            os.remove(path)
+        self.assertEqual(pipeline.model.transcribe(np.zeros(100))[0].__next__().text,
+                         SimulatedWhisper().default)
+
+
+class TestReplay(unittest.TestCase):
+    def test_breakdown(self):
+        pipeline = MagicMock()
+
+        def process(audio, screenshot, cancel_token=None):
+            time.sleep(0.01)
+            return "responses/x.mp3"
+        pipeline.process.side_effect = process
+
+        corpus = synthetic_corpus(count=2)
+        records = replay(pipeline, corpus, repeat=2, warmup=1)
+        self.assertEqual(len(records), 4)
+        self.assertEqual(pipeline.process.call_count, 6)
+        self.assertTrue(all(r["outcome"] == "ok" for r in records))
+        self.assertGreaterEqual(summarize(records)["total"]["p50"], 10)
+
+    def test_compare(self):
+        baseline = {"llm": {"p50": 400.0, "p95": 500.0}, "encode": {"p50": 2.0, "p95": 3.0}}
+        summary = {
+            "llm": {"count": 3, "p50": 520.0, "p95": 560.0, "p99": 560.0},
+            # Doubled, but under the absolute slack
+            "encode": {"count": 3, "p50": 4.0, "p95": 6.0, "p99": 6.0},
+            "tts": {"count": 3, "p50": 1.0, "p95": 1.0, "p99": 1.0},
+        }
+        regressions = compare(summary, baseline, tolerance=0.2)
+        self.assertEqual(regressions, [("llm", "p50", 400.0, 520.0)])
+        report = format_report(summary, baseline, regressions)
+        self.assertIn("+30.0%", report)
+        self.assertIn("regression", report)
+
+    @requires_sdks
+    def test_end_to_end(self):
+        corpus = synthetic_corpus(count=2, min_seconds=0.5, max_seconds=1.0)
+        with MockAnthropic('fixed:0.05', 'fixed:0') as llm, MockTTS('fixed:0.02', 'fixed:0') as tts:
+            pipeline = build_pipeline(llm.url, tts.url, simulated_whisper(corpus, rtf=0.01))
+            try:
+                records = replay(pipeline, corpus, repeat=1, warmup=0)
+            finally:
+                pipeline.cleanup()
+        self.assertTrue(all(r["outcome"] == "ok" for r in records))
+        summary = summarize(records)
+        for stage in ("transcribe", "llm", "llm_first_token", "tts", "total"):
+            self.assertIn(stage, summary)
+        self.assertGreaterEqual(summary["llm_first_token"]["p50"], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import os
+import random
+import tempfile
+import threading
+import time
+import unittest
+
+from src.bench.load import (
+    DaemonTarget,
+    PipelineTarget,
+    UtteranceMix,
+    format_table,
+    outcome_for,
+    percentile,
+    run_open,
+    sweep,
+)
+from src.bench.replay import RECORD_RATE, CorpusItem, simulated_whisper
+from src.daemon import AssistantDaemon, DaemonClient
+from tests.helpers import make_pipeline
+
+
+def clip(seconds, name=None):
+    frames = int(seconds * RECORD_RATE)
+    return CorpusItem(name or f"{seconds}s", b'\0\0\0\0' * frames)
+
+
+class SingleServer:
+    """A target that serves one request at a time in `service` seconds"""
+
+    def __init__(self, service=0.02):
+        self.service = service
+        self.lock = threading.Lock()
+
+    def call(self, item):
+        arrived = time.perf_counter()
+        with self.lock:
+            queued = time.perf_counter() - arrived
+            time.sleep(self.service)
+        return queued, 'ok'
+
+
+class FakePipeline:
+    ready = True
+
+    def __init__(self, service=0.02, result="responses/r.mp3"):
+        self.service = service
+        self.result = result
+
+    def load_in_background(self, warmup=False):
+        pass
+
+    def process(self, audio_data, screenshot_path=None, cancel_token=None, state=None):
+        time.sleep(self.service)
+        return self.result
+
+
+class TestMix(unittest.TestCase):
+    def test_weights(self):
+        corpus = [clip(1.0), clip(1.5), clip(3.0), clip(8.0)]
+        mix = UtteranceMix.parse(corpus, "short=1,long=0", random.Random(1))
+        self.assertTrue(all(mix.pick().duration < 2.0 for _ in range(50)))
+
+        mix = UtteranceMix.parse(corpus, "medium=1,long=1", random.Random(1))
+        picks = {mix.pick().name for _ in range(200)}
+        self.assertEqual(picks, {"3.0s", "8.0s"})
+
+    def test_uniform_and_errors(self):
+        corpus = [clip(1.0), clip(3.0)]
+        mix = UtteranceMix.parse(corpus, "", random.Random(1))
+        self.assertEqual({mix.pick().name for _ in range(100)}, {"1.0s", "3.0s"})
+        with self.assertRaises(ValueError):
+            UtteranceMix.parse(corpus, "huge=1")
+        with self.assertRaises(ValueError):
+            UtteranceMix.parse(corpus, "long=1")
+
+    def test_helpers(self):
+        self.assertEqual(percentile(list(range(1, 101)), 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+        self.assertEqual(outcome_for(None), 'error')
+        self.assertEqual(outcome_for('responses/busy.mp3'), 'shed')
+        self.assertEqual(outcome_for('responses/x.mp3'), 'ok')
+
+
+class TestLoad(unittest.TestCase):
+    def test_closed_loop_queueing_grows_with_users(self):
+        mix = UtteranceMix([clip(1.0)])
+        results = sweep(SingleServer(0.02), mix, [1, 4], duration=0.4, mode='closed', think=None)
+        one, four = results
+        # One server: throughput is capped, so more users only add queueing
+        self.assertAlmostEqual(one["throughput"], four["throughput"], delta=one["throughput"] * 0.5)
+        self.assertLess(one["queue_p50"], 5)
+        self.assertGreater(four["queue_p50"], 30)
+        self.assertGreater(four["latency_p99"], one["latency_p99"])
+        table = format_table(results)
+        self.assertIn("users", table)
+        self.assertEqual(len(table.splitlines()), 3)
+
+    def test_open_loop_rate(self):
+        mix = UtteranceMix([clip(1.0)])
+        requests, elapsed = run_open(SingleServer(0.0), mix, rate=100, duration=0.5,
+                                     arrival='uniform')
+        self.assertEqual(len(requests), 49)
+        self.assertTrue(all(r.outcome == 'ok' for r in requests))
+        with self.assertRaises(ValueError):
+            run_open(SingleServer(), mix, rate=1, duration=1, arrival='bursty')
+
+    def test_pipeline_target_rejects_when_full(self):
+        target = PipelineTarget(FakePipeline(0.1), workers=1, max_pending=1)
+        try:
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(target.call(clip(1.0))))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+                time.sleep(0.01)
+            for thread in threads:
+                thread.join()
+        finally:
+            target.close()
+        outcomes = sorted(outcome for _, outcome in results)
+        self.assertEqual(outcomes, ['ok', 'ok', 'rejected', 'rejected'])
+        self.assertGreater(max(queued for queued, _ in results), 0.05)
+
+    def test_concurrent_requests_keep_their_own_audio(self):
+        # Distinct lengths map to distinct transcripts in SimulatedWhisper
+        corpus = [CorpusItem(f"clip{i}", b'\0\0\0\0' * (4410 * (i + 1)), screenshot=f"clip{i}.png",
+                             transcript=f"question number {i}") for i in range(6)]
+        pipeline = make_pipeline()
+        pipeline.model = simulated_whisper(corpus, rtf=0.5)
+        # Admit everything: this is about files, not load shedding
+        pipeline.admission = None
+        asked = []
+        pipeline.get_ai_response = lambda text, screenshot, token=None: (
+            asked.append((screenshot, text)) or text)
+        pipeline.text_to_speech = lambda text, token=None: text
+        target = PipelineTarget(pipeline, workers=4)
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                threads = [threading.Thread(target=target.call, args=(item,))
+                           for item in corpus * 2]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            finally:
+                target.close()
+                pipeline.cleanup()
+                os.chdir(cwd)
+        self.assertEqual(len(asked), 12)
+        for screenshot, text in asked:
+            self.assertEqual(text, f"question number {screenshot[4:-4]}")
+
+    def test_daemon_target(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'load.sock')
+            daemon = AssistantDaemon(path, pipeline=FakePipeline(0.05), max_pending=4)
+            daemon.start()
+            target = DaemonTarget(DaemonClient(path).connect())
+            try:
+                results = sweep(target, UtteranceMix([clip(0.1)]), [2], duration=0.3)
+            finally:
+                target.close()
+                daemon.shutdown()
+        result = results[0]
+        self.assertEqual(set(result["outcomes"]), {'ok'})
+        # One daemon worker: the second user waits behind the first
+        self.assertGreater(result["queue_p99"], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
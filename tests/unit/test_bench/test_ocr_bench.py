@@ -0,0 +1,31 @@
+import tempfile
+import unittest
+
+from src.bench.ocr import find_screens, format_table, measure, synthetic_screens
+from src.processing.ocr import ScreenOcr
+
+
+def engine(image):
+    return [((1, 1, row), word, 92.0)
+            for row in range(30) for word in ("def", "settings_for(level):")]
+
+
+class TestOcrBenchmark(unittest.TestCase):
+    def test_text_is_cheaper_than_the_image(self):
+        with tempfile.TemporaryDirectory() as directory:
+            screens = synthetic_screens(directory, count=2)
+            self.assertEqual(find_screens([directory]), screens)
+            result = measure(screens[0], ScreenOcr(region=1.0, engine=engine), repeat=1)
+        self.assertTrue(result["used"])
+        self.assertLess(result["text"]["tokens"] * 2, result["image"]["tokens"])
+        self.assertLess(result["text"]["bytes"], result["image"]["bytes"])
+        self.assertGreater(result["thumbnail"]["tokens"], result["text"]["tokens"])
+        self.assertIn("thumbnail", format_table([result]))
+
+    def test_ocr_failure(self):
+        with tempfile.TemporaryDirectory() as directory:
+            screen = synthetic_screens(directory, count=1)[0]
+            self.assertIsNone(measure(screen, ScreenOcr(engine=lambda image: None), repeat=1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import contextmanager, nullcontext
+
+from src.daemon import AssistantDaemon, DaemonClient, DaemonError, ProtocolError
+from src.daemon.protocol import HEADER, REQUEST, encode_frame, recv_frame, send_frame
+from src.processing import CancelToken, CancelledError
+
+
+class FakePipeline:
+    """Stands in for ProcessingPipeline; `gate` holds process() until set"""
+
+    ready = True
+
+    def __init__(self):
+        self.calls = []
+        self.stages = []
+        self.running = 0
+        self.finished = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def load_in_background(self, warmup=False):
+        pass
+
+    def wait_until_ready(self, timeout=None):
+        return True
+
+    @contextmanager
+    def in_flight(self):
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+
+    def stage(self, name, cancel_token=None):
+        self.stages.append((name, self.running))
+        return nullcontext()
+
+    def process(self, audio_data, screenshot_path=None, cancel_token=None, state=None):
+        self.calls.append((audio_data, screenshot_path))
+        if audio_data == b'louder':
+            state.volume += 0.25
+        while not self.gate.wait(0.01):
+            cancel_token.raise_if_cancelled()
+        self.finished += 1
+        return f"responses/{len(audio_data)}.mp3"
+
+    def save_recording(self, audio_data, sample_rate=44100):
+        return f"recordings/{sample_rate}.wav"
+
+    def transcribe_audio(self, path, cancel_token=None):
+        return f"heard {path}"
+
+    def get_ai_response(self, transcript, screenshot_path, cancel_token=None):
+        raise RuntimeError("api down")
+
+
+class TestProtocol(unittest.TestCase):
+    def test_round_trip(self):
+        left, right = socket.socketpair()
+        audio = bytes(range(256)) * 100
+        send_frame(left, REQUEST, {"op": "process", "id": 7}, audio)
+        kind, meta, payload = recv_frame(right)
+        self.assertEqual(kind, REQUEST)
+        self.assertEqual(meta, {"op": "process", "id": 7})
+        self.assertEqual(bytes(payload), audio)
+        left.close()
+        self.assertIsNone(recv_frame(right))
+        right.close()
+
+    def test_header_is_compact(self):
+        frame = encode_frame(REQUEST, {}, b'\0' * 10)
+        self.assertEqual(len(frame), HEADER.size + 2 + 10)
+
+    def test_rejects_garbage(self):
+        left, right = socket.socketpair()
+        left.sendall(b'GET / HTTP/1.1\r\n\r\n')
+        with self.assertRaises(ProtocolError):
+            recv_frame(right)
+        left.close()
+        right.close()
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'assistant.sock')
+        self.pipeline = FakePipeline()
+        self.daemon = AssistantDaemon(self.path, pipeline=self.pipeline, max_pending=1)
+        self.daemon.start()
+        self.client = DaemonClient(self.path).connect()
+
+    def tearDown(self):
+        self.pipeline.gate.set()
+        self.client.close()
+        self.daemon.shutdown()
+        self.tmp.cleanup()
+
+    def test_socket_is_private(self):
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_ping_and_stats(self):
+        self.assertTrue(self.client.ready)
+        self.assertEqual(self.client.stats()["clients"], 1)
+
+    def test_process_sends_audio_payload(self):
+        audio = b'\x01\x02\x03\x04' * 1000
+        # Paths cross the socket absolute: the two may not share a working directory
+        self.assertEqual(self.client.process(audio, 'shot.png'),
+                         os.path.abspath('responses/4000.mp3'))
+        self.assertEqual(self.pipeline.calls, [(audio, os.path.abspath('shot.png'))])
+
+    def test_stage_operations(self):
+        self.assertEqual(self.client.transcribe(b'\0' * 8, sample_rate=16000),
+                         'heard recordings/16000.wav')
+        with self.assertRaisesRegex(DaemonError, "api down"):
+            self.client.respond("hi")
+        # In a stage slot and counted as running, so Whisper stays loaded
+        self.assertEqual(self.pipeline.stages, [('asr', 1), ('llm', 1)])
+        self.assertEqual(self.pipeline.running, 0)
+
+    def test_clients_share_one_pipeline(self):
+        with DaemonClient(self.path) as other:
+            other.process(b'ab')
+        self.client.process(b'abcd')
+        self.assertEqual(len(self.pipeline.calls), 2)
+
+    def test_each_client_keeps_its_own_volume(self):
+        self.client.process(b'louder')
+        self.assertEqual(self.client.volume, 1.25)
+        with DaemonClient(self.path) as other:
+            other.process(b'ab')
+            self.assertEqual(other.volume, 1.0)
+
+    def test_cancel_returns_immediately_and_stops_daemon_job(self):
+        self.pipeline.gate.clear()
+        token = CancelToken()
+        threading.Timer(0.05, token.cancel).start()
+        started = time.perf_counter()
+        with self.assertRaises(CancelledError):
+            self.client.request('process', b'abcd', token)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertTrue(self.daemon.executor.wait_idle(timeout=2))
+        self.assertEqual(self.pipeline.finished, 0)
+
+    def test_busy_when_queue_full(self):
+        self.pipeline.gate.clear()
+        results = []
+        # One request running and one queued fill the daemon; send them in
+        # turn, or the second can arrive before the worker takes the first
+        deadline = time.monotonic() + 2
+        for state in ((1, 0), (1, 1)):
+            threading.Thread(target=lambda: results.append(self.client.process(b'x')),
+                             daemon=True).start()
+            while (self.daemon.executor.running, self.daemon.executor.depth) != state:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+        with self.assertRaisesRegex(DaemonError, "busy"):
+            self.client.request('process', b'x', timeout=1)
+        self.pipeline.gate.set()
+
+    def test_unknown_op(self):
+        with self.assertRaisesRegex(DaemonError, "unknown op"):
+            self.client.request('fly', timeout=1)
+
+    def test_second_daemon_refused(self):
+        with self.assertRaises(RuntimeError):
+            AssistantDaemon(self.path, pipeline=FakePipeline()).start()
+
+    def test_stale_socket_is_replaced(self):
+        self.client.close()
+        self.daemon.shutdown()
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        self.daemon = AssistantDaemon(self.path, pipeline=self.pipeline)
+        self.daemon.start()
+        self.client = DaemonClient(self.path).connect()
+        self.assertTrue(self.client.ready)
+
+    def test_lost_connection_fails_waiters(self):
+        self.pipeline.gate.clear()
+        threading.Timer(0.05, self.daemon.shutdown).start()
+        with self.assertRaises(DaemonError):
+            self.client.request('process', b'x', timeout=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import gc
+import time
+import unittest
+
+from src import gc_control
+from src.audio.glitches import GlitchMonitor
+from src.gc_control import GcController
+
+
+class _Garbage:
+    def __init__(self):
+        self.cycle = self
+
+
+class TestGcController(unittest.TestCase):
+    def setUp(self):
+        self.thresholds = gc.get_threshold()
+        self.controllers = []
+
+    def tearDown(self):
+        for controller in self.controllers:
+            controller.uninstall()
+        gc_control.configure('off')
+        gc.enable()
+        gc.set_threshold(*self.thresholds)
+
+    def controller(self, mode, **options):
+        controller = GcController(mode, **options).install()
+        self.controllers.append(controller)
+        return controller
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            GcController('eager')
+
+    def test_measures_pauses(self):
+        controller = self.controller('measure')
+        gc.collect()
+        gc.collect(0)
+
+        stats = controller.stats()
+        self.assertGreaterEqual(stats["collections"][2], 1)
+        self.assertGreaterEqual(stats["collections"][0], 1)
+        self.assertGreater(stats["pause_max_ms"], 0)
+        self.assertGreaterEqual(stats["pause_max_ms"], stats["pause_p50_ms"])
+        # Measuring alone changes nothing
+        self.assertEqual(gc.get_threshold(), self.thresholds)
+        controller.hold()()
+        self.assertTrue(gc.isenabled())
+
+    def test_uninstall_restores_thresholds(self):
+        controller = self.controller('realtime')
+        self.assertEqual(gc.get_threshold(), gc_control.REALTIME_THRESHOLDS)
+        controller.uninstall()
+        self.assertEqual(gc.get_threshold(), self.thresholds)
+        self.assertNotIn(controller._on_gc, gc.callbacks)
+
+    def test_hold_defers_collection_until_idle(self):
+        controller = self.controller('realtime')
+        outer = controller.hold()
+        inner = controller.hold()
+        self.assertFalse(gc.isenabled())
+
+        for _ in range(1000):
+            _Garbage()
+        inner()
+        inner()  # idempotent: the outer hold still counts
+        self.assertFalse(gc.isenabled())
+        self.assertEqual(controller.idle_collections, 0)
+
+        outer()
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(controller.idle_collections, 1)
+        self.assertEqual(controller.busy_pauses, 0)
+
+    def test_overlapping_holds_expire(self):
+        controller = self.controller('realtime', max_hold=0.01)
+        first = controller.hold()
+        second = controller.hold()
+        first()
+        time.sleep(0.02)
+        controller._expire_holds()
+        # The second hold is still running, but collection is back on
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(controller.forced, 1)
+
+        third = controller.hold()
+        second()
+        controller._expire_holds()
+        self.assertTrue(gc.isenabled())
+        self.assertEqual(controller.forced, 1)
+
+        third()
+        self.assertEqual(controller.idle_collections, 1)
+        # Once every hold drains, the next one defers collection again
+        fourth = controller.hold()
+        self.assertFalse(gc.isenabled())
+        fourth()
+        self.assertTrue(gc.isenabled())
+
+    def test_model_loaded_freezes(self):
+        if not hasattr(gc, 'freeze'):
+            self.skipTest("gc.freeze needs Python 3.7+")
+        try:
+            self.controller('measure').model_loaded()
+            self.assertEqual(gc.get_freeze_count(), 0)
+            self.controller('realtime').model_loaded()
+            self.assertGreater(gc.get_freeze_count(), 0)
+        finally:
+            gc.unfreeze()
+
+    def test_unload_thaws_the_model(self):
+        if not hasattr(gc, 'freeze'):
+            self.skipTest("gc.freeze needs Python 3.7+")
+        controller = self.controller('realtime')
+        try:
+            model = [_Garbage() for _ in range(10000)]
+            controller.model_loaded()
+            frozen = gc.get_freeze_count()
+            # An unload/reload cycle must not leave the old model frozen
+            controller.model_unloading()
+            self.assertEqual(gc.get_freeze_count(), 0)
+            del model
+            controller.model_loaded()
+            self.assertLess(gc.get_freeze_count(), frozen - 10000)
+        finally:
+            gc.unfreeze()
+
+    def test_glitch_correlation(self):
+        controller = self.controller('measure', glitch_window=0.05)
+        gc.collect(0)
+        controller.glitch()  # right after a pause
+        controller.glitch(time.perf_counter() + 1.0)  # long after
+
+        stats = controller.stats()
+        self.assertEqual(stats["glitches"], 2)
+        self.assertEqual(stats["glitches_near_gc"], 1)
+        self.assertIn("1/2 audio glitches", controller.summary())
+
+    def test_glitch_monitor_reports_to_controller(self):
+        controller = gc_control.configure('measure')
+        monitor = GlitchMonitor('output', rate=1000, frames_per_buffer=10)
+        monitor.callback(time.perf_counter() - 0.05)  # 5x its 10 ms deadline
+
+        self.assertEqual(controller.glitches, 1)
+
+    def test_module_helpers_are_noops_when_off(self):
+        self.assertIsNone(gc_control.configure('off'))
+        self.assertIsNone(gc_control.current())
+        gc_control.hold()()
+        gc_control.glitch()
+        gc_control.model_loaded()
+        gc_control.model_unloading()
+        self.assertTrue(gc.isenabled())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+from src.hotkeys.backends import KEY_DOWN, KEY_UP, SyntheticBackend, get_backend
+from src.hotkeys.backends.linux import EvdevBackend, X11Backend
+from src.hotkeys.hotkey_manager import HotkeyManager, MODIFIER_MASKS
+
+CMD_SHIFT = MODIFIER_MASKS['cmd'] | MODIFIER_MASKS['shift']
+
+
+class TestHotkeyBackends(unittest.TestCase):
+    def test_get_backend(self):
+        self.assertIsInstance(get_backend('synthetic'), SyntheticBackend)
+        self.assertIsInstance(get_backend('evdev'), EvdevBackend)
+        with self.assertRaises(ValueError):
+            get_backend('nope')
+
+    def test_synthetic_replay(self):
+        """Scripted events are delivered in order with native key codes"""
+        handler = MagicMock()
+        backend = SyntheticBackend(speed=1000)
+        backend.start(handler)
+        events = backend.replay([
+            (0, 'down', 'cmd+shift+a'),
+            (0.5, 'up', 'cmd+shift+a'),
+        ])
+        self.assertEqual([e.type() for e in events], [KEY_DOWN, KEY_UP])
+        self.assertEqual(events[0].keyCode(), 0)
+        self.assertEqual(events[0].modifierFlags(), CMD_SHIFT)
+        self.assertEqual(handler.call_count, 2)
+        self.assertLessEqual(events[0].timestamp, events[1].timestamp)
+
+    def test_evdev_tracks_modifiers(self):
+        """Raw evdev key events become KeyEvents with neutral modifier flags"""
+        handler = MagicMock()
+        backend = EvdevBackend()
+        backend.handler = handler
+        self.assertIsNone(backend.translate(125, 1))  # Left Meta down
+        self.assertIsNone(backend.translate(42, 1))   # Left Shift down
+        down = backend.translate(30, 1)               # A down
+        repeat = backend.translate(30, 2)             # A auto-repeat
+        backend.translate(42, 0)                      # Shift released first
+        up = backend.translate(30, 0)
+
+        self.assertEqual((down.type(), down.keyCode(), down.modifierFlags()),
+                         (KEY_DOWN, 30, CMD_SHIFT))
+        self.assertEqual(repeat.type(), KEY_DOWN)
+        self.assertEqual((up.type(), up.modifierFlags()), (KEY_UP, MODIFIER_MASKS['cmd']))
+        self.assertEqual(handler.call_count, 3)
+
+    def test_x11_state_translation(self):
+        backend = X11Backend()
+        event = backend.translate(True, 38, (1 << 0) | (1 << 6))  # Shift + Super, keycode for 'a'
+        self.assertEqual(event.modifierFlags(), CMD_SHIFT)
+        self.assertEqual(event.keyCode(), X11Backend.key_codes['a'])
+
+    def stop_from_backend_thread(self, backend):
+        errors = []
+
+        def handler():
+            try:
+                backend.stop()
+            except Exception as e:
+                errors.append(e)
+        thread = backend._thread = threading.Thread(target=handler)
+        thread.start()
+        thread.join(timeout=2.0)
+        self.assertEqual(errors, [])
+        self.assertIsNone(backend._thread)
+
+    def test_evdev_stop_from_reader_thread(self):
+        backend = EvdevBackend()
+        device, selector = MagicMock(), MagicMock()
+        backend.devices, backend._selector = [device], selector
+        self.stop_from_backend_thread(backend)
+        selector.close.assert_called_once()
+        device.close.assert_called_once()
+
+    def test_x11_stop_from_record_thread(self):
+        backend = X11Backend()
+        control, record = MagicMock(), MagicMock()
+        backend._control, backend._record, backend._context = control, record, object()
+        self.stop_from_backend_thread(backend)
+        control.record_disable_context.assert_called_once()
+        record.close.assert_called_once()
+        control.close.assert_called_once()
+
+    def test_manager_uses_backend_key_codes(self):
+        manager = HotkeyManager(EvdevBackend.key_codes, EvdevBackend.modifier_masks)
+        manager.register_hotkey('cmd+shift+a', 'record')
+        self.assertEqual(manager.lookup(30, CMD_SHIFT)[0], 'record')
+
+
+if __name__ == '__main__':
+    unittest.main()
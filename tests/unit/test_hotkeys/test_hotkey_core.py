@@ -1,14 +1,12 @@
 import unittest
-from unittest.mock import patch, MagicMock, create_autospec
-from AppKit import (
-    NSEvent,
-    NSEventTypeKeyDown,
-    NSEventTypeKeyUp,
-    NSCommandKeyMask,
-    NSShiftKeyMask
-)
-from src.hotkeys import HotkeyListener
+from unittest.mock import call, patch, MagicMock, create_autospec
+from src.hotkeys import HotkeyListener, SyntheticBackend
+from src.hotkeys.backends import KEY_DOWN, KEY_UP
+from src.hotkeys.hotkey_manager import MODIFIER_MASKS
 from src.audio import AudioRecorder
+from src.processing import CancelToken
+
+CMD_SHIFT = MODIFIER_MASKS['cmd'] | MODIFIER_MASKS['shift']
 
 
 class TestHotkeyListenerCore(unittest.TestCase):
@@ -30,7 +28,7 @@ class TestHotkeyListenerCore(unittest.TestCase):
         self.mock_pipeline_cls = self.pipeline_patcher.start()
         
         # Initialize listener
-        self.listener = HotkeyListener.alloc().init()
+        self.listener = HotkeyListener.alloc().init(backend=SyntheticBackend())
         if not self.listener:
             self.skipTest("Listener initialization failed")
             
@@ -49,7 +47,7 @@ class TestHotkeyListenerCore(unittest.TestCase):
         
         # Start recording
         event = self.create_mock_event(
-            NSEventTypeKeyDown, 0, NSCommandKeyMask | NSShiftKeyMask
+            KEY_DOWN, 0, CMD_SHIFT
         )
         self.listener.handle_event(event)
         self.assertTrue(self.listener.recording_in_progress)
@@ -57,7 +55,7 @@ class TestHotkeyListenerCore(unittest.TestCase):
         
         # Stop recording
         event = self.create_mock_event(
-            NSEventTypeKeyUp, 0, NSCommandKeyMask | NSShiftKeyMask
+            KEY_UP, 0, CMD_SHIFT
         )
         self.listener.handle_event(event)
         self.assertFalse(self.listener.recording_in_progress)
@@ -68,14 +66,14 @@ class TestHotkeyListenerCore(unittest.TestCase):
         # Start recording
         self.listener.handle_event(
             self.create_mock_event(
-                NSEventTypeKeyDown, 0, NSCommandKeyMask | NSShiftKeyMask
+                KEY_DOWN, 0, CMD_SHIFT
             )
         )
         
         # Try to start recording again while already recording
         self.listener.handle_event(
             self.create_mock_event(
-                NSEventTypeKeyDown, 0, NSCommandKeyMask | NSShiftKeyMask
+                KEY_DOWN, 0, CMD_SHIFT
             )
         )
         
@@ -87,7 +85,7 @@ class TestHotkeyListenerCore(unittest.TestCase):
         # Stop recording
         self.listener.handle_event(
             self.create_mock_event(
-                NSEventTypeKeyUp, 0, NSCommandKeyMask | NSShiftKeyMask
+                KEY_UP, 0, CMD_SHIFT
             )
         )
         
@@ -95,11 +93,54 @@ class TestHotkeyListenerCore(unittest.TestCase):
         """Test quit event handling"""
         with patch.object(self.listener, 'cleanup') as mock_cleanup:
             event = self.create_mock_event(
-                NSEventTypeKeyDown, 12, NSCommandKeyMask | NSShiftKeyMask
+                KEY_DOWN, 12, CMD_SHIFT
             )
             self.listener.handle_event(event)
             mock_cleanup.assert_called_once()
             
+    def test_barge_in_cancels_active_response(self):
+        """A new Cmd+Shift+A press cancels the response and records within budget"""
+        token = CancelToken()
+        self.listener.active_token = token
+        
+        with patch.object(self.listener, 'take_screenshot', return_value=None):
+            self.listener.handle_event(
+                self.create_mock_event(
+                    KEY_DOWN, 0, CMD_SHIFT
+                )
+            )
+        
+        self.assertTrue(token.cancelled)
+        self.assertTrue(self.listener.recording_in_progress)
+        self.mock_recorder.start.assert_called_once()
+        self.assertEqual(len(self.listener.barge_in_latencies), 1)
+        self.assertLess(
+            self.listener.barge_in_latencies[0], HotkeyListener.BARGE_IN_BUDGET
+        )
+        
+    def record_and_release(self, submit):
+        """Press and release the hotkey with `submit` standing in for the executor"""
+        earcons = self.listener.earcons = MagicMock()
+        self.listener.executor.submit = submit
+        with patch.object(self.listener, 'take_screenshot', return_value=None):
+            self.listener.handle_event(self.create_mock_event(KEY_DOWN, 0, CMD_SHIFT))
+            self.listener.handle_event(self.create_mock_event(KEY_UP, 0, CMD_SHIFT))
+        return [c for c in earcons.mock_calls if c[0] in ('play', 'stop')]
+
+    def test_thinking_cue_stops_after_an_instant_reply(self):
+        """A job finished before submit() returns still ends the thinking loop"""
+        self.mock_pipeline.process.return_value = None
+
+        def run_now(fn, *args, cancel_token=None):
+            fn(*args)
+            return True
+        calls = self.record_and_release(run_now)
+        self.assertEqual(calls[-2:], [call.play('ack', then='thinking'), call.stop()])
+
+    def test_rejected_job_replaces_thinking_with_busy(self):
+        calls = self.record_and_release(lambda fn, *args, cancel_token=None: False)
+        self.assertEqual(calls[-1], call.play('busy'))
+
     def test_invalid_events(self):
         """Test handling of invalid events"""
         # Test None event
@@ -113,8 +154,8 @@ class TestHotkeyListenerCore(unittest.TestCase):
         
     @staticmethod
     def create_mock_event(event_type, key_code, flags):
-        """Create a mock NSEvent for testing."""
-        event = MagicMock(spec=NSEvent)
+        """Create a mock key event for testing."""
+        event = MagicMock()
         event.type.return_value = event_type
         event.keyCode.return_value = key_code
         event.modifierFlags.return_value = flags
@@ -1,6 +1,7 @@
+import sys
 import unittest
 from unittest.mock import patch, MagicMock
-from src.hotkeys import HotkeyListener
+from src.hotkeys import HotkeyListener, SyntheticBackend
 
 
 class TestHotkeyListenerErrors(unittest.TestCase):
@@ -11,7 +12,7 @@ class TestHotkeyListenerErrors(unittest.TestCase):
             mock_recorder_cls.side_effect = Exception("Audio init failed")
             
             # Initialize listener
-            listener = HotkeyListener.alloc().init()
+            listener = HotkeyListener.alloc().init(backend=SyntheticBackend())
             self.assertIsNone(
                 listener,
                 "Listener should be None when audio init fails"
@@ -24,14 +25,32 @@ class TestHotkeyListenerErrors(unittest.TestCase):
             mock_pipeline_cls.side_effect = Exception("Pipeline init failed")
             
             # Initialize listener
-            listener = HotkeyListener.alloc().init()
+            listener = HotkeyListener.alloc().init(backend=SyntheticBackend())
             self.assertIsNone(
                 listener,
                 "Listener should be None when pipeline init fails"
             )
 
+    def test_unknown_backend(self):
+        """Test that an unknown backend name fails initialization"""
+        with patch('src.hotkeys.listener.AudioRecorder'), \
+             patch('src.hotkeys.listener.ProcessingPipeline'):
+            listener = HotkeyListener.alloc().init(backend='no-such-backend')
+            self.assertIsNone(listener)
+
+    def test_backend_start_failure(self):
+        """Test that a backend that can't start makes start() fail"""
+        with patch('src.hotkeys.listener.AudioRecorder'), \
+             patch('src.hotkeys.listener.ProcessingPipeline'):
+            backend = SyntheticBackend()
+            backend.start = MagicMock(return_value=False)
+            listener = HotkeyListener.alloc().init(backend=backend)
+            self.assertFalse(listener.start())
+
+    @unittest.skipUnless(sys.platform == 'darwin', "AppKit monitors need macOS")
     def test_monitor_setup_failure(self):
         """Test handling of monitor setup failure"""
+        from src.hotkeys.backends.appkit import AppKitBackend
         # Create a listener with mocked components
         with patch('src.hotkeys.listener.AudioRecorder') as mock_recorder_cls, \
              patch('src.hotkeys.listener.ProcessingPipeline') as mock_pipeline_cls:
@@ -43,7 +62,7 @@ class TestHotkeyListenerErrors(unittest.TestCase):
             mock_pipeline_cls.return_value = mock_pipeline
             
             # Initialize listener
-            listener = HotkeyListener.alloc().init()
+            listener = HotkeyListener.alloc().init(backend=AppKitBackend())
             if not listener:
                 self.skipTest("Listener initialization failed")
                 return
@@ -57,13 +76,13 @@ class TestHotkeyListenerErrors(unittest.TestCase):
                     MagicMock(return_value=None)
                 
                 # Patch NSEvent with our mock
-                with patch('src.hotkeys.listener.NSEvent', mock_event):
+                with patch('src.hotkeys.backends.appkit.NSEvent', mock_event):
                     # Try to start the listener
                     success = listener.start()
                     
                     # Verify failure handling
                     self.assertFalse(success)
-                    self.assertEqual(len(listener.monitors), 0)
+                    self.assertEqual(len(listener.backend.monitors), 0)
                 
             finally:
                 # Clean up
@@ -1,15 +1,12 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from AppKit import (
-    NSEvent, 
-    NSEventTypeKeyDown, 
-    NSEventTypeKeyUp,
-    NSCommandKeyMask,
-    NSShiftKeyMask
-)
-from src.hotkeys import HotkeyListener
+from src.hotkeys import HotkeyListener, SyntheticBackend
+from src.hotkeys.backends import KEY_DOWN, KEY_UP
+from src.hotkeys.hotkey_manager import MODIFIER_MASKS
 import time
 
+CMD_SHIFT = MODIFIER_MASKS['cmd'] | MODIFIER_MASKS['shift']
+
 class TestHotkeyListenerEvents(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures before each test method"""
@@ -17,7 +14,7 @@ class TestHotkeyListenerEvents(unittest.TestCase):
         self.mock_process = unittest.mock.Mock()
         
         # Initialize the listener with the mock
-        self.listener = HotkeyListener()
+        self.listener = HotkeyListener(backend=SyntheticBackend())
         self.listener.pipeline.process = self.mock_process  # Replace the real process method with our mock
         
     def tearDown(self):
@@ -40,9 +37,9 @@ class TestHotkeyListenerEvents(unittest.TestCase):
         """Test Command+Shift+A keydown event"""
         # Create mock event for Cmd+Shift+A down
         event = self.create_mock_event(
-            NSEventTypeKeyDown,
+            KEY_DOWN,
             0,  # 'A' key code
-            NSCommandKeyMask | NSShiftKeyMask
+            CMD_SHIFT
         )
         
         # Verify not recording initially
@@ -58,9 +55,9 @@ class TestHotkeyListenerEvents(unittest.TestCase):
         """Test Command+Shift+A keyup event"""
         # First simulate key down to start recording
         down_event = self.create_mock_event(
-            NSEventTypeKeyDown,
+            KEY_DOWN,
             0,  # 'A' key
-            NSCommandKeyMask | NSShiftKeyMask
+            CMD_SHIFT
         )
         
         self.listener.handle_event(down_event)
@@ -77,13 +74,16 @@ class TestHotkeyListenerEvents(unittest.TestCase):
         
         # Now simulate key up
         up_event = self.create_mock_event(
-            NSEventTypeKeyUp,
+            KEY_UP,
             0,  # 'A' key
-            NSCommandKeyMask | NSShiftKeyMask
+            CMD_SHIFT
         )
         
         self.listener.handle_event(up_event)
         
+        # Processing runs on the worker thread; wait for it to finish
+        self.assertTrue(self.listener.executor.wait_idle(timeout=5))
+        
         # Verify that process was called once
         self.mock_process.assert_called_once()
 
@@ -91,9 +91,9 @@ class TestHotkeyListenerEvents(unittest.TestCase):
         """Test Command+Shift+Q quit event"""
         # Create mock event for Cmd+Shift+Q
         event = self.create_mock_event(
-            NSEventTypeKeyDown,
+            KEY_DOWN,
             12,  # 'Q' key code
-            NSCommandKeyMask | NSShiftKeyMask
+            CMD_SHIFT
         )
         
         # Mock app.terminate_
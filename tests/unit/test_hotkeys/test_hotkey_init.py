@@ -1,6 +1,6 @@
+import sys
 import unittest
-from AppKit import NSObject, NSApplication
-from src.hotkeys import HotkeyListener
+from src.hotkeys import HotkeyListener, SyntheticBackend
 import time
 from unittest.mock import patch, MagicMock, create_autospec
 from src.audio import AudioRecorder
@@ -8,8 +8,6 @@ import pyaudio  # This will use our mock
 
 class TestHotkeyListenerInit(unittest.TestCase):
     def setUp(self):
-        self.app = NSApplication.sharedApplication()
-        
         # Create mocks
         self.mock_recorder = create_autospec(AudioRecorder)
         self.mock_recorder.stream = MagicMock()
@@ -34,40 +32,55 @@ class TestHotkeyListenerInit(unittest.TestCase):
 
     def test_basic_initialization(self):
         """Test basic initialization"""
-        listener = HotkeyListener.alloc().init()
+        listener = HotkeyListener.alloc().init(backend=SyntheticBackend())
         self.assertIsNotNone(listener)
         self.assertFalse(listener.recording_in_progress)
 
     def test_attributes_initialized(self):
         """Test that all attributes are properly initialized"""
-        listener = HotkeyListener.alloc().init()
+        backend = SyntheticBackend()
+        listener = HotkeyListener.alloc().init(backend=backend)
         
         # Check all attributes exist and have correct initial values
         self.assertFalse(listener.recording_in_progress)
-        self.assertIsNone(listener.monitor)
-        self.assertIsNone(listener.local_monitor)
-        self.assertEqual(listener.monitors, [])
-        self.assertIsNone(listener.app)
+        self.assertIs(listener.backend, backend)
+        self.assertIsNone(backend.handler)  # Not listening until start()
         self.assertIsNotNone(listener.recorder)  # Should be initialized
         self.assertIsNotNone(listener.player)    # Should be initialized
         self.assertIsNotNone(listener.pipeline)  # Should be initialized
 
+    def test_start_connects_backend(self):
+        """Test that start() routes backend events to the listener"""
+        backend = SyntheticBackend()
+        listener = HotkeyListener.alloc().init(backend=backend)
+        success = listener.start()
+        
+        self.assertTrue(success)
+        self.assertEqual(backend.handler, listener.handle_event)
+        
+        # Cleanup
+        listener.cleanup()
+        self.assertIsNone(backend.handler)
+
+    @unittest.skipUnless(sys.platform == 'darwin', "AppKit monitors need macOS")
     def test_start_monitor_setup(self):
-        """Test that monitors are properly set up"""
-        listener = HotkeyListener.alloc().init()
+        """Test that AppKit monitors are properly set up"""
+        from src.hotkeys.backends.appkit import AppKitBackend
+        listener = HotkeyListener.alloc().init(backend=AppKitBackend())
         success = listener.start()
         
         self.assertTrue(success)
-        self.assertIsNotNone(listener.monitor)
-        self.assertIsNotNone(listener.local_monitor)
-        self.assertEqual(len(listener.monitors), 2)
+        self.assertIsNotNone(listener.backend.monitor)
+        self.assertIsNotNone(listener.backend.local_monitor)
+        self.assertEqual(len(listener.backend.monitors), 2)
         
         # Cleanup
         listener.cleanup()
 
     def test_cleanup(self):
         """Test that cleanup works properly"""
-        listener = HotkeyListener.alloc().init()
+        backend = SyntheticBackend()
+        listener = HotkeyListener.alloc().init(backend=backend)
         if not listener:
             self.skipTest("Listener initialization failed")
             return
@@ -82,7 +95,7 @@ class TestHotkeyListenerInit(unittest.TestCase):
             time.sleep(0.2)
             
             # Verify cleanup
-            self.assertEqual(len(listener.monitors), 0)
+            self.assertIsNone(backend.handler)
             self.assertIsNone(listener.recorder)  # Recorder should be None after cleanup
             
             # Verify mock was called
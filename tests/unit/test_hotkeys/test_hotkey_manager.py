@@ -0,0 +1,41 @@
+import unittest
+from unittest.mock import MagicMock
+from src.hotkeys.hotkey_manager import (
+    HotkeyManager,
+    MODIFIER_MASKS,
+    parse_hotkey
+)
+
+CMD = MODIFIER_MASKS['cmd']
+SHIFT = MODIFIER_MASKS['shift']
+CAPS_LOCK = 1 << 16
+
+
+class TestHotkeyManager(unittest.TestCase):
+    def test_parse_hotkey(self):
+        self.assertEqual(parse_hotkey('cmd+shift+a'), (0, CMD | SHIFT))
+        self.assertEqual(parse_hotkey('Command + Shift + Q'), (12, CMD | SHIFT))
+        with self.assertRaises(ValueError):
+            parse_hotkey('cmd+hyper+a')
+
+    def test_dispatch_table_lookup(self):
+        """Lookup matches exact modifiers and ignores unrelated flag bits"""
+        manager = HotkeyManager()
+        press, release = MagicMock(), MagicMock()
+        manager.register_hotkey('cmd+shift+a', 'record', press, release)
+
+        self.assertEqual(manager.key_codes, frozenset({0}))
+        self.assertEqual(manager.lookup(0, CMD | SHIFT | CAPS_LOCK), ('record', press, release))
+        self.assertIsNone(manager.lookup(0, CMD))
+        self.assertIsNone(manager.lookup(1, CMD | SHIFT))
+
+    def test_unregister_rebuilds_table(self):
+        manager = HotkeyManager()
+        manager.register_hotkey('cmd+shift+q', 'quit')
+        manager.unregister_hotkey('cmd+shift+q')
+        self.assertEqual(manager.dispatch_table, {})
+        self.assertEqual(manager.key_codes, frozenset())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,20 +3,16 @@ import time
 import cProfile
 import pstats
 import io
-from AppKit import (
-    NSApplication,
-    NSEvent,
-    NSEventTypeKeyDown,
-    NSEventTypeKeyUp,
-    NSCommandKeyMask,
-    NSShiftKeyMask
-)
-from src.hotkeys import HotkeyListener
-from unittest.mock import MagicMock
+import threading
+from src.hotkeys import HotkeyListener, KeyEvent, SyntheticBackend
+from src.hotkeys.backends import KEY_DOWN
+from src.hotkeys.hotkey_manager import MODIFIER_MASKS
+from unittest.mock import MagicMock, patch
+
+CMD_SHIFT = MODIFIER_MASKS['cmd'] | MODIFIER_MASKS['shift']
 
 class TestHotkeyListenerPerformance(unittest.TestCase):
     def setUp(self):
-        self.app = NSApplication.sharedApplication()
         self.profiler = cProfile.Profile()
         self.init_times = []
         self.recording_start_times = []
@@ -32,7 +28,7 @@ class TestHotkeyListenerPerformance(unittest.TestCase):
             
             # Profile initialization
             self.profiler.enable()
-            listener = HotkeyListener.alloc().init()
+            listener = HotkeyListener.alloc().init(backend=SyntheticBackend())
             self.profiler.disable()
             
             if listener:
@@ -52,34 +48,97 @@ class TestHotkeyListenerPerformance(unittest.TestCase):
             print("\nDetailed Profile:")
             print(s.getvalue())
 
+    # Per-event budgets for handle_event, in microseconds
+    NON_MATCHING_BUDGET_US = 5.0
+    REPEAT_BUDGET_US = 20.0
+    EVENTS = 100_000
+
+    # Key-up -> pipeline.process() on the worker thread, in milliseconds
+    KEY_TO_PIPELINE_BUDGET_MS = 50.0
+
+    def time_per_event_us(self, listener, event, count):
+        """Best-of-5 average time per handle_event call"""
+        handle = listener.handle_event
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(count):
+                handle(event)
+            best = min(best, time.perf_counter() - start)
+        return best / count * 1e6
+
     def test_event_handling_performance(self):
-        """Test event handling performance"""
+        """handle_event stays within its per-event budget"""
         print("\n=== Testing Event Handling Performance ===")
         
-        listener = HotkeyListener.alloc().init()
+        with patch('src.hotkeys.listener.AudioRecorder'), \
+             patch('src.hotkeys.listener.ProcessingPipeline'):
+            listener = HotkeyListener.alloc().init(backend=SyntheticBackend())
         if not listener:
             self.skipTest("Listener initialization failed")
             return
         
         try:
-            # Create test event
-            event = MagicMock(spec=NSEvent)
-            event.type.return_value = NSEventTypeKeyDown
-            event.keyCode.return_value = 0
-            event.modifierFlags.return_value = NSCommandKeyMask | NSShiftKeyMask
+            # Ordinary typing elsewhere in the system
+            typing = KeyEvent(KEY_DOWN, 4, 0)
+            non_matching = self.time_per_event_us(listener, typing, self.EVENTS)
             
-            # Profile event handling
-            self.profiler.enable()
-            for _ in range(100):  # Test 100 events
-                listener.handle_event(event)
-            self.profiler.disable()
+            # Held Cmd+Shift+A generating auto-repeat key-downs
+            with patch.object(listener, 'take_screenshot', return_value=None):
+                listener.handle_event(KeyEvent(KEY_DOWN, 0, CMD_SHIFT))
+            repeat = KeyEvent(KEY_DOWN, 0, CMD_SHIFT)
+            repeats = self.time_per_event_us(listener, repeat, self.EVENTS)
             
-            # Print profiler statistics
-            s = io.StringIO()
-            ps = pstats.Stats(self.profiler, stream=s).sort_stats('cumulative')
-            ps.print_stats(20)
-            print(s.getvalue())
+            print(f"Non-matching event: {non_matching:.3f} µs/event "
+                  f"(budget {self.NON_MATCHING_BUDGET_US} µs)")
+            print(f"Auto-repeat event:  {repeats:.3f} µs/event "
+                  f"(budget {self.REPEAT_BUDGET_US} µs)")
+            
+            self.assertLess(non_matching, self.NON_MATCHING_BUDGET_US)
+            self.assertLess(repeats, self.REPEAT_BUDGET_US)
+            self.assertEqual(listener.recorder.start.call_count, 1)
             
         finally:
             if listener:
-                listener.cleanup()
\ No newline at end of file
+                listener.cleanup()
+
+    def test_key_to_pipeline_latency(self):
+        """A synthetic hotkey release reaches the pipeline within budget"""
+        reached = threading.Event()
+        reached_at = []
+        
+        def process(*args):
+            reached_at.append(time.perf_counter())
+            reached.set()
+            return None
+        
+        backend = SyntheticBackend()
+        with patch('src.hotkeys.listener.AudioRecorder'), \
+             patch('src.hotkeys.listener.ProcessingPipeline'):
+            listener = HotkeyListener.alloc().init(backend=backend)
+        if not listener:
+            self.skipTest("Listener initialization failed")
+            return
+        
+        try:
+            listener.recorder.stop.return_value = b'\x00' * 1024
+            listener.pipeline.process.side_effect = process
+            listener.start()
+            
+            latencies = []
+            with patch.object(listener, 'take_screenshot', return_value=None):
+                for _ in range(20):
+                    reached.clear()
+                    _, up = backend.press('cmd+shift+a')
+                    self.assertTrue(reached.wait(timeout=2))
+                    latencies.append((reached_at[-1] - up.timestamp) * 1000)
+                    self.assertTrue(listener.executor.wait_idle(timeout=2))
+            
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2]
+            print(f"\nKey-up -> pipeline: p50 {p50:.3f} ms, max {latencies[-1]:.3f} ms "
+                  f"(budget {self.KEY_TO_PIPELINE_BUDGET_MS} ms)")
+            self.assertLess(p50, self.KEY_TO_PIPELINE_BUDGET_MS)
+            
+        finally:
+            listener.cleanup()
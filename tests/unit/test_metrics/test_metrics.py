@@ -0,0 +1,174 @@
+import sys
+import threading
+import time
+import unittest
+import urllib.request
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src import metrics
+from src.metrics import Counter, Histogram, MetricsServer, Registry
+from src.processing import ProcessingPipeline
+from src.tracing import RequestTrace
+
+
+class TestRendering(unittest.TestCase):
+    def test_counter(self):
+        registry = Registry()
+        counter = registry.register(Counter('things', "Things seen", ('kind',)))
+        counter.inc('a')
+        counter.inc('a', amount=2)
+        counter.inc('b"x')
+
+        text = registry.render()
+        self.assertIn('# TYPE assistant_things counter', text)
+        self.assertIn('assistant_things_total{kind="a"} 3', text)
+        self.assertIn('assistant_things_total{kind="b\\"x"} 1', text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        histogram = registry.register(Histogram('wait', "Waits", ('stage',),
+                                                buckets=(0.1, 1.0)))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, 'asr')
+
+        text = registry.render()
+        self.assertIn('assistant_wait_bucket{stage="asr",le="0.1"} 2', text)
+        self.assertIn('assistant_wait_bucket{stage="asr",le="1"} 3', text)
+        self.assertIn('assistant_wait_bucket{stage="asr",le="+Inf"} 4', text)
+        self.assertIn('assistant_wait_count{stage="asr"} 4', text)
+        self.assertIn('assistant_wait_sum{stage="asr"} 3.65', text)
+
+    def test_concurrent_updates_are_not_lost(self):
+        counter = Counter('bytes', "Bytes", ('api',))
+        histogram = Histogram('wait', "Waits")
+
+        def work():
+            for _ in range(10000):
+                counter.inc('anthropic', amount=3)
+                histogram.observe(0.5)
+        interval = sys.getswitchinterval()
+        # Switch threads often enough that an unguarded read-add-store races
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=work) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(counter.value('anthropic'), 4 * 10000 * 3)
+        self.assertEqual(histogram.count(), 4 * 10000)
+
+    def test_wrong_labels(self):
+        with self.assertRaises(ValueError):
+            Counter('x', "x", ('a',)).inc()
+
+    def test_failing_collector_is_skipped(self):
+        registry = Registry()
+        registry.add_collector(lambda: 1 / 0)
+        self.assertEqual(registry.render(), '\n')
+
+
+class TestHooks(unittest.TestCase):
+    def setUp(self):
+        metrics.REGISTRY.reset()
+
+    def tearDown(self):
+        metrics.REGISTRY.reset()
+
+    def test_audio_status_flags(self):
+        metrics.record_audio_status(0x2)
+        metrics.record_audio_status(0x4 | 0x8)
+        # sounddevice CallbackFlags-like object
+        metrics.record_audio_status(SimpleNamespace(output_underflow=True))
+        self.assertEqual(metrics.AUDIO_XRUNS.value('input', 'overflow'), 1)
+        self.assertEqual(metrics.AUDIO_XRUNS.value('output', 'underflow'), 2)
+        self.assertEqual(metrics.AUDIO_XRUNS.value('output', 'overflow'), 1)
+
+    def test_observe_trace(self):
+        trace = RequestTrace()
+        started = time.perf_counter()
+        trace.mark('key_up', at=started)
+        trace.add_span('transcribe', started, started + 0.2)
+        trace.mark('first_audio_out', at=started + 0.8)
+        trace.set(outcome='ok')
+        metrics.observe_trace(trace)
+
+        self.assertEqual(metrics.STAGE_SECONDS.count('transcribe'), 1)
+        self.assertEqual(metrics.LATENCY_SECONDS.count('first_audio_out'), 1)
+        self.assertEqual(metrics.REQUESTS.value('ok'), 1)
+        text = metrics.REGISTRY.render()
+        self.assertIn('assistant_latency_seconds_bucket{event="first_audio_out",le="0.5"} 0', text)
+        self.assertIn('assistant_latency_seconds_bucket{event="first_audio_out",le="1"} 1', text)
+
+    def test_stats_collector(self):
+        stats = {
+            "depth": 1,
+            "rejected": 2,
+            "stages": {"asr": {"waiting": 1, "in_use": 1, "shed": 3, "wait_p50": 0.25,
+                               "wait_p95": 1.5}},
+            "memory": {"rss_mb": 100.0, "components_mb": {"asr": 50.0}, "model_size": "base",
+                       "asr_loaded": True, "evictions": 0},
+        }
+        metrics.REGISTRY.add_collector(metrics.stats_collector(lambda: stats))
+        text = metrics.REGISTRY.render()
+        self.assertIn('assistant_queue_depth{queue="jobs"} 1', text)
+        self.assertIn('assistant_queue_depth{queue="asr"} 1', text)
+        self.assertIn('assistant_stage_shed_total{stage="asr"} 3', text)
+        self.assertIn('assistant_stage_wait_seconds{stage="asr",quantile="0.95"} 1.5', text)
+        self.assertIn('assistant_jobs_rejected_total 2', text)
+        self.assertIn(f'assistant_resident_memory_bytes {100 * 2**20}', text)
+        self.assertIn('assistant_model_loaded{model="base"} 1', text)
+
+    def test_pipeline_api_usage(self):
+        pipeline = ProcessingPipeline(background=True)
+        stream = MagicMock()
+        stream.text_stream = ["Hello", " there"]
+        stream.get_final_message.return_value.usage = SimpleNamespace(
+            input_tokens=12, output_tokens=3)
+        pipeline.anthropic_client = MagicMock()
+        pipeline.anthropic_client.messages.stream.return_value.__enter__.return_value = stream
+
+        self.assertEqual(pipeline.get_ai_response("hi", None), "Hello there")
+        self.assertEqual(metrics.API_TOKENS.value('anthropic', 'input'), 12)
+        self.assertEqual(metrics.API_TOKENS.value('anthropic', 'output'), 3)
+        self.assertEqual(metrics.API_BYTES.value('anthropic', 'received'), 11)
+        self.assertGreater(metrics.API_BYTES.value('anthropic', 'sent'), 0)
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        metrics.REGISTRY.reset()
+        self.server = metrics.serve(0, lambda: {"depth": 0})
+
+    def tearDown(self):
+        self.server.stop()
+        metrics.REGISTRY.reset()
+
+    def get(self, path):
+        return urllib.request.urlopen(f"http://127.0.0.1:{self.server.port}{path}", timeout=2)
+
+    def test_scrape(self):
+        metrics.cache_lookup('busy_response', True)
+        with self.get('/metrics') as response:
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+            body = response.read().decode()
+        self.assertIn('assistant_cache_lookups_total{cache="busy_response",result="hit"} 1', body)
+        self.assertIn('assistant_queue_depth{queue="jobs"} 0', body)
+
+    def test_unknown_path(self):
+        with self.assertRaises(urllib.error.HTTPError):
+            self.get('/nope')
+
+    def test_stop_frees_port(self):
+        port = self.server.port
+        self.server.stop()
+        self.server = MetricsServer(port).start()
+        with self.get('/metrics') as response:
+            self.assertEqual(response.status, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.processing import CancelToken, CancelledError, JobExecutor
+from src.processing.admission import (
+    AdmissionController,
+    Overloaded,
+    StageLimiter,
+    job_workers,
+)
+from tests.helpers import make_pipeline, wait_for
+
+
+def hold(limiter, release, results, name, token=None):
+    """Acquire a slot in a thread, keep it until `release` is set"""
+    def run():
+        try:
+            limiter.acquire(token)
+        except (Overloaded, CancelledError) as e:
+            results.append((name, type(e).__name__))
+            return
+        results.append((name, 'admitted'))
+        release.wait(2)
+        limiter.release()
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestStageLimiter(unittest.TestCase):
+    def test_limits_concurrency(self):
+        limiter = StageLimiter('asr', limit=1, max_waiting=2)
+        release = threading.Event()
+        results = []
+        hold(limiter, release, results, 'first')
+        self.assertTrue(wait_for(lambda: limiter.in_use == 1))
+        hold(limiter, release, results, 'second')
+        self.assertTrue(wait_for(lambda: limiter.waiting == 1))
+        self.assertEqual(results, [('first', 'admitted')])
+        release.set()
+        self.assertTrue(wait_for(lambda: len(results) == 2))
+        self.assertEqual(results[1], ('second', 'admitted'))
+
+    def test_newest_waiter_goes_first_and_oldest_is_shed(self):
+        limiter = StageLimiter('llm', limit=1, max_waiting=2)
+        gates = {name: threading.Event() for name in 'abcd'}
+        results = []
+        hold(limiter, gates['a'], results, 'a')
+        self.assertTrue(wait_for(lambda: limiter.in_use == 1))
+        hold(limiter, gates['b'], results, 'b')
+        self.assertTrue(wait_for(lambda: limiter.waiting == 1))
+        hold(limiter, gates['c'], results, 'c')
+        self.assertTrue(wait_for(lambda: limiter.waiting == 2))
+        # 'd' arrives with two waiting, so the oldest ('b') is shed
+        hold(limiter, gates['d'], results, 'd')
+        self.assertTrue(wait_for(lambda: ('b', 'Overloaded') in results))
+        gates['a'].set()
+        self.assertTrue(wait_for(lambda: len(results) == 3))
+        self.assertEqual(results[-1], ('d', 'admitted'))
+        gates['d'].set()
+        self.assertTrue(wait_for(lambda: len(results) == 4))
+        self.assertEqual(results[-1], ('c', 'admitted'))
+        gates['c'].set()
+        self.assertEqual(limiter.stats()['shed'], 1)
+        self.assertEqual(limiter.stats()['admitted'], 3)
+
+    def test_no_queue_sheds_immediately(self):
+        limiter = StageLimiter('tts', limit=1, max_waiting=0)
+        limiter.acquire()
+        with self.assertRaises(Overloaded):
+            limiter.acquire()
+        limiter.release()
+        limiter.acquire()
+
+    def test_cancel_while_waiting(self):
+        limiter = StageLimiter('asr', limit=1)
+        limiter.acquire()
+        token = CancelToken()
+        threading.Timer(0.02, token.cancel).start()
+        with self.assertRaises(CancelledError):
+            limiter.acquire(token)
+        self.assertEqual(limiter.waiting, 0)
+        limiter.release()
+        self.assertEqual(limiter.in_use, 0)
+
+    def test_wait_time_recorded(self):
+        limiter = StageLimiter('asr', limit=1)
+        limiter.acquire()
+        threading.Timer(0.05, limiter.release).start()
+        limiter.acquire()
+        stats = limiter.stats()
+        self.assertGreater(stats['wait_max'], 0.04)
+        self.assertEqual(stats['wait_p50'], stats['wait_max'])
+
+
+class TestPipelineAdmission(unittest.TestCase):
+    def make_pipeline(self, limits, max_waiting=0):
+        pipeline = make_pipeline()
+        pipeline.admission = AdmissionController(limits, max_waiting)
+        pipeline.save_recording = MagicMock(return_value='x.wav')
+        pipeline.transcribe_audio = MagicMock(return_value='hello')
+        pipeline.get_ai_response = MagicMock(return_value='hi there')
+        pipeline.text_to_speech = MagicMock(return_value='responses/reply.mp3')
+        return pipeline
+
+    def test_stages_run_under_limits(self):
+        pipeline = self.make_pipeline({'asr': 1})
+        self.assertEqual(pipeline.process(b'\0' * 16), 'responses/reply.mp3')
+        stats = pipeline.admission.stats()
+        self.assertEqual({stage: s['admitted'] for stage, s in stats.items()},
+                         {'asr': 1, 'llm': 1, 'tts': 1})
+        self.assertTrue(all(s['in_use'] == 0 for s in stats.values()))
+
+    def test_shed_request_gets_busy_response(self):
+        pipeline = self.make_pipeline({'llm': 1})
+        pipeline.admission.stages['llm'].acquire()
+        with patch.object(pipeline, 'busy_response', return_value='responses/busy.mp3'):
+            self.assertEqual(pipeline.process(b'\0' * 16), 'responses/busy.mp3')
+        pipeline.text_to_speech.assert_not_called()
+        self.assertEqual(pipeline.admission.shed, 1)
+
+    def test_executor_leaves_shedding_to_the_stages(self):
+        pipeline = self.make_pipeline({'asr': 1}, max_waiting=1)
+        asr = pipeline.admission.stages['asr']
+        transcribing = threading.Event()
+        pipeline.transcribe_audio.side_effect = lambda *args: transcribing.wait(2) and 'hello'
+        self.assertEqual(job_workers(pipeline), 1 + 4 + 4 + 1)
+        executor = JobExecutor(max_pending=4, workers=job_workers(pipeline))
+        self.addCleanup(executor.shutdown)
+        results = []
+        with patch.object(pipeline, 'busy_response', return_value='responses/busy.mp3'):
+            # Three requests for one ASR slot and one place in its queue
+            for admitted in (lambda: asr.in_use == 1, lambda: asr.waiting == 1,
+                             lambda: asr.shed == 1):
+                self.assertTrue(executor.submit(
+                    lambda: results.append(pipeline.process(b'\0' * 16))))
+                self.assertTrue(wait_for(admitted))
+            transcribing.set()
+            self.assertTrue(executor.wait_idle(2))
+        self.assertEqual(sorted(results), ['responses/busy.mp3', 'responses/reply.mp3',
+                                           'responses/reply.mp3'])
+        self.assertEqual(executor.rejected, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
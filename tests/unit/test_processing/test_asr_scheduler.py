@@ -0,0 +1,122 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from src.processing import CancelToken, CancelledError
+from src.processing.asr_scheduler import (
+    WHISPER_RATE,
+    AsrScheduler,
+    DeadlineExceeded,
+    sweep_batch_windows,
+)
+
+
+class FakeWhisper:
+    """Transcribes in `cost` seconds and records concurrency"""
+
+    def __init__(self, cost=0.05):
+        self.cost = cost
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.order = []
+
+    def __call__(self, audio, cancel_token):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.order.append(len(audio))
+        time.sleep(self.cost)
+        with self.lock:
+            self.active -= 1
+        return f"{len(audio)} samples"
+
+
+def clip(seconds=1.0, marker=0):
+    return np.zeros(int(seconds * WHISPER_RATE) + marker, dtype=np.float32)
+
+
+class TestAsrScheduler(unittest.TestCase):
+    def setUp(self):
+        self.whisper = FakeWhisper()
+
+    def make(self, **kwargs):
+        scheduler = AsrScheduler(self.whisper, **kwargs)
+        self.addCleanup(scheduler.shutdown)
+        return scheduler
+
+    def test_concurrent_utterances_share_workers(self):
+        """Two workers run two utterances at once, so four take ~2 costs"""
+        scheduler = self.make(workers=2, batch_window=0.01)
+        started = time.perf_counter()
+        futures = [scheduler.submit(clip()) for _ in range(4)]
+        results = [future.result(timeout=2) for future in futures]
+        elapsed = time.perf_counter() - started
+        self.assertEqual(results, [f"{WHISPER_RATE} samples"] * 4)
+        self.assertEqual(self.whisper.max_active, 2)
+        self.assertLess(elapsed, 3.5 * self.whisper.cost)
+
+    def test_window_gathers_a_batch(self):
+        scheduler = self.make(workers=4, batch_window=0.05)
+        futures = [scheduler.submit(clip()) for _ in range(3)]
+        for future in futures:
+            future.result(timeout=2)
+        self.assertEqual(scheduler.stats()["mean_batch"], 3)
+
+    def test_earliest_deadline_first(self):
+        scheduler = self.make(workers=1, batch_window=0.05, max_batch=3)
+        futures = [
+            scheduler.submit(clip(marker=1)),
+            scheduler.submit(clip(marker=2), deadline=5.0),
+            scheduler.submit(clip(marker=3), deadline=1.0),
+        ]
+        for future in futures:
+            future.result(timeout=2)
+        self.assertEqual([n - WHISPER_RATE for n in self.whisper.order], [3, 2, 1])
+
+    def test_expired_deadline_is_dropped(self):
+        """An utterance that can't start in time fails instead of queueing"""
+        scheduler = self.make(workers=1, batch_window=0.0)
+        first = scheduler.submit(clip())
+        time.sleep(self.whisper.cost / 5)
+        late = scheduler.submit(clip(), deadline=self.whisper.cost / 5)
+        self.assertEqual(first.result(timeout=2), f"{WHISPER_RATE} samples")
+        with self.assertRaises(DeadlineExceeded):
+            late.result(timeout=2)
+        self.assertEqual(scheduler.stats()["deadline_misses"], 1)
+
+    def test_cancelled_before_start(self):
+        scheduler = self.make(workers=1, batch_window=0.0)
+        token = CancelToken()
+        token.cancel()
+        with self.assertRaises(CancelledError):
+            scheduler.transcribe(clip(), cancel_token=token)
+
+    def test_rtf_and_throughput(self):
+        scheduler = self.make(workers=2, batch_window=0.0)
+        for future in [scheduler.submit(clip(seconds=2.0)) for _ in range(4)]:
+            future.result(timeout=2)
+        stats = scheduler.stats()
+        self.assertEqual(stats["completed"], 4)
+        self.assertAlmostEqual(stats["rtf"], self.whisper.cost / 2.0, delta=0.02)
+        self.assertLess(stats["effective_rtf"], stats["rtf"] * 4)
+        self.assertGreater(stats["utterances_per_s"], 0)
+
+    def test_shutdown_fails_queued(self):
+        scheduler = AsrScheduler(self.whisper, workers=1, batch_window=1.0)
+        future = scheduler.submit(clip())
+        scheduler.shutdown()
+        with self.assertRaises(CancelledError):
+            future.result(timeout=2)
+
+    def test_sweep(self):
+        results = sweep_batch_windows(self.whisper, [clip()] * 4, windows=(0.0, 0.01),
+                                      workers=2, concurrency=2)
+        self.assertEqual([r["batch_window"] for r in results], [0.0, 0.01])
+        self.assertTrue(all(r["completed"] == 4 for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+from src.processing import CancelToken, CancelledError
+from tests.helpers import make_pipeline
+
+
+class TestCancelToken(unittest.TestCase):
+    def test_cancel_runs_callbacks_once(self):
+        """Callbacks run on the first cancel only"""
+        token = CancelToken()
+        callback = MagicMock()
+        token.on_cancel(callback)
+        token.cancel()
+        token.cancel()
+        callback.assert_called_once()
+        self.assertTrue(token.cancelled)
+        self.assertIsNotNone(token.cancelled_at)
+        with self.assertRaises(CancelledError):
+            token.raise_if_cancelled()
+
+    def test_removed_callback_not_called(self):
+        token = CancelToken()
+        callback = MagicMock()
+        remove = token.on_cancel(callback)
+        remove()
+        token.cancel()
+        callback.assert_not_called()
+
+    def test_late_registration_runs_immediately(self):
+        token = CancelToken()
+        token.cancel()
+        callback = MagicMock()
+        token.on_cancel(callback)
+        callback.assert_called_once()
+
+    def test_wait_wakes_on_cancel(self):
+        token = CancelToken()
+        threading.Timer(0.01, token.cancel).start()
+        self.assertTrue(token.wait(timeout=1))
+
+
+class TestPipelineCancellation(unittest.TestCase):
+    def test_transcribe_stops_between_segments(self):
+        """Transcription stops consuming segments once cancelled"""
+        pipeline = make_pipeline()
+        token = CancelToken()
+        consumed = []
+
+        def segments():
+            for text in ["one", "two", "three"]:
+                consumed.append(text)
+                if text == "one":
+                    token.cancel()
+                yield MagicMock(text=text)
+
+        pipeline.model.transcribe.return_value = (segments(), MagicMock())
+        with self.assertRaises(CancelledError):
+            pipeline.transcribe_audio("audio.wav", token)
+        self.assertEqual(consumed, ["one"])
+
+    def test_llm_stream_closed_on_cancel(self):
+        """Cancelling mid-response closes the Claude stream"""
+        pipeline = make_pipeline()
+        token = CancelToken()
+        stream = MagicMock()
+
+        def text_stream():
+            yield "Hello"
+            token.cancel()
+            raise RuntimeError("connection closed")
+
+        stream.text_stream = text_stream()
+        pipeline.anthropic_client.messages.stream.return_value.__enter__.return_value = stream
+
+        with self.assertRaises(CancelledError):
+            pipeline.get_ai_response("question", None, token)
+        stream.close.assert_called_once()
+
+    def test_process_propagates_cancel(self):
+        """process() surfaces a cancel instead of swallowing it as an error"""
+        pipeline = make_pipeline()
+        token = CancelToken()
+        token.cancel()
+        with patch.object(pipeline, 'save_recording', return_value="audio.wav"):
+            with self.assertRaises(CancelledError):
+                pipeline.process(b'\x00' * 16, None, token)
+        pipeline.model.transcribe.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
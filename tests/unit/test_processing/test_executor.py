@@ -0,0 +1,113 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import soundfile as sf
+
+from src.processing import CancelToken, CancelledError, JobExecutor, ProcessingPipeline
+
+
+class TestJobExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = JobExecutor(max_pending=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_runs_jobs_off_caller_thread(self):
+        """Jobs run on the worker, in order"""
+        ran = []
+        caller = threading.get_ident()
+        for i in range(2):
+            self.assertTrue(self.executor.submit(lambda i=i: ran.append((i, threading.get_ident()))))
+        self.assertTrue(self.executor.wait_idle(timeout=2))
+        self.assertEqual([i for i, _ in ran], [0, 1])
+        self.assertTrue(all(ident != caller for _, ident in ran))
+        self.assertEqual(self.executor.completed, 2)
+
+    def test_submit_returns_quickly_and_rejects_when_full(self):
+        """A full queue rejects instead of blocking the caller"""
+        release = threading.Event()
+        self.executor.submit(release.wait)
+        time.sleep(0.05)  # Let the worker pick up the blocking job
+
+        started = time.perf_counter()
+        results = [self.executor.submit(lambda: None) for _ in range(3)]
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(results, [True, True, False])
+        self.assertLess(elapsed, 0.01)
+        self.assertEqual(self.executor.depth, 2)
+        self.assertEqual(self.executor.stats()["rejected"], 1)
+        release.set()
+        self.assertTrue(self.executor.wait_idle(timeout=2))
+        self.assertEqual(self.executor.max_depth, 2)
+
+    def test_cancelled_jobs_are_skipped(self):
+        """A job cancelled while queued never runs"""
+        release = threading.Event()
+        ran = []
+        token = CancelToken()
+        self.executor.submit(release.wait)
+        self.executor.submit(ran.append, 1, cancel_token=token)
+        token.cancel()
+        release.set()
+        self.assertTrue(self.executor.wait_idle(timeout=2))
+        self.assertEqual(ran, [])
+
+    def test_job_errors_do_not_stop_worker(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        def cancelled():
+            raise CancelledError()
+
+        ran = []
+        self.executor.submit(fail)
+        self.executor.submit(cancelled)
+        self.assertTrue(self.executor.wait_idle(timeout=2))
+        self.executor.submit(ran.append, 1)
+        self.assertTrue(self.executor.wait_idle(timeout=2))
+        self.assertEqual(ran, [1])
+        self.assertEqual(self.executor.failed, 1)
+
+    def test_multiple_workers_overlap_jobs(self):
+        executor = JobExecutor(max_pending=4, workers=2)
+        self.addCleanup(executor.shutdown)
+        barrier = threading.Barrier(2, timeout=2)
+        # Both jobs must be running at once to pass the barrier
+        executor.submit(barrier.wait)
+        executor.submit(barrier.wait)
+        self.assertTrue(executor.wait_idle(timeout=3))
+        self.assertEqual(executor.completed, 2)
+        executor.shutdown()
+        self.assertFalse(any(thread.is_alive() for thread in executor._threads))
+
+    def test_concurrent_jobs_write_separate_files(self):
+        # Workers save recordings in the same second; none may overwrite another
+        pipeline = ProcessingPipeline(background=True)
+        self.addCleanup(pipeline.cleanup)
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                executor = JobExecutor(max_pending=8, workers=4)
+                self.addCleanup(executor.shutdown)
+                paths = []
+                for i in range(8):
+                    audio = np.full(64, i / 10, dtype=np.float32).tobytes()
+                    executor.submit(lambda i=i, audio=audio: paths.append(
+                        (i, pipeline.save_recording(audio))))
+                self.assertTrue(executor.wait_idle(timeout=5))
+                self.assertEqual(len({path for _, path in paths}), 8)
+                for i, path in paths:
+                    self.assertAlmostEqual(sf.read(path, dtype='float32')[0][0], i / 10, places=3)
+            finally:
+                os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src import tracing
+from src.processing.intents import (
+    ExampleClassifier,
+    IntentMatcher,
+    IntentState,
+    normalize,
+    spoken_time,
+)
+from tests.helpers import make_pipeline
+
+
+class TestIntentMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = IntentMatcher()
+
+    def test_commands(self):
+        cases = {
+            "Stop.": 'stop',
+            "Okay, cancel that!": 'stop',
+            "Never mind": 'stop',
+            "Can you repeat that, please?": 'repeat',
+            "What did you say?": 'repeat',
+            "Say that again": 'repeat',
+            "Louder": 'louder',
+            "Turn the volume down": 'quieter',
+            "What time is it?": 'time',
+            "What's the time?": 'time',
+        }
+        for text, intent in cases.items():
+            self.assertEqual(self.matcher.match(text), intent, text)
+
+    def test_questions_go_to_the_llm(self):
+        for text in ("Stop the build from failing", "Why does this test repeat itself?",
+                     "What time complexity does this loop have?", "", None):
+            self.assertIsNone(self.matcher.match(text), text)
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Hey, could you STOP?"), "stop")
+
+    def test_classifier_fallback(self):
+        classifier = ExampleClassifier()
+        self.assertEqual(classifier.classify("I didn't catch that")[0], None)
+        self.assertEqual(classifier.classify("i did not catch that")[0], 'repeat')
+        self.assertEqual(classifier.classify("way too loud")[0], 'quieter')
+        self.assertIsNone(classifier.classify("what does this stack trace say about the "
+                                              "time zone handling")[0])
+
+        matcher = IntentMatcher(classifier=classifier)
+        self.assertEqual(matcher.match("too loud"), 'quieter')
+        self.assertIsNone(IntentMatcher().match("too loud"))
+
+    def test_from_env(self):
+        with patch.dict(os.environ, {'LOCAL_INTENTS': 'off'}):
+            self.assertIsNone(IntentMatcher.from_env())
+        with patch.dict(os.environ, {'LOCAL_INTENTS': 'classifier'}):
+            self.assertIsNotNone(IntentMatcher.from_env().classifier)
+        with patch.dict(os.environ, {'LOCAL_INTENTS': 'maybe'}):
+            with self.assertRaises(ValueError):
+                IntentMatcher.from_env()
+
+    def test_spoken_time(self):
+        self.assertEqual(spoken_time(time.struct_time((2024, 1, 1, 15, 5, 0, 0, 1, -1))),
+                         "It's 3 05 PM.")
+        self.assertEqual(spoken_time(time.struct_time((2024, 1, 1, 0, 0, 0, 0, 1, -1))),
+                         "It's 12 o'clock AM.")
+
+
+class TestPipelineIntents(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = make_pipeline()
+        self.pipeline.save_recording = MagicMock(return_value='recording.wav')
+        self.pipeline.get_ai_response = MagicMock(return_value="An answer")
+        self.pipeline.text_to_speech = MagicMock()
+
+    def tearDown(self):
+        self.pipeline.cleanup()
+
+    def process(self, transcript):
+        self.pipeline.transcribe_audio = MagicMock(return_value=transcript)
+        trace = tracing.RequestTrace()
+        with tracing.activate(trace):
+            result = self.pipeline.process(b'\0' * 64)
+        return result, trace
+
+    def test_repeat_replays_last_response_without_network(self):
+        with tempfile.NamedTemporaryFile(suffix='.mp3') as response:
+            self.pipeline.text_to_speech.return_value = response.name
+            self.assertEqual(self.process("Explain this error")[0], response.name)
+            self.pipeline.get_ai_response.assert_called_once()
+
+            result, trace = self.process("Repeat that.")
+            self.assertEqual(result, response.name)
+            self.assertEqual(trace.attrs["intent"], 'repeat')
+        self.pipeline.get_ai_response.assert_called_once()
+        self.pipeline.text_to_speech.assert_called_once()
+
+    def test_stop_plays_nothing(self):
+        self.assertIsNone(self.process("stop")[0])
+        self.pipeline.get_ai_response.assert_not_called()
+
+    @patch('src.processing.pipeline.speak_locally', return_value='local.aiff')
+    def test_volume_and_time_speak_locally(self, speak):
+        self.assertEqual(self.process("louder")[0], 'local.aiff')
+        self.assertEqual(self.pipeline.volume, 1.25)
+        speak.assert_called_with("Volume 125 percent.")
+        for _ in range(10):
+            self.process("quieter")
+        self.assertEqual(self.pipeline.volume, 0.25)
+
+        self.process("what time is it")
+        self.assertTrue(speak.call_args[0][0].startswith("It's "))
+        self.pipeline.get_ai_response.assert_not_called()
+        self.pipeline.text_to_speech.assert_not_called()
+
+    def test_state_per_caller(self):
+        # As the daemon keeps one per client: no shared volume or replays
+        mine, theirs = IntentState(), IntentState()
+        self.pipeline.transcribe_audio = MagicMock(return_value="Explain this error")
+        self.pipeline.text_to_speech.return_value = __file__
+        self.pipeline.process(b'\0' * 64, state=theirs)
+        self.assertEqual(theirs.last_response, __file__)
+        with patch('src.processing.pipeline.speak_locally', return_value='local.aiff'):
+            self.pipeline.transcribe_audio.return_value = "repeat that"
+            self.assertEqual(self.pipeline.process(b'\0' * 64, state=mine), 'local.aiff')
+            self.pipeline.transcribe_audio.return_value = "louder"
+            self.pipeline.process(b'\0' * 64, state=mine)
+        self.assertEqual((mine.volume, theirs.volume, self.pipeline.volume), (1.25, 1.0, 1.0))
+
+    def test_disabled(self):
+        self.pipeline.intents = None
+        self.process("stop")
+        self.pipeline.get_ai_response.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
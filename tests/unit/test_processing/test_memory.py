@@ -0,0 +1,123 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.processing import ProcessingPipeline
+from src.processing.memory import ComponentMemory, MemoryManager, rss_bytes, smaller_model
+from tests import helpers
+
+
+class FakeLoadPipeline(ProcessingPipeline):
+    """Pipeline whose Whisper "load" takes `load_time` and allocates nothing"""
+
+    load_time = 0.0
+
+    def _load_asr(self, show_progress=False):
+        time.sleep(self.load_time)
+        self.model = MagicMock(name=f"whisper-{self.model_size}")
+        self.loads = getattr(self, 'loads', []) + [self.model_size]
+
+
+def make_pipeline():
+    pipeline = helpers.make_pipeline(FakeLoadPipeline)
+    # Loaded through the fake, which records each load
+    pipeline.model = None
+    pipeline.load_models()
+    return pipeline
+
+
+class TestMemoryHelpers(unittest.TestCase):
+    def test_rss(self):
+        self.assertGreater(rss_bytes(), 1 << 20)
+
+    def test_smaller_model(self):
+        self.assertEqual(smaller_model('base'), 'tiny')
+        self.assertEqual(smaller_model('medium'), 'small')
+        self.assertIsNone(smaller_model('tiny'))
+        self.assertIsNone(smaller_model('custom'))
+
+    def test_component_memory(self):
+        tracker = ComponentMemory()
+        with tracker.measure('buffer'):
+            buffer = bytearray(32 << 20)
+            buffer[::4096] = b'\1' * len(buffer[::4096])
+        self.assertGreater(tracker.stats()['buffer'], 16)
+        tracker.forget('buffer')
+        self.assertEqual(tracker.stats(), {})
+
+
+class TestIdleEviction(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = make_pipeline()
+        self.manager = MemoryManager(self.pipeline, idle_timeout=0.05)
+
+    def test_unloads_after_idle_timeout(self):
+        self.assertIsNone(self.manager.check())
+        self.pipeline.last_used -= 1.0
+        self.assertEqual(self.manager.check(), 'evict')
+        self.assertIsNone(self.pipeline.model)
+        self.assertFalse(self.pipeline.ready)
+        self.assertEqual(self.manager.stats()['evictions'], 1)
+
+    def test_not_while_request_in_flight(self):
+        self.pipeline.last_used -= 1.0
+        self.pipeline._in_flight = 1
+        self.assertIsNone(self.manager.check())
+        self.assertIsNotNone(self.pipeline.model)
+
+    def test_in_flight_block(self):
+        with self.pipeline.in_flight():
+            self.pipeline.last_used -= 1.0
+            self.assertIsNone(self.manager.check())
+        # Leaving the block counts as use
+        self.assertIsNone(self.manager.check())
+        self.assertIsNotNone(self.pipeline.model)
+
+    def test_prefetch_reloads_in_background(self):
+        """Key-down starts the reload without waiting for it"""
+        self.pipeline.unload_asr()
+        self.pipeline.load_time = 0.1
+        started = time.perf_counter()
+        self.pipeline.prefetch()
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertTrue(self.pipeline.wait_until_ready())
+        self.assertEqual(self.pipeline.loads, ['base', 'base'])
+
+    def test_process_reloads_evicted_model(self):
+        self.pipeline.unload_asr()
+        self.pipeline.save_recording = MagicMock(return_value='x.wav')
+        self.pipeline.transcribe_audio = MagicMock(return_value='')
+        self.pipeline.process(b'\0' * 16)
+        self.assertIsNotNone(self.pipeline.model)
+        self.pipeline.transcribe_audio.assert_called_once()
+
+    def test_disabled_by_default(self):
+        manager = MemoryManager(self.pipeline)
+        self.assertFalse(manager.enabled)
+        manager.start()
+        self.assertIsNone(manager._thread)
+
+
+class TestMemoryCeiling(unittest.TestCase):
+    def test_downgrades_when_over_ceiling(self):
+        pipeline = make_pipeline()
+        manager = MemoryManager(pipeline, ceiling_mb=100)
+        with patch('src.processing.memory.rss_bytes', return_value=200 << 20):
+            self.assertEqual(manager.check(), 'downgrade')
+        self.assertEqual(pipeline.model_size, 'tiny')
+        self.assertTrue(pipeline.wait_until_ready())
+        self.assertEqual(pipeline.loads, ['base', 'tiny'])
+        # Already the smallest: nothing left to do
+        with patch('src.processing.memory.rss_bytes', return_value=200 << 20):
+            self.assertIsNone(manager.check())
+
+    def test_under_ceiling_keeps_model(self):
+        pipeline = make_pipeline()
+        manager = MemoryManager(pipeline, ceiling_mb=100)
+        with patch('src.processing.memory.rss_bytes', return_value=50 << 20):
+            self.assertIsNone(manager.check())
+        self.assertEqual(pipeline.model_size, 'base')
+
+
+if __name__ == '__main__':
+    unittest.main()
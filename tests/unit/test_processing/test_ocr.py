@@ -0,0 +1,170 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+from src import tracing
+from src.processing import ProcessingPipeline
+from src.processing.ocr import CURSOR_KEY, ScreenOcr, text_tokens
+from tests.helpers import mock_claude
+
+LINES = ("def settings_for(level):", "    settings = dict(DEFAULT_SETTINGS)",
+         "    for _, overrides in LADDER[1:level + 1]:", "        settings.update(overrides)",
+         "    return settings")
+
+
+def fake_engine(confidence=95.0, lines=LINES):
+    """Stands in for Tesseract: reads `lines`, remembering the image it was given"""
+    def engine(image):
+        engine.images.append(image)
+        return [((1, 1, row), word, confidence)
+                for row, line in enumerate(lines) for word in line.split()]
+    engine.images = []
+    return engine
+
+
+def screenshot(path, size=(2000, 1200), cursor=None):
+    info = PngInfo()
+    if cursor:
+        info.add_text(CURSOR_KEY, f"{cursor[0]},{cursor[1]}")
+    Image.new('RGB', size, 'white').save(path, pnginfo=info)
+    return path
+
+
+class TestScreenOcr(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = screenshot(os.path.join(self.directory.name, 'screen.png'),
+                               cursor=(1900, 100))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reads_the_region_around_the_cursor(self):
+        engine = fake_engine()
+        result = ScreenOcr(engine=engine).extract(self.path)
+        # Half the width and height, pushed back inside the top-right corner
+        self.assertEqual(result.region, (1000, 0, 2000, 600))
+        self.assertEqual(engine.images[0].size, (1000, 600))
+        self.assertEqual(result.text.splitlines()[0], "def settings_for(level):")
+        self.assertEqual(result.words, 15)
+        self.assertEqual(result.confidence, 95.0)
+
+    def test_whole_screen_without_a_cursor(self):
+        path = screenshot(os.path.join(self.directory.name, 'plain.png'))
+        self.assertEqual(ScreenOcr(engine=fake_engine()).extract(path).region,
+                         (0, 0, 2000, 1200))
+
+    def test_confident_text_replaces_the_image(self):
+        ocr = ScreenOcr(engine=fake_engine())
+        description, blocks = ocr.content(self.path)
+        self.assertEqual(description, "the text on my screen below")
+        self.assertEqual([block["type"] for block in blocks], ['text'])
+        self.assertIn("settings.update(overrides)", blocks[0]["text"])
+        stats = ocr.stats()
+        self.assertEqual((stats["used_text"], stats["used_image"]), (1, 0))
+        self.assertGreater(stats["tokens_saved"], 1000)
+
+    def test_thumbnail_mode(self):
+        description, blocks = ScreenOcr(thumbnail=True, engine=fake_engine()).content(self.path)
+        self.assertIn("thumbnail", description)
+        self.assertEqual(blocks[1]["source"]["media_type"], 'image/jpeg')
+
+    def test_low_confidence_or_little_text_keeps_the_image(self):
+        self.assertIsNone(ScreenOcr(engine=fake_engine(confidence=40.0)).content(self.path))
+        self.assertIsNone(ScreenOcr(engine=fake_engine(lines=("OK",))).content(self.path))
+        self.assertIsNone(ScreenOcr(engine=lambda image: None).content(self.path))
+
+    def test_prefetched_result_is_shared(self):
+        engine = fake_engine()
+        ocr = ScreenOcr(engine=engine)
+        try:
+            ocr.prefetch(self.path)
+            ocr.content(self.path)
+            ocr.content(self.path)
+        finally:
+            ocr.shutdown()
+        self.assertEqual(len(engine.images), 1)
+
+    def test_rewritten_screenshot_is_read_again(self):
+        engine = fake_engine()
+        ocr = ScreenOcr(engine=engine)
+        self.addCleanup(ocr.shutdown)
+        ocr.read(self.path)
+        stat = os.stat(self.path)
+        screenshot(self.path, size=(1000, 800))
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(ocr.read(self.path).region, (0, 0, 1000, 800))
+        self.assertEqual(len(engine.images), 2)
+
+    def test_read_survives_eviction(self):
+        # More screenshots in flight than the cache keeps, as in the daemon
+        ocr = ScreenOcr(engine=fake_engine())
+        self.addCleanup(ocr.shutdown)
+        paths = [screenshot(os.path.join(self.directory.name, f"{i}.png"), size=(100, 100))
+                 for i in range(6)]
+
+        def evicting(path):
+            # Other captures arrive between read()'s prefetch and its wait
+            future = ScreenOcr.prefetch(ocr, path)
+            for other in paths:
+                ScreenOcr.prefetch(ocr, other)
+            return future
+
+        with patch.object(ocr, 'prefetch', side_effect=evicting):
+            self.assertIsNotNone(ocr.read(self.path))
+
+    def test_from_env(self):
+        with patch.dict(os.environ, {'SCREEN_OCR': 'off'}):
+            self.assertIsNone(ScreenOcr.from_env())
+        with patch.dict(os.environ, {'SCREEN_OCR': 'thumbnail', 'SCREEN_OCR_REGION': '1'}):
+            ocr = ScreenOcr.from_env()
+            self.assertTrue(ocr.thumbnail)
+            self.assertEqual(ocr.region, 1.0)
+        with patch.dict(os.environ, {'SCREEN_OCR': 'always'}):
+            with self.assertRaises(ValueError):
+                ScreenOcr.from_env()
+
+    def test_text_tokens(self):
+        self.assertEqual(text_tokens("abcdefgh"), 2)
+        self.assertEqual(text_tokens("abcde"), 2)
+
+
+class TestPipelineOcr(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = screenshot(os.path.join(self.directory.name, 'screen.png'))
+        self.pipeline = ProcessingPipeline(background=True)
+        self.pipeline.screen_gate = None
+
+    def tearDown(self):
+        self.pipeline.cleanup()
+        self.directory.cleanup()
+
+    def ask(self):
+        client = mock_claude(self.pipeline, "An answer.")
+        trace = tracing.RequestTrace()
+        with tracing.activate(trace):
+            self.pipeline.get_ai_response("Why does this fail?", self.path)
+        return client.messages.stream.call_args.kwargs['messages'][0]['content'], trace
+
+    def test_sends_text_instead_of_the_image(self):
+        self.pipeline.ocr = ScreenOcr(engine=fake_engine())
+        content, trace = self.ask()
+        self.assertEqual([block["type"] for block in content], ['text', 'text'])
+        self.assertIn("the text on my screen below", content[0]["text"])
+        self.assertTrue(trace.attrs["ocr"]["used"])
+        self.assertIn('ocr', trace.spans)
+
+    def test_falls_back_to_the_image(self):
+        self.pipeline.ocr = ScreenOcr(engine=fake_engine(confidence=30.0))
+        content, trace = self.ask()
+        self.assertEqual([block["type"] for block in content], ['text', 'image'])
+        self.assertFalse(trace.attrs["ocr"]["used"])
+
+
+if __name__ == '__main__':
+    unittest.main()
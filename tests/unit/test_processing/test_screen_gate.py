@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src import tracing
+from src.processing import ProcessingPipeline
+from src.processing.screen_gate import ScreenGate, image_tokens
+from tests.helpers import mock_claude
+
+
+class TestScreenGate(unittest.TestCase):
+    def setUp(self):
+        self.gate = ScreenGate()
+
+    def test_cues(self):
+        cases = {
+            "What does this error mean?": 'deictic',
+            "Why is the highlighted line failing": 'screen',
+            "Can you see what's wrong?": 'look',
+            "Why does my build fail": 'workspace',
+            "What's wrong on line 42": 'line',
+            "Summarize the document": 'workspace',
+        }
+        for text, cue in cases.items():
+            self.assertEqual(self.gate.cue(text), cue, text)
+
+    def test_general_questions_skip_the_screen(self):
+        for text in ("What's the capital of France?", "How do I reverse a list in Python",
+                     "Tell me a joke", "", None):
+            self.assertIsNone(self.gate.cue(text), text)
+
+    def test_from_env(self):
+        with patch.dict(os.environ, {'SCREENSHOT_GATE': 'always'}):
+            self.assertIsNone(ScreenGate.from_env())
+        with patch.dict(os.environ, {'SCREENSHOT_GATE': 'never'}):
+            self.assertIsNone(ScreenGate.from_env().cue("look at this"))
+        with patch.dict(os.environ, {'SCREENSHOT_GATE': 'auto',
+                                     'SCREENSHOT_CUES': r'\bslack\b;\bjira\b'}):
+            self.assertEqual(ScreenGate.from_env().cue("reply in slack for me"), 'custom')
+        with patch.dict(os.environ, {'SCREENSHOT_GATE': 'sometimes'}):
+            with self.assertRaises(ValueError):
+                ScreenGate.from_env()
+
+    def test_image_tokens(self):
+        from PIL import Image
+
+        with tempfile.NamedTemporaryFile(suffix='.png') as small, \
+                tempfile.NamedTemporaryFile(suffix='.png') as large:
+            Image.new('RGB', (750, 100)).save(small.name)
+            Image.new('RGB', (5120, 2880)).save(large.name)
+            self.assertEqual(image_tokens(small.name), 100)
+            # Scaled down by Claude first, so a 5K screen costs no more than ~1.15 MP
+            self.assertLessEqual(image_tokens(large.name), 1_150_000 // 750)
+        self.assertIsNone(image_tokens('missing.png'))
+        self.assertIsNone(image_tokens(None))
+
+
+class TestPipelineScreenGate(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = ProcessingPipeline(background=True)
+        self.pipeline.screen_gate = ScreenGate()
+        self.screenshot = tempfile.NamedTemporaryFile(suffix='.png')
+        from PIL import Image
+        Image.new('RGB', (1200, 625), 'white').save(self.screenshot.name)
+
+    def tearDown(self):
+        self.screenshot.close()
+        self.pipeline.cleanup()
+
+    def ask(self, transcript):
+        client = mock_claude(self.pipeline, "An answer.")
+        trace = tracing.RequestTrace()
+        with tracing.activate(trace), \
+                patch.object(self.pipeline, '_read_screenshot',
+                             wraps=self.pipeline._read_screenshot) as read:
+            self.pipeline.get_ai_response(transcript, self.screenshot.name)
+        content = client.messages.stream.call_args.kwargs['messages'][0]['content']
+        return content, read, trace
+
+    def test_general_question_is_sent_without_the_image(self):
+        content, read, trace = self.ask("What's the capital of France?")
+        self.assertEqual(len(content), 1)
+        self.assertNotIn("screenshot", content[0]['text'])
+        read.assert_not_called()
+        self.assertEqual(trace.attrs["screenshot"], {"sent": False, "cue": None})
+
+    def test_question_about_the_screen_gets_the_image(self):
+        content, read, trace = self.ask("What does this error mean?")
+        self.assertEqual(content[1]['type'], 'image')
+        read.assert_called_once()
+        self.assertEqual(trace.attrs["screenshot"], {"sent": True, "cue": 'deictic'})
+
+    def test_stats(self):
+        self.ask("What's the capital of France?")
+        self.ask("Explain this function")
+        self.ask("Tell me a joke")
+        stats = self.pipeline.screen_gate.stats()
+        self.assertEqual((stats["sent"], stats["skipped"], stats["skip_rate"]), (1, 2, 0.667))
+        self.assertEqual(stats["tokens_saved"], 2 * 1000)
+        self.assertIsNotNone(stats["encode_ms"])
+        self.assertIsNotNone(stats["first_token_ms_with_image"])
+        self.assertIsNotNone(stats["first_token_ms_without_image"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src import tracing
+from src.processing import ProcessingPipeline
+from src.processing.slo import LADDER, SloController, settings_for, time_to_first_audio
+from tests.helpers import mock_claude, wait_for
+
+
+def record(ttfa, level=0, outcome='ok', llm=None):
+    """A finished trace record with `ttfa` seconds from key-up to first audio"""
+    spans = {"llm": {"start": 0.0, "duration": llm * 1000}} if llm else {}
+    return {"marks_ms": {"key_up": 100.0, "first_audio_out": 100.0 + ttfa * 1000},
+            "spans_ms": spans, "outcome": outcome, "slo_level": level}
+
+
+class FakePipeline:
+    def __init__(self, model_size='small'):
+        self.model_size = model_size
+        self.switched = []
+
+    def downgrade_asr(self, model_size):
+        self.switched.append(model_size)
+        self.model_size = model_size
+        return True
+
+
+class TestSloController(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = FakePipeline()
+        self.slo = SloController(self.pipeline, target=1.0, window=3)
+
+    def feed(self, ttfa, count=3, **kwargs):
+        decision = None
+        for _ in range(count):
+            decision = self.slo.observe(record(ttfa, level=self.slo.level, **kwargs)) or decision
+        return decision
+
+    def test_settings_for(self):
+        self.assertEqual(settings_for(0)['beam_size'], 5)
+        self.assertEqual(settings_for(1)['beam_size'], 1)
+        self.assertEqual(settings_for(2)['screenshot'], 'reduced')
+        self.assertEqual(settings_for(4)['screenshot'], 'none')
+        self.assertEqual(settings_for(4)['max_tokens'], 256)
+        self.assertTrue(settings_for(len(LADDER) - 1)['asr_downgrade'])
+
+    def test_time_to_first_audio(self):
+        self.assertEqual(time_to_first_audio(record(1.5)), 1500.0)
+        self.assertEqual(time_to_first_audio({"marks_ms": {"key_up": 0.0,
+                                                           "tts_complete": 900.0}}), 900.0)
+        self.assertIsNone(time_to_first_audio({"marks_ms": {"key_up": 0.0}}))
+
+    def test_steps_down_when_slow_and_logs_the_reason(self):
+        self.assertIsNone(self.feed(1.5, count=2))
+        with self.assertLogs('src.processing.slo', 'INFO') as logs:
+            decision = self.slo.observe(record(1.5, llm=1.1))
+        self.assertEqual((decision["from"], decision["to"], decision["direction"]), (0, 1, 'down'))
+        self.assertEqual(decision["median_ttfa"], 1.5)
+        self.assertEqual(decision["stages"], {"llm": 1.1})
+        self.assertIn("greedy decoding", logs.output[0])
+        self.assertEqual(self.slo.settings['beam_size'], 1)
+
+    def test_window_restarts_after_each_step(self):
+        self.feed(2.0)
+        self.assertEqual(self.slo.level, 1)
+        # Requests that started at the previous level don't count
+        for _ in range(3):
+            self.slo.observe(record(2.0, level=0))
+        self.assertEqual(self.slo.level, 1)
+        self.feed(2.0)
+        self.assertEqual(self.slo.level, 2)
+
+    def test_recovers_when_fast_and_holds_in_between(self):
+        self.feed(2.0)
+        self.feed(2.0)
+        self.assertEqual(self.slo.level, 2)
+        self.assertIsNone(self.feed(0.9))
+        self.assertEqual(self.slo.level, 2)
+        decision = self.feed(0.3)
+        self.assertEqual((decision["to"], decision["direction"]), (1, 'up'))
+        self.assertEqual(self.slo.stats()["decisions"], 3)
+
+    def test_ignores_failed_and_unplayed_requests(self):
+        self.feed(5.0, outcome='cancelled')
+        self.slo.observe({"marks_ms": {"key_up": 0.0}, "outcome": 'ok'})
+        self.assertEqual(self.slo.level, 0)
+        self.assertIsNone(self.slo.stats()["recent_ttfa"])
+
+    def test_last_rung_switches_whisper_and_back(self):
+        while self.slo.level < len(LADDER) - 1:
+            self.feed(5.0)
+        self.assertTrue(wait_for(lambda: self.pipeline.switched == ['base']))
+        self.feed(5.0)
+        self.assertEqual(self.slo.level, len(LADDER) - 1)
+        self.feed(0.1)
+        self.assertTrue(wait_for(lambda: self.pipeline.switched == ['base', 'small']))
+
+    def test_from_env(self):
+        with patch.dict(os.environ, {'SLO_TTFA': ''}):
+            self.assertIsNone(SloController.from_env(self.pipeline))
+        with patch.dict(os.environ, {'SLO_TTFA': '1.5'}):
+            self.assertEqual(SloController.from_env(self.pipeline).target, 1.5)
+
+
+class TestPipelineSettings(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = ProcessingPipeline(background=True)
+        self.pipeline.slo = SloController(self.pipeline, target=1.0)
+
+    def tearDown(self):
+        self.pipeline.cleanup()
+
+    def ask(self, screenshot_path):
+        client = mock_claude(self.pipeline, "Short answer.")
+        self.pipeline.get_ai_response("Explain this", screenshot_path)
+        return client.messages.stream.call_args.kwargs
+
+    def test_levels_change_the_request(self):
+        from PIL import Image
+
+        with tempfile.NamedTemporaryFile(suffix='.png') as screenshot:
+            Image.new('RGB', (3000, 2000), 'white').save(screenshot.name)
+
+            kwargs = self.ask(screenshot.name)
+            self.assertEqual(kwargs['max_tokens'], 1024)
+            self.assertEqual(kwargs['messages'][0]['content'][1]['source']['media_type'],
+                             'image/png')
+
+            self.pipeline.slo.settings = settings_for(3)
+            kwargs = self.ask(screenshot.name)
+            self.assertEqual(kwargs['max_tokens'], 512)
+            content = kwargs['messages'][0]['content']
+            self.assertIn("short sentences", content[0]['text'])
+            self.assertEqual(content[1]['source']['media_type'], 'image/jpeg')
+
+            self.pipeline.slo.settings = settings_for(4)
+            kwargs = self.ask(screenshot.name)
+            self.assertEqual(len(kwargs['messages'][0]['content']), 1)
+
+    def test_process_records_the_level(self):
+        pipeline = self.pipeline
+        pipeline.model = pipeline.tts_client = pipeline.anthropic_client = MagicMock()
+        pipeline.save_recording = MagicMock(return_value='recording.wav')
+        pipeline.transcribe_audio = MagicMock(return_value="Why is this slow?")
+        pipeline.get_ai_response = MagicMock(return_value="An answer")
+        pipeline.text_to_speech = MagicMock(return_value='response.mp3')
+        pipeline.slo.level = 2
+        trace = tracing.RequestTrace()
+        with tracing.activate(trace):
+            pipeline.process(b'\0' * 64)
+        self.assertEqual(trace.attrs["slo_level"], 2)
+
+
+class TestTracerObservers(unittest.TestCase):
+    def test_finished_traces_reach_observers(self):
+        tracer = tracing.Tracer(path='')
+        seen = []
+        tracer.observers.append(lambda trace: 1 / 0)
+        tracer.observers.append(seen.append)
+        trace = tracer.start()
+        tracer.finish(trace, outcome='ok')
+        self.assertEqual(seen, [trace])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src import tracing
+from src.processing import CancelToken, CancelledError, ProcessingPipeline
+from src.processing.admission import AdmissionController
+from src.processing.speculation import SpeculationSession, SpeculativeLLM, word_distance
+from tests.helpers import make_pipeline, wait_for
+
+
+class FakePipeline:
+    """Claude stand-in: answers after `delay`, reporting token usage"""
+
+    ready = True
+    asr = None
+    _in_flight = 0
+    # The real bookkeeping, so tests see what speculation holds
+    in_flight = ProcessingPipeline.in_flight
+    stage = ProcessingPipeline.stage
+
+    def __init__(self, delay=0.05, partials=()):
+        self.delay = delay
+        self.partials = list(partials)
+        self.asked = []
+        self.passes_in_flight = []
+        self.admission = AdmissionController()
+        self._load_lock = threading.Lock()
+
+    def transcribe_text(self, audio, cancel_token=None):
+        self.passes_in_flight.append(self._in_flight)
+        return self.partials.pop(0) if len(self.partials) > 1 else self.partials[0]
+
+    def get_ai_response(self, transcript, screenshot_path, cancel_token=None, usage=None):
+        self.asked.append(transcript)
+        usage['input'] = 100
+        deadline = time.monotonic() + self.delay
+        while time.monotonic() < deadline:
+            if cancel_token and cancel_token.cancelled:
+                usage['output'] = 5
+                raise CancelledError()
+            time.sleep(0.005)
+        usage['output'] = 20
+        return f"Answer to {transcript}"
+
+
+class TestWordDistance(unittest.TestCase):
+    def test_distance(self):
+        self.assertEqual(word_distance("What does this error mean?", "what does this error mean"),
+                         0.0)
+        self.assertEqual(word_distance("Please explain line four", "explain line four"), 0.0)
+        self.assertAlmostEqual(word_distance("explain line four", "explain line five"), 1 / 3)
+        self.assertEqual(word_distance("", ""), 0.0)
+        self.assertEqual(word_distance("fix it", ""), 1.0)
+
+
+class TestSpeculation(unittest.TestCase):
+    def setUp(self):
+        self.pipeline = FakePipeline()
+        self.speculator = SpeculativeLLM(self.pipeline, stable_passes=2, min_words=3)
+
+    def session(self):
+        return SpeculationSession(self.speculator, lambda: b'', None)
+
+    def test_stable_partial_is_kept(self):
+        session = self.session()
+        session._on_partial("What does this error")
+        self.assertIsNone(session.speculation)
+        session._on_partial("What does this error mean?")
+        session._on_partial("what does this error mean")
+        self.assertIsNotNone(session.speculation)
+        time.sleep(0.02)
+
+        trace = tracing.RequestTrace()
+        with tracing.activate(trace):
+            response = session.resolve("What does this error mean?")
+        self.assertEqual(response, "Answer to what does this error mean")
+        self.assertEqual(trace.attrs["speculation"]["result"], "kept")
+        stats = self.speculator.stats()
+        self.assertEqual((stats["started"], stats["kept"], stats["discarded"]), (1, 1, 0))
+        self.assertGreater(stats["saved_seconds"], 0.01)
+        self.assertEqual(stats["wasted_tokens"], {'input': 0, 'output': 0})
+
+    def test_changed_final_transcript_discards(self):
+        session = self.session()
+        session._on_partial("open the settings file")
+        session._on_partial("open the settings file")
+
+        self.assertIsNone(session.resolve("open the settings file and add a proxy section"))
+        self.assertTrue(wait_for(lambda: self.speculator.stats()["wasted_tokens"]["input"]))
+        stats = self.speculator.stats()
+        self.assertEqual((stats["kept"], stats["discarded"]), (0, 1))
+        self.assertEqual(stats["wasted_tokens"], {'input': 100, 'output': 5})
+        self.assertIsNone(stats["tokens_per_saved_second"])
+
+    def test_drift_while_recording_restarts(self):
+        session = self.session()
+        session._on_partial("rename this function")
+        session._on_partial("rename this function")
+        first = session.speculation
+        session._on_partial("rename this function to parse header bytes")
+        self.assertTrue(first.token.cancelled)
+        self.assertIsNone(session.speculation)
+        session._on_partial("rename this function to parse header bytes")
+        self.assertIsNotNone(session.speculation)
+        self.assertIsNotNone(session.resolve("Rename this function to parse header bytes."))
+        self.assertEqual(self.speculator.stats()["started"], 2)
+
+    def test_cancel_while_waiting(self):
+        self.pipeline.delay = 5.0
+        session = self.session()
+        session._on_partial("summarize this page")
+        session._on_partial("summarize this page")
+        token = CancelToken()
+        threading.Timer(0.05, token.cancel).start()
+        with self.assertRaises(CancelledError):
+            session.resolve("summarize this page", token)
+
+    def test_discard_is_idempotent(self):
+        session = self.session()
+        session._on_partial("what is on line ten")
+        session._on_partial("what is on line ten")
+        session.discard()
+        session.discard()
+        self.assertIsNone(session.resolve("what is on line ten"))
+        self.assertEqual(self.speculator.stats()["discarded"], 1)
+
+    def test_partials_from_recording(self):
+        pipeline = FakePipeline(partials=["explain", "explain this diff", "explain this diff"])
+        speculator = SpeculativeLLM(pipeline, interval=0.01, min_seconds=0.0)
+        session = speculator.start(lambda: b'\0' * 4410 * 4)
+        self.assertTrue(wait_for(lambda: pipeline.asked))
+        session.stop()
+        self.assertEqual(session.resolve("Explain this diff."), "Answer to explain this diff")
+        self.assertEqual(pipeline.asked, ["explain this diff"])
+        self.assertEqual(set(pipeline.passes_in_flight), {1})
+        stages = pipeline.admission.stats()
+        self.assertEqual(stages["asr"]["admitted"], len(pipeline.passes_in_flight))
+        self.assertEqual(stages["llm"]["admitted"], 1)
+        self.assertEqual(pipeline._in_flight, 0)
+
+    def test_no_partials_until_the_model_is_loaded(self):
+        pipeline = FakePipeline(partials=["explain this diff"])
+        pipeline.ready = False
+        speculator = SpeculativeLLM(pipeline, interval=0.01, min_seconds=0.0)
+        session = speculator.start(lambda: b'\0' * 4410 * 4)
+        time.sleep(0.05)
+        self.assertEqual(pipeline.passes_in_flight, [])
+        # Skipped passes don't end the session: it starts once Whisper is back
+        pipeline.ready = True
+        self.assertTrue(wait_for(lambda: pipeline.asked))
+        session.discard()
+
+
+class TestPipelineSpeculation(unittest.TestCase):
+    def test_process_uses_speculative_response(self):
+        pipeline = make_pipeline()
+        try:
+            pipeline.save_recording = MagicMock(return_value='recording.wav')
+            pipeline.transcribe_audio = MagicMock(return_value="Why is this test flaky?")
+            pipeline.get_ai_response = MagicMock(return_value="From the API")
+            pipeline.text_to_speech = MagicMock(side_effect=lambda text, token=None: text)
+            speculation = MagicMock()
+            speculation.resolve.return_value = "From speculation"
+
+            self.assertEqual(pipeline.process(b'\0' * 64, speculation=speculation),
+                             "From speculation")
+            pipeline.get_ai_response.assert_not_called()
+            speculation.resolve.assert_called_once_with("Why is this test flaky?", None)
+
+            speculation.resolve.return_value = None
+            self.assertEqual(pipeline.process(b'\0' * 64, speculation=speculation),
+                             "From the API")
+        finally:
+            pipeline.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import importlib.util
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from src.processing import CancelToken
+from src.processing.warmup import WHISPER_RATE, WarmupReport, synthetic_utterance, warm_up
+from tests.helpers import make_pipeline
+
+
+# Installed alongside the anthropic and openai SDKs
+requires_httpx = unittest.skipUnless(importlib.util.find_spec('httpx'), "httpx not installed")
+
+
+def slow_first_model(cold=0.05, warm=0.005):
+    """A fake Whisper whose first transcribe is much slower than the rest"""
+    model = MagicMock()
+    calls = []
+
+    def transcribe(audio, beam_size):
+        calls.append(audio)
+        time.sleep(cold if len(calls) == 1 else warm)
+        return iter([MagicMock(text="hello")]), None
+
+    model.transcribe.side_effect = transcribe
+    return model, calls
+
+
+class TestWarmup(unittest.TestCase):
+    def test_synthetic_utterance(self):
+        audio = synthetic_utterance(seconds=1.0)
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertEqual(len(audio), WHISPER_RATE)
+        self.assertGreater(np.sqrt(np.mean(audio ** 2)), 0.05)
+        self.assertLessEqual(np.abs(audio).max(), 1.0)
+
+    def test_reports_cold_penalty(self):
+        """First ASR call is reported separately from steady state"""
+        pipeline = make_pipeline()
+        pipeline.model, calls = slow_first_model()
+        report = warm_up(pipeline, rounds=3, endpoints={})
+        self.assertEqual(len(calls), 3)
+        self.assertIsInstance(calls[0], np.ndarray)
+        self.assertEqual(len(report.timings['asr']), 3)
+        self.assertGreater(report.cold_penalty('asr'), 3)
+        self.assertIn('asr: first', report.summary()[0])
+
+    @requires_httpx
+    def test_primes_api_clients(self):
+        pipeline = make_pipeline()
+        pipeline.model, _ = slow_first_model(cold=0, warm=0)
+        report = warm_up(pipeline, rounds=2, endpoints={'llm': '/v1/models', 'tts': '/models'})
+        self.assertEqual(pipeline.anthropic_client.get.call_count, 2)
+        self.assertEqual(pipeline.anthropic_client.get.call_args[0][0], '/v1/models')
+        self.assertEqual(pipeline.tts_client.get.call_args[0][0], '/models')
+        self.assertEqual(set(report.timings), {'asr', 'llm', 'tts'})
+
+    @requires_httpx
+    def test_error_status_counts_as_primed(self):
+        """A 401/404 still opened the connection; a connection error is reported"""
+        pipeline = make_pipeline()
+        status_error = Exception("unauthorized")
+        status_error.status_code = 401
+        pipeline.anthropic_client.get.side_effect = status_error
+        pipeline.tts_client.get.side_effect = ConnectionError("no route")
+        report = warm_up(pipeline, rounds=1, endpoints={'llm': '/v1/models', 'tts': '/models'})
+        self.assertIn('llm', report.timings)
+        self.assertIn('tts', report.errors)
+
+    def test_cancel_stops_between_calls(self):
+        pipeline = make_pipeline()
+        token = CancelToken()
+        pipeline.model.transcribe.side_effect = lambda *a, **k: (token.cancel(), (iter([]), None))[1]
+        report = warm_up(pipeline, rounds=3, endpoints={}, cancel_token=token)
+        self.assertEqual(pipeline.model.transcribe.call_count, 1)
+        self.assertEqual(len(report.timings['asr']), 1)
+
+    def test_real_request_stops_warmup(self):
+        """process() cancels a warm-up in progress instead of queueing behind it"""
+        pipeline = make_pipeline()
+        token = CancelToken()
+        pipeline._warmup_token = token
+        pipeline.save_recording = MagicMock(return_value='x.wav')
+        pipeline.transcribe_audio = MagicMock(return_value='')
+        pipeline.process(b'\0' * 16)
+        self.assertTrue(token.cancelled)
+
+
+class TestWarmupReport(unittest.TestCase):
+    def test_steady_is_median_after_first(self):
+        report = WarmupReport()
+        for seconds in (1.0, 0.2, 0.4, 0.3):
+            report.record('asr', seconds)
+        self.assertEqual(report.first('asr'), 1.0)
+        self.assertEqual(report.steady('asr'), 0.3)
+        self.assertAlmostEqual(report.cold_penalty('asr'), 1.0 / 0.3)
+
+    def test_single_round_has_no_steady_state(self):
+        report = WarmupReport()
+        report.record('llm', 0.1)
+        self.assertIsNone(report.steady('llm'))
+        self.assertIsNone(report.cold_penalty('llm'))
+        self.assertEqual(report.summary(), ['llm: first 100 ms'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from src.startup_profile import READY_MARKER, check_budget, parse_importtime, top_imports
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | marshal
+import time:      2000 |       2000 |     numpy.core
+import time:     50000 |      52000 |   numpy
+import time:     10000 |      62000 | src.audio
+import time:       900 |        900 | dotenv
+STARTUP_READY
+import time:    800000 |     800000 | faster_whisper
+""".splitlines()
+
+
+class TestStartupProfile(unittest.TestCase):
+    def test_parse_stops_at_ready_marker(self):
+        """Imports after the listener is live don't count against startup"""
+        imports = parse_importtime(SAMPLE)
+        modules = [module for module, *_ in imports]
+        self.assertNotIn('faster_whisper', modules)
+        self.assertEqual(modules[-1], 'dotenv')
+        self.assertEqual(SAMPLE[-2], READY_MARKER)
+
+    def test_parse_fields_and_depth(self):
+        imports = {module: rest for module, *rest in parse_importtime(SAMPLE)}
+        self.assertEqual(imports['numpy'], [0.05, 0.052, 1])
+        self.assertEqual(imports['numpy.core'], [0.002, 0.002, 2])
+        self.assertEqual(imports['src.audio'], [0.01, 0.062, 0])
+
+    def test_top_imports_sorted_by_cumulative(self):
+        top = top_imports(parse_importtime(SAMPLE), limit=2)
+        self.assertEqual([module for module, *_ in top], ['src.audio', 'dotenv'])
+
+    def test_budget(self):
+        imports = parse_importtime(SAMPLE)
+        self.assertEqual(check_budget(0.5, imports, budget=1.0), [])
+        self.assertEqual(len(check_budget(1.5, imports, budget=1.0)), 1)
+        problems = check_budget(0.5, imports, budget=1.0, module_budget=0.05)
+        self.assertEqual(len(problems), 1)
+        self.assertIn('src.audio', problems[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
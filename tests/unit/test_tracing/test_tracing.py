@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from src import tracing
+from src.tracing import RequestTrace, TraceWriter, Tracer, summarize, trace_files
+
+
+class TestRequestTrace(unittest.TestCase):
+    def test_marks_and_spans(self):
+        trace = RequestTrace("abc")
+        started = time.perf_counter()
+        trace.mark('key_up')
+        time.sleep(0.01)
+        trace.mark('key_up')  # once=True keeps the first
+        trace.add_span('capture', started)
+        trace.set(outcome='ok')
+
+        record = trace.to_record()
+        self.assertEqual(record["id"], "abc")
+        self.assertEqual(record["outcome"], "ok")
+        self.assertLess(record["marks_ms"]["key_up"], 10)
+        self.assertGreaterEqual(record["spans_ms"]["capture"]["duration"], 10)
+        json.dumps(record)
+
+    def test_module_helpers_follow_context(self):
+        # No active trace: everything is a no-op
+        tracing.mark('llm_first_token')
+        with tracing.span('encode') as trace:
+            self.assertIsNone(trace)
+        self.assertIsNone(tracing.current())
+
+        trace = RequestTrace()
+        with tracing.activate(trace):
+            tracing.mark('llm_first_token')
+            with tracing.span('encode'):
+                pass
+            self.assertIs(tracing.current(), trace)
+        self.assertIsNone(tracing.current())
+        self.assertIn('llm_first_token', trace.marks)
+        self.assertIn('encode', trace.spans)
+
+    def test_context_is_per_thread(self):
+        seen = []
+        with tracing.activate(RequestTrace()):
+            thread = threading.Thread(target=lambda: seen.append(tracing.current()))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [None])
+
+
+class TestTraceWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'traces', 'requests.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_writes_jsonl(self):
+        tracer = Tracer(self.path)
+        for n in range(3):
+            trace = tracer.start(f"r{n}")
+            trace.mark('key_up')
+            tracer.finish(trace, outcome='ok')
+        self.assertTrue(tracer.writer.flush())
+        tracer.close()
+
+        records = self.read(self.path)
+        self.assertEqual([r["id"] for r in records], ["r0", "r1", "r2"])
+        self.assertTrue(all(r["outcome"] == "ok" for r in records))
+
+    def test_rotation(self):
+        writer = TraceWriter(self.path, max_bytes=200, backups=2)
+        for n in range(30):
+            writer.write({"id": n, "pad": "x" * 50})
+            writer.flush()
+        writer.close()
+
+        files = trace_files(self.path)
+        self.assertEqual(files, [self.path, f"{self.path}.1", f"{self.path}.2"])
+        self.assertFalse(os.path.exists(f"{self.path}.3"))
+        for path in files[1:]:
+            self.assertLess(os.path.getsize(path), 400)
+        # Newest records are in the live file (or .1 if the last write rotated it)
+        newest = [path for path in files if os.path.exists(path)][0]
+        self.assertEqual(self.read(newest)[-1]["id"], 29)
+
+    def test_disabled(self):
+        tracer = Tracer('')
+        self.assertFalse(tracer.enabled)
+        tracer.finish(tracer.start())
+        tracer.close()
+
+
+class TestSummary(unittest.TestCase):
+    def test_percentiles(self):
+        records = [{
+            "marks_ms": {"key_down": 0.0, "key_up": 1000.0, "first_audio_out": 1000.0 + n},
+            "spans_ms": {"transcribe": {"start": 1000.0, "duration": float(n)}},
+        } for n in range(1, 101)]
+        summary = summarize(records)
+
+        self.assertEqual(list(summary), ["transcribe", "first_audio_out"])
+        self.assertEqual(summary["transcribe"]["count"], 100)
+        self.assertEqual(summary["transcribe"]["p50"], 50.0)
+        self.assertEqual(summary["transcribe"]["p95"], 95.0)
+        # Marks are relative to key-up
+        self.assertEqual(summary["first_audio_out"]["p99"], 99.0)
+
+    def test_cli(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'requests.jsonl')
+            self.assertEqual(tracing.main([path]), 1)
+            with open(path, 'w') as f:
+                f.write(json.dumps({"marks_ms": {"key_up": 0, "llm_first_token": 5}}) + "\n")
+            self.assertEqual(tracing.main([path]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()